@@ -5,24 +5,31 @@ from werkzeug.exceptions import HTTPException
 from marshmallow import ValidationError
 
 from config import config_by_name
-from .extensions import db, jwt, ma, cors 
+from .extensions import db, jwt, ma, cors, response_cache, request_metrics
+from .utils.db_tuning import init_db_engine
 
-def create_app(config_name=None):
+def create_app(config_name=None, config_overrides=None):
     if config_name is None:
         config_name = os.getenv('FLASK_ENV', 'default')
 
     app = Flask(__name__)
     app.config.from_object(config_by_name[config_name])
+    if config_overrides:
+        app.config.update(config_overrides)
 
-    db.init_app(app)
+    init_db_engine(app, db)
     jwt.init_app(app)
     ma.init_app(app)
+    response_cache.init_app(app)
+    request_metrics.init_app(app)
 
     cors.init_app(app, 
                   resources={r"/*": {"origins": "*"}}, 
                   methods=["GET", "HEAD", "POST", "OPTIONS", "PUT", "PATCH", "DELETE"],
-                  allow_headers=["Authorization", "Content-Type"], 
-                  expose_headers=["Content-Type", "Authorization"], 
+                  allow_headers=["Authorization", "Content-Type", "If-None-Match", "If-Modified-Since",
+                                 "X-Read-Consistency", "Idempotency-Key"], 
+                  expose_headers=["Content-Type", "Authorization", "ETag", "Last-Modified", "X-DB-Route",
+                                  "Idempotent-Replayed", "Retry-After"], 
                   supports_credentials=True) 
 
     from .models.user import User
@@ -77,9 +84,19 @@ def create_app(config_name=None):
     app.register_blueprint(cart_bp, url_prefix='/cart', strict_slashes=False)
     app.register_blueprint(orders_bp, url_prefix='/orders', strict_slashes=False)
 
-    from .commands import init_db_command, create_admin_command, seed_db_command
+    from .commands import (
+        init_db_command, create_admin_command, seed_db_command,
+        rebuild_search_index_command, backfill_order_sellers_command, sync_read_replica_command,
+        rebuild_facet_summary_command, rebuild_cart_totals_command, purge_idempotency_keys_command
+    )
     app.cli.add_command(init_db_command)
+    app.cli.add_command(rebuild_search_index_command)
+    app.cli.add_command(rebuild_facet_summary_command)
+    app.cli.add_command(rebuild_cart_totals_command)
+    app.cli.add_command(backfill_order_sellers_command)
     app.cli.add_command(create_admin_command)
     app.cli.add_command(seed_db_command)
+    app.cli.add_command(sync_read_replica_command)
+    app.cli.add_command(purge_idempotency_keys_command)
 
     return app
\ No newline at end of file
@@ -1,22 +1,156 @@
 # phone_management_api/app/commands.py
+import sqlite3
+import time
+
 import click
+from flask import current_app
 from flask.cli import with_appcontext 
+from sqlalchemy.engine import make_url
 from app.extensions import db
 from app.models.user import User
 from app.models.phone import Phone
 from app.models.cart import Cart, CartItem
-from app.models.order import Order, OrderItem, ORDER_STATUS_PENDING, ORDER_STATUS_PROCESSING, ORDER_STATUS_SHIPPED # Import các hằng số status
+from app.models.idempotency import IdempotencyKey
+from app.models.order import Order, OrderItem, OrderSeller, ORDER_STATUS_PENDING, ORDER_STATUS_PROCESSING, ORDER_STATUS_SHIPPED # Import các hằng số status
 from werkzeug.security import generate_password_hash
+from sqlalchemy import select, insert, exists, and_
 from datetime import datetime
 from app.utils.helpers import get_or_create_user_cart 
+from app.utils.search import drop_search_index, ensure_search_index, rebuild_search_index
+from app.utils.facets import drop_facet_summary, ensure_facet_summary, rebuild_facet_summary
+from app.utils.cart_totals import ensure_cart_totals, refresh_cart_totals
+from app.utils.schema import ensure_phone_columns
+from app.utils.idempotency import purge_expired_idempotency_keys
+from app.utils.synthetic_data import generate_synthetic_data, synthetic_counts
 
 @click.command('init-db')
 @with_appcontext 
 def init_db_command():
     """Xóa các bảng hiện có (nếu có) và tạo lại cấu trúc CSDL."""
     db.create_all()
+    # create_all() bỏ qua bảng đã tồn tại: thêm các cột mới của phones (CSDL cũ) trước khi tạo chỉ mục.
+    ensure_phone_columns()
+    # Tạo thêm các chỉ mục mới khai báo trong model.
+    for table in db.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(db.engine, checkfirst=True)
+    ensure_search_index()
+    ensure_facet_summary()
+    ensure_cart_totals()
     click.echo('Đã khởi tạo cơ sở dữ liệu (các bảng đã được tạo).')
 
+@click.command('rebuild-search-index')
+@with_appcontext
+def rebuild_search_index_command():
+    """Dựng lại chỉ mục tìm kiếm toàn văn cho bảng phones."""
+    try:
+        indexed_count = rebuild_search_index()
+    except Exception as e:
+        db.session.rollback()
+        click.echo(f"Lỗi khi dựng lại chỉ mục tìm kiếm: {e}")
+        return
+    click.echo(f"Đã dựng lại chỉ mục tìm kiếm cho {indexed_count} sản phẩm.")
+
+@click.command('rebuild-facet-summary')
+@with_appcontext
+def rebuild_facet_summary_command():
+    """Dựng lại bảng tổng hợp facet (GET /phones/facets) và các trigger cập nhật nó."""
+    try:
+        cell_count = rebuild_facet_summary()
+    except Exception as e:
+        db.session.rollback()
+        click.echo(f"Lỗi khi dựng lại bảng tổng hợp facet: {e}")
+        return
+    click.echo(f"Đã dựng lại bảng tổng hợp facet ({cell_count} ô).")
+
+@click.command('rebuild-cart-totals')
+@with_appcontext
+def rebuild_cart_totals_command():
+    """Tính lại số mục, tổng số lượng và tạm tính của mọi giỏ hàng từ cart_items."""
+    try:
+        ensure_cart_totals()
+        cart_count = refresh_cart_totals()
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        click.echo(f"Lỗi khi tính lại tổng giỏ hàng: {e}")
+        return
+    click.echo(f"Đã tính lại tổng cho {cart_count} giỏ hàng.")
+
+@click.command('purge-idempotency-keys')
+@with_appcontext
+def purge_idempotency_keys_command():
+    """Xóa các phản hồi Idempotency-Key đã hết hạn (IDEMPOTENCY_KEY_TTL)."""
+    try:
+        deleted_count = purge_expired_idempotency_keys()
+    except Exception as e:
+        db.session.rollback()
+        click.echo(f"Lỗi khi xóa Idempotency-Key hết hạn: {e}")
+        return
+    click.echo(f"Đã xóa {deleted_count} Idempotency-Key hết hạn.")
+
+def backfill_order_sellers():
+    """Điền bảng order_sellers từ order_items/phones cho các cặp (order, seller) còn thiếu."""
+    missing_pairs = select(OrderItem.order_id, Phone.user_id)\
+        .join(Phone, OrderItem.phone_id == Phone.id)\
+        .where(~exists().where(and_(OrderSeller.order_id == OrderItem.order_id,
+                                    OrderSeller.seller_id == Phone.user_id)))\
+        .distinct()
+    result = db.session.execute(
+        insert(OrderSeller).from_select(['order_id', 'seller_id'], missing_pairs)
+    )
+    db.session.commit()
+    return result.rowcount
+
+@click.command('backfill-order-sellers')
+@with_appcontext
+def backfill_order_sellers_command():
+    """Điền lại bảng order_sellers cho các đơn hàng đã có."""
+    try:
+        inserted_count = backfill_order_sellers()
+    except Exception as e:
+        db.session.rollback()
+        click.echo(f"Lỗi khi điền bảng order_sellers: {e}")
+        return
+    click.echo(f"Đã thêm {inserted_count} dòng vào order_sellers.")
+
+def sync_sqlite_replica(primary_path, replica_path):
+    """Sao chép nhất quán file SQLite primary sang replica bằng backup API (không chặn người đọc)."""
+    source = sqlite3.connect(primary_path)
+    target = sqlite3.connect(replica_path, timeout=30)
+    try:
+        source.backup(target)
+    finally:
+        target.close()
+        source.close()
+
+@click.command('sync-read-replica')
+@click.option('--interval', type=float, default=None,
+              help="Lặp lại sau mỗi N giây (mặc định: sao chép một lần rồi thoát).")
+@with_appcontext
+def sync_read_replica_command(interval):
+    """Đồng bộ bản sao SQLite chỉ đọc (READ_REPLICA_DATABASE_URL) từ CSDL chính."""
+    replica_url = current_app.config.get('READ_REPLICA_DATABASE_URL')
+    if not replica_url:
+        click.echo("Lỗi: chưa cấu hình READ_REPLICA_DATABASE_URL.")
+        return
+    primary = make_url(current_app.config['SQLALCHEMY_DATABASE_URI'])
+    replica = make_url(replica_url)
+    if primary.get_backend_name() != 'sqlite' or replica.get_backend_name() != 'sqlite':
+        click.echo("Lỗi: lệnh này chỉ hỗ trợ primary và replica đều là SQLite.")
+        return
+    while True:
+        started = time.perf_counter()
+        try:
+            sync_sqlite_replica(primary.database, replica.database)
+        except sqlite3.Error as e:
+            click.echo(f"Lỗi khi đồng bộ replica: {e}")
+        else:
+            click.echo(f"Đã đồng bộ replica {replica.database} trong {(time.perf_counter() - started) * 1000:.0f} ms.")
+        if interval is None:
+            return
+        time.sleep(interval)
+
 @click.command('create-admin')
 @click.argument('username')
 @click.argument('password')
@@ -46,19 +180,32 @@ def create_admin_command(username, password):
 
 @click.command("seed-db")
 @click.option('--no-clear', is_flag=True, help="Không xóa dữ liệu hiện có trước khi tạo dữ liệu mẫu.")
+@click.option('--scale', type=click.IntRange(min=1), default=None,
+              help="Sinh thêm dữ liệu tổng hợp với N phones (kèm users, carts, orders tỷ lệ theo N).")
+@click.option('--seed', type=int, default=42, show_default=True, help="Seed cho bộ sinh dữ liệu tổng hợp.")
+@click.option('--chunk-size', type=click.IntRange(min=1), default=10000, show_default=True,
+              help="Số dòng mỗi lô INSERT/transaction khi dùng --scale.")
 @with_appcontext
-def seed_db_command(no_clear):
-    """Xóa dữ liệu hiện có (trừ khi có --no-clear) và tạo dữ liệu mẫu."""
+def seed_db_command(no_clear, scale, seed, chunk_size):
+    """Xóa dữ liệu hiện có (trừ khi có --no-clear) và tạo dữ liệu mẫu.
+
+    Với --scale N, sau dữ liệu mẫu sẽ sinh thêm dữ liệu lớn tái lập được (cùng seed -> cùng dữ liệu).
+    """
     
     db.create_all() 
     click.echo('Đảm bảo các bảng CSDL đã được tạo.')
+    # Trigger của bảng tổng hợp facet và chỉ mục tìm kiếm làm chậm việc nạp hàng loạt: gỡ ra rồi dựng lại ở cuối.
+    drop_facet_summary()
+    drop_search_index()
 
     if not no_clear:
         click.echo("Đang xóa dữ liệu cũ...")
+        OrderSeller.query.delete()
         OrderItem.query.delete()
         Order.query.delete()
         CartItem.query.delete()
         Cart.query.delete()
+        IdempotencyKey.query.delete()
         Phone.query.delete()
         User.query.delete()
         try:
@@ -205,10 +352,25 @@ def seed_db_command(no_clear):
              click.echo(f"Đã xử lý {orders_created_count} đơn hàng mẫu và cập nhật tồn kho.")
         
         db.session.commit()
+
+        if scale:
+            counts = synthetic_counts(scale)
+            click.echo(f"Đang sinh dữ liệu tổng hợp (scale={scale}, seed={seed}): "
+                       + ", ".join(f"{count:,} {name}" for name, count in counts.items()))
+            generate_synthetic_data(scale, hashed_common_password, seed=seed, chunk_size=chunk_size,
+                                    echo=click.echo)
+
+        backfill_order_sellers()
+        # Giỏ mẫu được chèn trực tiếp vào cart_items: điền các cột tổng của carts.
+        refresh_cart_totals()
+        db.session.commit()
         click.echo("Đã tạo dữ liệu mẫu thành công!")
 
     except Exception as e:
         db.session.rollback()
         click.echo(f"Lỗi khi tạo dữ liệu mẫu: {e}")
         click.echo("Tất cả thay đổi đã được hoàn tác (nếu có).")
+    finally:
+        rebuild_search_index()
+        rebuild_facet_summary()
 
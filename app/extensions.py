@@ -4,7 +4,13 @@ from flask_jwt_extended import JWTManager
 from flask_marshmallow import Marshmallow 
 from flask_cors import CORS
 
-db = SQLAlchemy()
+from app.utils.cache import ResponseCache
+from app.utils.metrics import RequestMetrics
+from app.utils.db_routing import RoutingSession
+
+db = SQLAlchemy(session_options={'class_': RoutingSession})
 jwt = JWTManager()
 ma = Marshmallow()
-cors = CORS()
\ No newline at end of file
+cors = CORS()
+response_cache = ResponseCache()
+request_metrics = RequestMetrics()
\ No newline at end of file
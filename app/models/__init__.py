@@ -2,4 +2,5 @@
 from .user import User
 from .phone import Phone
 from .cart import Cart, CartItem
-from .order import Order, OrderItem
+from .order import Order, OrderItem, OrderSeller
+from .idempotency import IdempotencyKey
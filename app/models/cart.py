@@ -14,19 +14,28 @@ class Cart(db.Model):
                             default=lambda: datetime.now(timezone.utc),
                             onupdate=lambda: datetime.now(timezone.utc))
 
+    # Tổng được duy trì tăng dần khi thêm/sửa/xóa mục (app/utils/cart_totals.py).
+    # subtotal = NULL: giá một phone trong giỏ vừa đổi, cần tính lại (refresh_cart_totals).
+    item_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    total_quantity = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    subtotal = db.Column(db.Float, nullable=True, default=0, server_default='0')
+
     user = db.relationship('User', back_populates='cart')
-    items = db.relationship('CartItem', backref='cart', lazy='dynamic', cascade='all, delete-orphan')
+    items = db.relationship('CartItem', backref='cart', lazy='select', order_by='CartItem.id',
+                            cascade='all, delete-orphan')
 
     @property
     def total_price(self):
+        if self.subtotal is not None:
+            return round(self.subtotal, 2)
         total = 0
-        for item in self.items.all(): 
+        for item in self.items: 
             if item.phone and item.phone.price is not None and item.quantity is not None:
                 total += item.quantity * item.phone.price
         return round(total, 2)
 
     def is_empty(self):
-        return not self.items.first()
+        return not db.session.query(CartItem.id).filter_by(cart_id=self.id).first()
 
     def __repr__(self):
         return f'<Cart ID: {self.id} UserID: {self.user_id}>'
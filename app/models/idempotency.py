@@ -0,0 +1,30 @@
+# phone_management_api/app/models/idempotency.py
+from app.extensions import db
+from sqlalchemy import UniqueConstraint
+
+class IdempotencyKey(db.Model):
+    """Phản hồi đã lưu cho header Idempotency-Key của một user (app/utils/idempotency.py).
+
+    response_status = NULL: request đầu tiên đang chạy (khóa in-flight đến locked_until).
+    """
+    __tablename__ = 'idempotency_keys'
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    key = db.Column(db.String(255), nullable=False)
+    request_hash = db.Column(db.String(64), nullable=False)  # sha256(method, path, body)
+
+    response_status = db.Column(db.Integer, nullable=True)
+    response_body = db.Column(db.Text, nullable=True)
+    response_content_type = db.Column(db.String(100), nullable=True)
+
+    created_at = db.Column(db.DateTime, nullable=False)
+    locked_until = db.Column(db.DateTime, nullable=True)
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
+
+    __table_args__ = (
+        UniqueConstraint('user_id', 'key', name='uq_idempotency_user_key'),
+    )
+
+    def __repr__(self):
+        return f'<IdempotencyKey UserID: {self.user_id} Key: {self.key} Status: {self.response_status}>'
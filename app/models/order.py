@@ -30,7 +30,8 @@ class Order(db.Model):
                             onupdate=lambda: datetime.now(timezone.utc))
 
     user = db.relationship('User', back_populates='orders')
-    items = db.relationship('OrderItem', backref='order', lazy='dynamic', cascade='all, delete-orphan')
+    items = db.relationship('OrderItem', backref='order', lazy='select', order_by='OrderItem.id',
+                            cascade='all, delete-orphan')
 
     __table_args__ = (
         CheckConstraint(status.in_(ALLOWED_ORDER_STATUSES), name='ck_order_status_valid'),
@@ -57,4 +58,18 @@ class OrderItem(db.Model):
     )
     
     def __repr__(self):
-        return f'<OrderItem ID: {self.id} OrderID: {self.order_id} PhoneID: {self.phone_id} Qty: {self.quantity}>'
\ No newline at end of file
+        return f'<OrderItem ID: {self.id} OrderID: {self.order_id} PhoneID: {self.phone_id} Qty: {self.quantity}>'
+
+class OrderSeller(db.Model):
+    """Ánh xạ phi chuẩn hóa đơn hàng -> người bán có sản phẩm trong đơn (ghi lúc checkout)."""
+    __tablename__ = 'order_sellers'
+
+    order_id = db.Column(db.Integer, db.ForeignKey('orders.id'), primary_key=True)
+    seller_id = db.Column(db.Integer, db.ForeignKey('users.id'), primary_key=True)
+
+    __table_args__ = (
+        db.Index('ix_order_sellers_seller_order', 'seller_id', 'order_id'),
+    )
+
+    def __repr__(self):
+        return f'<OrderSeller OrderID: {self.order_id} SellerID: {self.seller_id}>'
\ No newline at end of file
@@ -1,4 +1,5 @@
 # phone_management_api/app/models/phone.py
+from datetime import datetime, timezone
 from app.extensions import db
 from sqlalchemy import CheckConstraint
 
@@ -14,11 +15,17 @@ class Phone(db.Model):
     
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
 
+    updated_at = db.Column(db.DateTime,
+                            default=lambda: datetime.now(timezone.utc),
+                            onupdate=lambda: datetime.now(timezone.utc))
+
     owner = db.relationship('User', back_populates='phones_listed')
 
     __table_args__ = (
         CheckConstraint('price >= 0', name='ck_phone_price_non_negative'),
         CheckConstraint('stock_quantity >= 0', name='ck_phone_stock_non_negative'),
+        # Kho hàng theo người bán (GET /phones/mine): lọc user_id, phân trang cursor theo id.
+        db.Index('ix_phones_user_id_id', 'user_id', 'id'),
     )
 
     def __repr__(self):
@@ -6,9 +6,16 @@ from flask_jwt_extended import create_access_token
 from app.extensions import db
 from app.models.user import User
 from app.schemas import user_register_schema, user_schema
+from app.utils.query_budget import declare_query_budgets
 
 auth_bp = Blueprint('auth_bp', __name__)
 
+# Số câu SQL tối đa cho mỗi request (kiểm tra: python -m benchmarks.query_budgets).
+declare_query_budgets(auth_bp, {
+    'register_user': 3,
+    'login_user': 1,
+})
+
 @auth_bp.route('/register', methods=['POST'])
 def register_user():
     json_data = request.get_json()
@@ -1,30 +1,50 @@
 # phone_management_api/app/routes/cart_routes.py
 from flask import Blueprint, request, jsonify, abort, current_app
 from flask_jwt_extended import jwt_required, get_jwt_identity, verify_jwt_in_request
+from sqlalchemy import func, insert, select
+from sqlalchemy.orm import joinedload
+from sqlalchemy.exc import IntegrityError
 from datetime import datetime
 from marshmallow import ValidationError 
 
 from app.extensions import db
 from app.models.cart import Cart, CartItem
 from app.models.phone import Phone
-from app.schemas import cart_schema_output, cart_item_input_schema, cart_item_update_schema 
+from app.schemas import cart_schema_output, cart_serializer, cart_item_input_schema, cart_item_update_schema, cart_batch_schema
+from app.schemas.cart_schema import CART_BATCH_OP_ADD, CART_BATCH_OP_SET
 from app.utils.decorators import buyer_required
-from app.utils.helpers import get_or_create_user_cart
+from app.utils.helpers import resolve_user_cart, load_cart_for_read
+from app.utils.cart_totals import adjust_cart_totals, refresh_cart_totals, reset_cart_totals
+from app.utils.idempotency import abort_transient, idempotent
+from app.utils.conditional import conditional_json, make_etag, latest
+from app.utils.query_budget import declare_query_budgets
+from app.utils.db_routing import primary_db
 import traceback
 
 cart_bp = Blueprint('cart_bp', __name__)
 
+# Số câu SQL tối đa cho mỗi request (kiểm tra: python -m benchmarks.query_budgets).
+declare_query_budgets(cart_bp, {
+    'add_item_to_cart_route': 9,  # + giữ khóa/lưu phản hồi khi có Idempotency-Key
+    'batch_update_cart_items_route': 10,  # không phụ thuộc số thao tác (insert/update/delete theo lô)
+    'update_cart_item_route': 6,
+    'view_cart_route': 3,
+    'view_cart_summary_route': 3,  # 1 khi tạm tính còn hợp lệ; + UPDATE/SELECT lại sau khi phone đổi giá
+    'remove_cart_item_route': 6,
+    'clear_cart_route': 6,
+})
+
 
 @cart_bp.route('/items', methods=['POST', 'OPTIONS'])
 @jwt_required()
 @buyer_required
+@idempotent
 def add_item_to_cart_route():
     if request.method == 'OPTIONS':
         return current_app.make_default_options_response()
 
     current_user_id = int(get_jwt_identity())
-    current_app.logger.info(f"add_item_to_cart_route: User ID {current_user_id} đang thêm item.")
-    cart = get_or_create_user_cart(current_user_id)
+    cart = resolve_user_cart()
 
     json_data = request.get_json()
     if not json_data:
@@ -43,7 +63,7 @@ def add_item_to_cart_route():
         abort(404, description=f"Sản phẩm với ID {phone_id_to_add} không tồn tại.")
 
     if phone.stock_quantity == 0 :
-         abort(400, description=f"Sản phẩm '{phone.model_name}' đã hết hàng.")
+         abort_transient(400, f"Sản phẩm '{phone.model_name}' đã hết hàng.")
 
     cart_item = CartItem.query.filter_by(cart_id=cart.id, phone_id=phone.id).first()
 
@@ -52,15 +72,17 @@ def add_item_to_cart_route():
         if phone.stock_quantity < new_quantity:
             can_add = phone.stock_quantity - cart_item.quantity
             if can_add <=0 :
-                 abort(400, description=f"Không thể thêm '{phone.model_name}'. Đã có {cart_item.quantity} trong giỏ. Tồn kho chỉ còn {phone.stock_quantity}.")
+                 abort_transient(400, f"Không thể thêm '{phone.model_name}'. Đã có {cart_item.quantity} trong giỏ. Tồn kho chỉ còn {phone.stock_quantity}.")
             else:
-                 abort(400, description=f"Không đủ tồn kho cho '{phone.model_name}'. Bạn có thể thêm tối đa {can_add} sản phẩm nữa.")
+                 abort_transient(400, f"Không đủ tồn kho cho '{phone.model_name}'. Bạn có thể thêm tối đa {can_add} sản phẩm nữa.")
         cart_item.quantity = new_quantity
+        adjust_cart_totals(cart, quantity=quantity_to_add, amount=quantity_to_add * phone.price)
     else: 
         if phone.stock_quantity < quantity_to_add:
-            abort(400, description=f"Không đủ tồn kho cho '{phone.model_name}'. Yêu cầu: {quantity_to_add}, chỉ còn: {phone.stock_quantity}.")
+            abort_transient(400, f"Không đủ tồn kho cho '{phone.model_name}'. Yêu cầu: {quantity_to_add}, chỉ còn: {phone.stock_quantity}.")
         cart_item = CartItem(cart_id=cart.id, phone_id=phone.id, quantity=quantity_to_add)
         db.session.add(cart_item)
+        adjust_cart_totals(cart, lines=1, quantity=quantity_to_add, amount=quantity_to_add * phone.price)
 
     cart.updated_at = datetime.utcnow()
     
@@ -72,7 +94,108 @@ def add_item_to_cart_route():
         current_app.logger.error(traceback.format_exc())
         abort(500, description="Lỗi máy chủ khi cập nhật giỏ hàng.")
     
-    return jsonify(cart_schema_output.dump(cart)), 200
+    return jsonify(cart_serializer.dump(load_cart_for_read(cart))), 200
+
+@cart_bp.route('/items', methods=['PATCH'])
+@jwt_required()
+@buyer_required
+def batch_update_cart_items_route():
+    """Áp dụng nhiều thao tác add/set/remove lên giỏ trong một transaction; lỗi ở bất kỳ thao tác nào -> không đổi gì."""
+    json_data = request.get_json(silent=True)
+    if not json_data:
+        abort(400, description="Không có dữ liệu đầu vào.")
+    try:
+        operations = cart_batch_schema.load(json_data)['operations']
+    except ValidationError as err:
+        abort(400, description=err.messages)
+    max_operations = current_app.config.get('CART_BATCH_MAX_OPERATIONS', 100)
+    if len(operations) > max_operations:
+        abort(400, description=f"Tối đa {max_operations} thao tác trong một yêu cầu.")
+
+    cart = resolve_user_cart()
+    items_by_phone = {item.phone_id: item for item in CartItem.query.filter_by(cart_id=cart.id)}
+    items_by_id = {item.id: item for item in items_by_phone.values()}
+
+    # Áp dụng lần lượt trên bản sao số lượng (phone_id -> quantity), chưa ghi gì vào CSDL.
+    quantities = {phone_id: item.quantity for phone_id, item in items_by_phone.items()}
+    touched_phone_ids = []
+    errors = []
+    for index, operation in enumerate(operations):
+        phone_id = operation.get('phone_id')
+        if 'cart_item_id' in operation:
+            item = items_by_id.get(operation['cart_item_id'])
+            if item is None:
+                errors.append({'operation': index, 'message': f"Mục hàng với ID {operation['cart_item_id']} không tìm thấy trong giỏ của bạn."})
+                continue
+            phone_id = item.phone_id
+
+        if operation['op'] == CART_BATCH_OP_ADD:
+            quantities[phone_id] = quantities.get(phone_id, 0) + operation['quantity']
+        elif operation['op'] == CART_BATCH_OP_SET:
+            quantities[phone_id] = operation['quantity']
+        else:
+            if not quantities.get(phone_id):
+                errors.append({'operation': index, 'message': f"Sản phẩm ID {phone_id} không có trong giỏ hàng."})
+                continue
+            quantities[phone_id] = 0
+        if phone_id not in touched_phone_ids:
+            touched_phone_ids.append(phone_id)
+
+    # Kiểm tra tồn kho cho mọi phone được đụng tới bằng một truy vấn.
+    phones = {phone.id: phone for phone in db.session.execute(
+        select(Phone.id, Phone.model_name, Phone.price, Phone.stock_quantity).where(Phone.id.in_(touched_phone_ids)))}
+    for phone_id in touched_phone_ids:
+        quantity = quantities[phone_id]
+        if quantity <= 0:
+            continue
+        phone = phones.get(phone_id)
+        if phone is None:
+            errors.append({'phone_id': phone_id, 'message': f"Sản phẩm với ID {phone_id} không tồn tại."})
+        elif phone.stock_quantity == 0:
+            errors.append({'phone_id': phone_id, 'message': f"Sản phẩm '{phone.model_name}' đã hết hàng."})
+        elif phone.stock_quantity < quantity:
+            errors.append({'phone_id': phone_id, 'message': f"Không đủ tồn kho cho '{phone.model_name}'. Yêu cầu: {quantity}, chỉ còn: {phone.stock_quantity}."})
+    if errors:
+        abort(400, description=errors)
+
+    new_rows = []
+    line_delta = quantity_delta = 0
+    amount_delta = 0.0
+    for phone_id in touched_phone_ids:
+        quantity, item = max(quantities[phone_id], 0), items_by_phone.get(phone_id)
+        old_quantity = item.quantity if item is not None else 0
+        if item is None:
+            if quantity > 0:
+                new_rows.append({'cart_id': cart.id, 'phone_id': phone_id, 'quantity': quantity})
+                line_delta += 1
+        elif quantity == 0:
+            db.session.delete(item)
+            line_delta -= 1
+        elif item.quantity != quantity:
+            item.quantity = quantity
+        quantity_delta += quantity - old_quantity
+        if quantity != old_quantity and amount_delta is not None:
+            phone = phones.get(phone_id)
+            amount_delta = amount_delta + (quantity - old_quantity) * phone.price if phone is not None else None
+    adjust_cart_totals(cart, lines=line_delta, quantity=quantity_delta, amount=amount_delta)
+    cart.updated_at = datetime.utcnow()
+
+    try:
+        if new_rows:
+            # Một câu INSERT executemany (ORM sẽ INSERT ... RETURNING từng dòng trên SQLite).
+            db.session.execute(insert(CartItem), new_rows)
+        db.session.commit()
+    except IntegrityError:
+        db.session.rollback()
+        abort(409, description="Giỏ hàng vừa được thay đổi bởi một yêu cầu khác. Vui lòng thử lại.")
+    except Exception as e:
+        db.session.rollback()
+        current_app.logger.error(f"Lỗi khi commit thao tác hàng loạt cho cart {cart.id}: {str(e)}")
+        current_app.logger.error(traceback.format_exc())
+        abort(500, description="Lỗi máy chủ khi cập nhật giỏ hàng.")
+
+    return jsonify(message=f"Đã áp dụng {len(operations)} thao tác cho giỏ hàng.",
+                   cart=cart_serializer.dump(load_cart_for_read(cart))), 200
 
 @cart_bp.route('/items/<int:cart_item_id>', methods=['PUT', 'OPTIONS'])
 @jwt_required()
@@ -82,12 +205,13 @@ def update_cart_item_route(cart_item_id):
         return current_app.make_default_options_response()
 
     current_user_id = int(get_jwt_identity())
-    cart = Cart.query.filter_by(user_id=current_user_id).first()
+    cart = resolve_user_cart(create=False)
     if not cart:
         current_app.logger.warning(f"update_cart_item_route: Không tìm thấy giỏ hàng cho user {current_user_id} khi cập nhật item {cart_item_id}.")
         abort(404, description="Không tìm thấy giỏ hàng cho người dùng này.")
 
-    cart_item = CartItem.query.filter_by(id=cart_item_id, cart_id=cart.id).first()
+    cart_item = CartItem.query.options(joinedload(CartItem.phone))\
+                              .filter_by(id=cart_item_id, cart_id=cart.id).first()
     if not cart_item:
         abort(404, description=f"Mục hàng với ID {cart_item_id} không tìm thấy trong giỏ của bạn.")
 
@@ -105,6 +229,8 @@ def update_cart_item_route(cart_item_id):
 
     if new_quantity <= 0: 
         db.session.delete(cart_item)
+        adjust_cart_totals(cart, lines=-1, quantity=-cart_item.quantity,
+                           amount=-cart_item.quantity * cart_item.phone.price if cart_item.phone else None)
         message = f"Mục hàng ID {cart_item_id} đã được xóa khỏi giỏ hàng do số lượng cập nhật là {new_quantity}."
     else:
         phone = cart_item.phone 
@@ -115,6 +241,8 @@ def update_cart_item_route(cart_item_id):
         
         if phone.stock_quantity < new_quantity:
             abort(400, description=f"Không đủ tồn kho cho '{phone.model_name}'. Yêu cầu: {new_quantity}, còn: {phone.stock_quantity}.")
+        quantity_delta = new_quantity - cart_item.quantity
+        adjust_cart_totals(cart, quantity=quantity_delta, amount=quantity_delta * phone.price)
         cart_item.quantity = new_quantity
         message = f"Đã cập nhật số lượng cho mục hàng ID {cart_item_id} thành {new_quantity}."
 
@@ -127,20 +255,60 @@ def update_cart_item_route(cart_item_id):
         current_app.logger.error(traceback.format_exc())
         abort(500, description="Lỗi máy chủ khi cập nhật mục trong giỏ hàng.")
     
-    return jsonify(message=message, cart=cart_schema_output.dump(cart)), 200
+    return jsonify(message=message, cart=cart_serializer.dump(load_cart_for_read(cart))), 200
 
 
 
 @cart_bp.route('/', methods=['GET', 'OPTIONS'])
+@primary_db  # có thể tạo giỏ hàng mới; người mua cần thấy ngay thay đổi vừa thực hiện
 @jwt_required()
 @buyer_required
 def view_cart_route():
     if request.method == 'OPTIONS':
         return current_app.make_default_options_response()
 
+    cart = resolve_user_cart()
+
+    # Phiên bản giỏ hàng = cart.updated_at + số mục + thời điểm cập nhật mới nhất của các phone trong giỏ.
+    item_count, phones_updated_at = db.session.query(func.count(CartItem.id), func.max(Phone.updated_at))\
+        .outerjoin(Phone, CartItem.phone_id == Phone.id)\
+        .filter(CartItem.cart_id == cart.id).one()
+    etag = make_etag('cart', cart.id, cart.updated_at, item_count, phones_updated_at)
+    return conditional_json(etag, latest(cart.updated_at, phones_updated_at),
+                            lambda: cart_serializer.dump(load_cart_for_read(cart)), cache_control='private, no-cache')
+
+@cart_bp.route('/summary', methods=['GET', 'OPTIONS'])
+@primary_db  # badge phải thấy ngay thay đổi giỏ hàng vừa thực hiện
+@jwt_required()
+@buyer_required
+def view_cart_summary_route():
+    """Số mục, tổng số lượng và tạm tính của giỏ: đọc một dòng carts (tổng được duy trì), không nạp phone.
+
+    Hỗ trợ If-None-Match. Không gửi Last-Modified: đổi giá phone làm đổi tạm tính mà không đổi carts.updated_at.
+    """
+    if request.method == 'OPTIONS':
+        return current_app.make_default_options_response()
+
     current_user_id = int(get_jwt_identity())
-    cart = get_or_create_user_cart(current_user_id)
-    return jsonify(cart_schema_output.dump(cart)), 200
+    summary_query = select(Cart.id, Cart.item_count, Cart.total_quantity, Cart.subtotal, Cart.updated_at)\
+        .where(Cart.user_id == current_user_id)
+    summary = db.session.execute(summary_query).first()
+    if summary is not None and summary.subtotal is None:
+        # Giá của một phone trong giỏ vừa đổi: tính lại từ cart_items rồi đọc lại.
+        refresh_cart_totals([summary.id], stale_only=True)
+        db.session.commit()
+        summary = db.session.execute(summary_query).first()
+
+    if summary is None:  # chưa có giỏ: không tạo chỉ để trả về số 0
+        etag = make_etag('cart-summary', current_user_id)
+        body = {'item_count': 0, 'total_quantity': 0, 'subtotal': 0, 'updated_at': None}
+    else:
+        etag = make_etag('cart-summary', summary.id, summary.updated_at, summary.item_count,
+                         summary.total_quantity, summary.subtotal)
+        body = {'item_count': summary.item_count, 'total_quantity': summary.total_quantity,
+                'subtotal': round(summary.subtotal, 2),
+                'updated_at': summary.updated_at.isoformat() if summary.updated_at else None}
+    return conditional_json(etag, None, lambda: body, cache_control='private, no-cache')
 
 @cart_bp.route('/items/<int:cart_item_id>', methods=['DELETE', 'OPTIONS'])
 @jwt_required()
@@ -150,15 +318,18 @@ def remove_cart_item_route(cart_item_id):
         return current_app.make_default_options_response()
         
     current_user_id = int(get_jwt_identity())
-    cart = Cart.query.filter_by(user_id=current_user_id).first()
+    cart = resolve_user_cart(create=False)
     if not cart:
          abort(404, description="Không tìm thấy giỏ hàng.")
 
-    cart_item = CartItem.query.filter_by(id=cart_item_id, cart_id=cart.id).first()
+    cart_item = CartItem.query.options(joinedload(CartItem.phone))\
+                              .filter_by(id=cart_item_id, cart_id=cart.id).first()
     if not cart_item:
         abort(404, description=f"Mục hàng với ID {cart_item_id} không tìm thấy trong giỏ của bạn.")
 
     db.session.delete(cart_item)
+    adjust_cart_totals(cart, lines=-1, quantity=-cart_item.quantity,
+                       amount=-cart_item.quantity * cart_item.phone.price if cart_item.phone else None)
     cart.updated_at = datetime.utcnow()
     try:
         db.session.commit()
@@ -168,7 +339,7 @@ def remove_cart_item_route(cart_item_id):
         current_app.logger.error(traceback.format_exc())
         abort(500, description="Lỗi máy chủ khi xóa mục khỏi giỏ hàng.")
     
-    return jsonify(message=f"Mục hàng ID {cart_item_id} đã được xóa khỏi giỏ.", cart=cart_schema_output.dump(cart)), 200
+    return jsonify(message=f"Mục hàng ID {cart_item_id} đã được xóa khỏi giỏ.", cart=cart_serializer.dump(load_cart_for_read(cart))), 200
 
 @cart_bp.route('/', methods=['DELETE', 'OPTIONS'])
 @jwt_required()
@@ -178,11 +349,12 @@ def clear_cart_route():
         return current_app.make_default_options_response()
 
     current_user_id = int(get_jwt_identity())
-    cart = Cart.query.filter_by(user_id=current_user_id).first()
+    cart = resolve_user_cart(create=False)
 
     if cart: 
-        if cart.items.first(): 
+        if not cart.is_empty(): 
             CartItem.query.filter_by(cart_id=cart.id).delete() 
+            reset_cart_totals(cart)
             cart.updated_at = datetime.utcnow()
             try:
                 db.session.commit()
@@ -192,10 +364,10 @@ def clear_cart_route():
                 current_app.logger.error(traceback.format_exc())
                 abort(500, description="Lỗi máy chủ khi xóa giỏ hàng.")
             
-            return jsonify(message="Giỏ hàng đã được dọn sạch.", cart=cart_schema_output.dump(cart)), 200
+            return jsonify(message="Giỏ hàng đã được dọn sạch.", cart=cart_serializer.dump(load_cart_for_read(cart))), 200
         else: 
-            return jsonify(message="Giỏ hàng đã trống.", cart=cart_schema_output.dump(cart)), 200
+            return jsonify(message="Giỏ hàng đã trống.", cart=cart_serializer.dump(load_cart_for_read(cart))), 200
     else: 
         current_app.logger.warning(f"clear_cart_route: Không tìm thấy giỏ hàng cho user {current_user_id} để xóa.")
-        empty_cart_for_schema = {'id': None, 'user_id': current_user_id, 'items': [], 'total_price': 0, 'created_at': None, 'updated_at': None}
+        empty_cart_for_schema = {'id': None, 'user_id': current_user_id, 'items': [], 'total_price': 0, 'item_count': 0, 'total_quantity': 0, 'created_at': None, 'updated_at': None}
         return jsonify(message="Không tìm thấy giỏ hàng (hoặc đã trống).", cart=cart_schema_output.dump(empty_cart_for_schema)), 200
\ No newline at end of file
@@ -1,61 +1,129 @@
 # phone_management_api/app/routes/order_routes.py
 from flask import Blueprint, request, jsonify, abort, current_app, url_for
-from sqlalchemy import desc, asc
+from sqlalchemy import desc, asc, func, update, insert, bindparam
+from sqlalchemy.orm import load_only
 from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt
-from datetime import datetime
+from datetime import datetime, timezone
 
 from app.extensions import db
 from app.models.order import (
-    Order, OrderItem, ALLOWED_ORDER_STATUSES, ORDER_STATUS_PENDING, 
+    Order, OrderItem, OrderSeller, ALLOWED_ORDER_STATUSES, ORDER_STATUS_PENDING, 
     ORDER_STATUS_CANCELLED, ORDER_STATUS_SHIPPED, ORDER_STATUS_DELIVERED, 
     ORDER_STATUS_PROCESSING, ORDER_STATUS_FAILED 
 )
-from app.models.cart import Cart, CartItem
+from app.models.cart import CartItem
 from app.models.phone import Phone
 from app.schemas import (
-    order_schema_output, orders_schema_output, 
+    order_schema_output, order_serializer, orders_serializer,
     order_create_schema_input, order_status_update_schema_input
 )
 from app.utils.decorators import buyer_required, seller_or_admin_required
+from app.utils.cache import invalidate_phone_cache
+from app.utils.conditional import conditional_json, make_etag, latest
+from app.utils.db_routing import primary_db
+from app.utils.helpers import load_order_for_read, resolve_user_cart
+from app.utils.cart_totals import reset_cart_totals
+from app.utils.idempotency import abort_transient, idempotent
+from app.utils.query_budget import declare_query_budgets
+from app.utils.read_rows import order_rows, build_order_rows
+from app.utils.fieldsets import requested_fields, fields_etag_part
 
 orders_bp = Blueprint('orders_bp', __name__)
 
+# Số câu SQL tối đa cho mỗi request (kiểm tra: python -m benchmarks.query_budgets).
+declare_query_budgets(orders_bp, {
+    'create_order_route': 16,  # + giữ khóa/lưu phản hồi khi có Idempotency-Key
+    'get_orders_list_route': 4,
+    'get_order_details_route': 5,
+    'update_order_status_route': 10,
+    'cancel_order_route': 12,
+})
+
+
+class InsufficientStockError(Exception):
+    pass
+
+
+def _insufficient_stock_message(cart_lines):
+    stock_by_phone = dict(db.session.query(Phone.id, Phone.stock_quantity)
+                          .filter(Phone.id.in_([line.phone_id for line in cart_lines])).all())
+    for line in cart_lines:
+        in_stock = stock_by_phone.get(line.phone_id, 0)
+        if in_stock < line.quantity:
+            return f"Không đủ tồn kho cho '{line.model_name}'. Yêu cầu: {line.quantity}, còn: {in_stock}."
+    return "Tồn kho đã thay đổi trong lúc đặt hàng. Vui lòng thử lại."
+
+
+def _is_seller_order(order_id, seller_id):
+    return db.session.query(OrderSeller.order_id)\
+                     .filter_by(order_id=order_id, seller_id=seller_id).first() is not None
+
+def _reserve_stock(cart_lines):
+    """Trừ kho có điều kiện, nguyên tử theo từng dòng: hai checkout đồng thời không thể cùng vượt tồn kho.
+
+    Trả về False nếu có dòng không còn đủ hàng (caller rollback).
+    """
+    stock_update = update(Phone.__table__)\
+        .where(Phone.__table__.c.id == bindparam('line_phone_id'),
+               Phone.__table__.c.stock_quantity >= bindparam('line_quantity'))\
+        .values(stock_quantity=Phone.__table__.c.stock_quantity - bindparam('line_quantity'),
+                updated_at=datetime.now(timezone.utc))
+    params = [{'line_phone_id': line.phone_id, 'line_quantity': line.quantity} for line in cart_lines]
+    if db.session.get_bind().dialect.supports_sane_multi_rowcount:
+        return db.session.execute(stock_update, params).rowcount == len(params)
+    # rowcount của executemany không đáng tin trên driver này (vd. psycopg2): một UPDATE mỗi dòng.
+    return all(db.session.execute(stock_update, line_params).rowcount == 1 for line_params in params)
+
+def _restore_order_stock(order_id):
+    """Hoàn tồn kho cho mọi dòng của đơn bằng một UPDATE executemany; trả về các phone_id bị ảnh hưởng."""
+    order_lines = db.session.query(OrderItem.phone_id, OrderItem.quantity).filter_by(order_id=order_id).all()
+    if order_lines:
+        stock_restore = update(Phone.__table__)\
+            .where(Phone.__table__.c.id == bindparam('line_phone_id'))\
+            .values(stock_quantity=Phone.__table__.c.stock_quantity + bindparam('line_quantity'),
+                    updated_at=datetime.now(timezone.utc))
+        db.session.execute(stock_restore, [
+            {'line_phone_id': line.phone_id, 'line_quantity': line.quantity} for line in order_lines
+        ])
+    return [line.phone_id for line in order_lines]
+
 @orders_bp.route('/', methods=['POST'])
 @jwt_required()
 @buyer_required
+@idempotent
 def create_order_route():
     current_user_id = int(get_jwt_identity())
-    cart = Cart.query.filter_by(user_id=current_user_id).first()
+    cart = resolve_user_cart(create=False)
 
-    if not cart or cart.is_empty():
-        abort(400, description="Giỏ hàng trống. Không thể tạo đơn hàng.")
+    if not cart:
+        abort_transient(400, "Giỏ hàng trống. Không thể tạo đơn hàng.")
 
     json_data = request.get_json()
     order_input_data = order_create_schema_input.load(json_data if json_data else {})
     shipping_address = order_input_data['shipping_address']
 
-    items_to_order_details = []
+    # Một truy vấn cho toàn bộ dòng trong giỏ kèm giá/tồn kho hiện tại của phone.
+    cart_lines = db.session.query(
+        CartItem.phone_id, CartItem.quantity, Phone.id.label('existing_phone_id'),
+        Phone.model_name, Phone.price, Phone.stock_quantity, Phone.user_id.label('seller_id')
+    ).outerjoin(Phone, CartItem.phone_id == Phone.id)\
+     .filter(CartItem.cart_id == cart.id).order_by(CartItem.phone_id).all()
+    if not cart_lines:
+        abort_transient(400, "Giỏ hàng trống. Không thể tạo đơn hàng.")
+
     calculated_total_amount = 0.0 
+    for line in cart_lines:
+        if line.existing_phone_id is None:
+            abort_transient(400, f"Sản phẩm ID {line.phone_id} trong giỏ không còn tồn tại.")
+        if line.stock_quantity < line.quantity:
+            abort_transient(400, f"Không đủ tồn kho cho '{line.model_name}'. Yêu cầu: {line.quantity}, còn: {line.stock_quantity}.")
+        calculated_total_amount += float(line.quantity) * float(line.price)
+    calculated_total_amount = round(calculated_total_amount, 2)
 
     try:
         with db.session.begin_nested(): 
-            for cart_item in cart.items.all():
-                phone = Phone.query.get(cart_item.phone_id) 
-
-                if not phone:
-                    raise ValueError(f"Sản phẩm ID {cart_item.phone_id} trong giỏ không còn tồn tại.") 
-                
-                if phone.stock_quantity < cart_item.quantity:
-                    raise ValueError(f"Không đủ tồn kho cho '{phone.model_name}'. Yêu cầu: {cart_item.quantity}, còn: {phone.stock_quantity}.")
-
-                items_to_order_details.append({
-                    "phone_model_instance": phone,
-                    "quantity": cart_item.quantity,
-                    "price_at_purchase": float(phone.price) 
-                })
-                calculated_total_amount += float(cart_item.quantity) * float(phone.price)
-            
-            calculated_total_amount = round(calculated_total_amount, 2)
+            if not _reserve_stock(cart_lines):
+                raise InsufficientStockError()
 
             new_order = Order(
                 user_id=current_user_id,
@@ -66,45 +134,46 @@ def create_order_route():
             db.session.add(new_order)
             db.session.flush() 
 
-            for item_detail in items_to_order_details:
-                phone_to_update = item_detail["phone_model_instance"]
-                order_item = OrderItem(
-                    order_id=new_order.id,
-                    phone_id=phone_to_update.id,
-                    quantity=item_detail["quantity"],
-                    price_at_purchase=item_detail["price_at_purchase"]
-                )
-                db.session.add(order_item)
-                phone_to_update.stock_quantity -= item_detail["quantity"]
-                db.session.add(phone_to_update)
+            db.session.execute(insert(OrderItem), [
+                {'order_id': new_order.id, 'phone_id': line.phone_id, 'quantity': line.quantity,
+                 'price_at_purchase': float(line.price)}
+                for line in cart_lines
+            ])
+            db.session.execute(insert(OrderSeller), [
+                {'order_id': new_order.id, 'seller_id': seller_id}
+                for seller_id in sorted({line.seller_id for line in cart_lines})
+            ])
 
             CartItem.query.filter_by(cart_id=cart.id).delete(synchronize_session=False) # Thêm synchronize_session
+            reset_cart_totals(cart)
             cart.updated_at = datetime.utcnow()
         
         db.session.commit()
-    except ValueError as ve: 
+    except InsufficientStockError:
         db.session.rollback()
-        abort(400, description=str(ve))
+        abort(409, description=_insufficient_stock_message(cart_lines))
     except Exception as e:
         db.session.rollback()
         current_app.logger.error(f"Lỗi nghiêm trọng khi tạo đơn hàng cho user {current_user_id}: {str(e)}")
         abort(500, description="Lỗi máy chủ khi tạo đơn hàng. Vui lòng thử lại.")
 
-    return jsonify(order_schema_output.dump(new_order)), 201
+    invalidate_phone_cache(*(line.phone_id for line in cart_lines))
+    return jsonify(order_serializer.dump(load_order_for_read(new_order.id))), 201
 
 @orders_bp.route('/', methods=['GET'])
+@primary_db  # người mua chuyển sang danh sách đơn ngay sau khi đặt hàng: phải thấy đơn vừa tạo
 @jwt_required()
 def get_orders_list_route():
     current_user_id = int(get_jwt_identity())
     current_user_role = get_jwt().get("role")
+    fields = requested_fields(order_schema_output)
     query = Order.query
 
     if current_user_role == 'buyer':
         query = query.filter(Order.user_id == current_user_id)
     elif current_user_role == 'seller':
-        query = query.join(OrderItem, Order.id == OrderItem.order_id)\
-                     .join(Phone, OrderItem.phone_id == Phone.id)\
-                     .filter(Phone.user_id == current_user_id).distinct()
+        query = query.join(OrderSeller, Order.id == OrderSeller.order_id)\
+                     .filter(OrderSeller.seller_id == current_user_id)
 
     status_filter = request.args.get('status')
     if status_filter:
@@ -124,6 +193,8 @@ def get_orders_list_route():
     if order_dir not in ['asc', 'desc']: 
         abort(400, description="Thứ tự sắp xếp không hợp lệ, chỉ chấp nhận 'asc' hoặc 'desc'.")
     query = query.order_by(desc(sort_column) if order_dir == 'desc' else asc(sort_column))
+    # Row chỉ đọc gồm các cột theo 'fields'; user/items được gắn sau khi phân trang.
+    query = order_rows(query, fields)
 
     try:
         page = request.args.get('page', 1, type=int)
@@ -148,7 +219,7 @@ def get_orders_list_route():
         prev_url = url_for(request.endpoint, _external=False, **prev_params)
 
     return jsonify({
-        "data": orders_schema_output.dump(paginated_orders.items),
+        "data": orders_serializer.only(fields).dump(build_order_rows(paginated_orders.items, fields)),
         "meta": {"page": paginated_orders.page, "per_page": paginated_orders.per_page,
                  "total_pages": paginated_orders.pages, "total_items": paginated_orders.total,
                  "next_page_url": next_url, "prev_page_url": prev_url, 
@@ -156,22 +227,31 @@ def get_orders_list_route():
     }), 200
 
 @orders_bp.route('/<int:order_id>', methods=['GET'])
+@primary_db  # đơn vừa tạo / vừa đổi trạng thái phải đọc được ngay
 @jwt_required()
 def get_order_details_route(order_id):
     current_user_id = int(get_jwt_identity())
     current_user_role = get_jwt().get("role")
     
-    order = Order.query.get_or_404(order_id, description=f"Đơn hàng ID {order_id} không tìm thấy.")
+    fields = requested_fields(order_schema_output)
+    # Chỉ nạp các cột cần cho phân quyền/ETag; nội dung được nạp theo 'fields' khi cần serialize.
+    order = Order.query.options(load_only(Order.id, Order.user_id, Order.status, Order.updated_at))\
+                       .get_or_404(order_id, description=f"Đơn hàng ID {order_id} không tìm thấy.")
 
     if current_user_role == 'buyer' and order.user_id != current_user_id:
         abort(403, description="Bạn không có quyền xem chi tiết đơn hàng này.")
     elif current_user_role == 'seller':
-        is_seller_order = OrderItem.query.join(Phone, OrderItem.phone_id == Phone.id)\
-                                     .filter(OrderItem.order_id == order.id, Phone.user_id == current_user_id).first()
-        if not is_seller_order:
+        if not _is_seller_order(order.id, current_user_id):
             abort(403, description="Đơn hàng này không chứa sản phẩm nào của bạn.")
-    
-    return jsonify(order_schema_output.dump(order)), 200
+
+    item_count, phones_updated_at = db.session.query(func.count(OrderItem.id), func.max(Phone.updated_at))\
+        .outerjoin(Phone, OrderItem.phone_id == Phone.id)\
+        .filter(OrderItem.order_id == order.id).one()
+    etag = make_etag('order', order.id, order.updated_at, order.status, item_count, phones_updated_at,
+                     fields_etag_part(fields))
+    return conditional_json(etag, latest(order.updated_at, phones_updated_at),
+                            lambda: order_serializer.only(fields).dump(load_order_for_read(order.id, fields)),
+                            cache_control='private, no-cache')
 
 @orders_bp.route('/<int:order_id>/status', methods=['PUT'])
 @jwt_required()
@@ -183,9 +263,7 @@ def update_order_status_route(order_id):
     order = Order.query.get_or_404(order_id, description=f"Đơn hàng ID {order_id} không tìm thấy.")
 
     if current_user_role == 'seller':
-        is_seller_order = OrderItem.query.join(Phone, OrderItem.phone_id == Phone.id)\
-                                     .filter(OrderItem.order_id == order.id, Phone.user_id == current_user_id).first()
-        if not is_seller_order:
+        if not _is_seller_order(order.id, current_user_id):
             abort(403, description="Bạn không có quyền cập nhật trạng thái cho đơn hàng này.")
 
     json_data = request.get_json()
@@ -207,11 +285,7 @@ def update_order_status_route(order_id):
     if new_status == ORDER_STATUS_CANCELLED and order.status not in [ORDER_STATUS_CANCELLED, ORDER_STATUS_DELIVERED, ORDER_STATUS_FAILED]:
         try:
             with db.session.begin_nested():
-                for item in order.items:
-                    phone = item.phone
-                    if phone:
-                        phone.stock_quantity += item.quantity
-                        db.session.add(phone)
+                restored_phone_ids = _restore_order_stock(order.id)
                 order.status = new_status
                 order.updated_at = datetime.utcnow()
                 stock_reverted_message = " Tồn kho đã được hoàn lại."
@@ -220,16 +294,18 @@ def update_order_status_route(order_id):
             db.session.rollback()
             current_app.logger.error(f"Lỗi khi hoàn kho và hủy đơn {order_id} qua update status: {str(e)}")
             abort(500, description="Lỗi khi cập nhật trạng thái và hoàn kho.")
+        invalidate_phone_cache(*restored_phone_ids)
     else:
         order.status = new_status
         order.updated_at = datetime.utcnow()
         db.session.commit()
 
     return jsonify(message=f"Cập nhật trạng thái đơn hàng thành công.{stock_reverted_message}", 
-                   order=order_schema_output.dump(order)), 200
+                   order=order_serializer.dump(load_order_for_read(order.id))), 200
 
 @orders_bp.route('/<int:order_id>/cancel', methods=['POST'])
 @jwt_required()
+@idempotent
 def cancel_order_route(order_id):
     current_user_id = int(get_jwt_identity())
     current_user_role = get_jwt().get("role")
@@ -253,16 +329,11 @@ def cancel_order_route(order_id):
          abort(403, description="Bạn không có quyền hủy đơn hàng này hoặc đơn hàng không ở trạng thái cho phép hủy.")
 
     if order.status == ORDER_STATUS_CANCELLED:
-        return jsonify(message="Đơn hàng này đã được hủy trước đó.", order=order_schema_output.dump(order)), 400
+        return jsonify(message="Đơn hàng này đã được hủy trước đó.", order=order_serializer.dump(load_order_for_read(order.id))), 400
     
     try:
         with db.session.begin_nested():
-            for item in order.items:
-                phone = item.phone
-                if phone:
-                    phone.stock_quantity += item.quantity
-                    db.session.add(phone)
-            
+            restored_phone_ids = _restore_order_stock(order.id)
             order.status = ORDER_STATUS_CANCELLED
             order.updated_at = datetime.utcnow()
         db.session.commit()
@@ -270,5 +341,6 @@ def cancel_order_route(order_id):
         db.session.rollback()
         current_app.logger.error(f"Lỗi khi hủy đơn hàng {order_id}: {str(e)}")
         abort(500, description=f"Lỗi máy chủ khi cố gắng hủy đơn hàng. Thay đổi đã được hoàn tác.")
+    invalidate_phone_cache(*restored_phone_ids)
 
-    return jsonify(message="Đơn hàng đã được hủy thành công và tồn kho đã được cập nhật.", order=order_schema_output.dump(order)), 200
\ No newline at end of file
+    return jsonify(message="Đơn hàng đã được hủy thành công và tồn kho đã được cập nhật.", order=order_serializer.dump(load_order_for_read(order.id))), 200
\ No newline at end of file
@@ -1,28 +1,63 @@
 # phone_management_api/app/routes/phone_routes.py
 from flask import Blueprint, request, jsonify, current_app, url_for, abort
 from sqlalchemy import asc, desc
+from sqlalchemy.orm import load_only
 from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt, verify_jwt_in_request
 from marshmallow import ValidationError
 
 from app.extensions import db
 from app.models.phone import Phone
-from app.schemas import phone_schema, phones_schema 
-from app.utils.decorators import seller_or_admin_required
+from app.schemas import phone_schema, phone_serializer, phones_serializer
+from app.utils.decorators import seller_or_admin_required, admin_required
+from app.utils.cache import cached_response, invalidate_phone_cache, phone_tag, PHONE_LIST_TAG
+from app.utils.pagination import keyset_paginate
+from app.utils.search import apply_search
+from app.utils.conditional import conditional_json, make_etag
+from app.utils.bulk_import import (
+    iter_ndjson_rows, iter_csv_rows, import_phone_rows, BULK_FORMAT_NDJSON, BULK_FORMAT_CSV
+)
+from app.utils.query_budget import declare_query_budgets
+from app.utils.read_rows import PHONE_FIELD_COLUMNS, phone_rows, select_columns, to_phone_rows
+from app.utils.fieldsets import requested_fields, fields_etag_part
+from app.utils.db_routing import primary_db
+from app.utils.facets import compute_facets
+from app.utils.cart_totals import invalidate_cart_subtotals
 
 phones_bp = Blueprint('phones_bp', __name__)
 
-@phones_bp.route('/', methods=['GET', 'OPTIONS'])
-def handle_get_or_options_phones():
-    if request.method == 'OPTIONS':
-        return jsonify(success=True), 200
+# Số câu SQL tối đa cho mỗi request (kiểm tra: python -m benchmarks.query_budgets).
+declare_query_budgets(phones_bp, {
+    'handle_get_or_options_phones': 3,  # + kiểm tra chỉ mục tìm kiếm ở lần search đầu tiên
+    'create_phone_route': 4,
+    'bulk_create_phones_route': None,  # tỷ lệ với số lô (BULK_IMPORT_CHUNK_SIZE), không cố định theo request
+    'get_phone_facets_route': 2,  # + kiểm tra bảng tổng hợp/chỉ mục tìm kiếm lần đầu
+    'get_my_phones_route': 2,  # + COUNT khi include_total=true
+    'get_phone_route': 1,
+    'update_phone_route': 4,  # + một UPDATE carts khi đổi giá (không phụ thuộc số giỏ)
+    'delete_phone_route': 4,
+    'get_phone_cache_stats_route': 0,
+})
+
+def _filtered_phones_query():
+    """Query Phone theo các bộ lọc của GET /phones/ (manufacturer, model_name_contains, q, price_min/max).
 
+    Trả về (query, search_rank, có_bộ_lọc).
+    """
     query = Phone.query
+    filtered = False
     manufacturer = request.args.get('manufacturer')
     if manufacturer:
         query = query.filter(Phone.manufacturer.ilike(f"%{manufacturer}%"))
+        filtered = True
     model_name_contains = request.args.get('model_name_contains')
     if model_name_contains:
         query = query.filter(Phone.model_name.ilike(f"%{model_name_contains}%"))
+        filtered = True
+    search_rank = None
+    q = request.args.get('q', '').strip()
+    if q:
+        query, search_rank = apply_search(query, q)
+        filtered = True
     price_min_val = None
     try:
         price_min_str = request.args.get('price_min')
@@ -31,6 +66,7 @@ def handle_get_or_options_phones():
             if price_min_val < 0: 
                 abort(400, description="Giá trị 'price_min' không được âm.")
             query = query.filter(Phone.price >= price_min_val)
+            filtered = True
         
         price_max_str = request.args.get('price_max')
         if price_max_str:
@@ -40,8 +76,19 @@ def handle_get_or_options_phones():
             if price_min_val is not None and price_max_val < price_min_val:
                  abort(400, description="'price_max' phải lớn hơn hoặc bằng 'price_min'.")
             query = query.filter(Phone.price <= price_max_val)
+            filtered = True
     except ValueError:
         abort(400, description="'price_min' hoặc 'price_max' phải là một số hợp lệ.")
+    return query, search_rank, filtered
+
+@phones_bp.route('/', methods=['GET', 'OPTIONS'])
+@cached_response([PHONE_LIST_TAG])
+def handle_get_or_options_phones():
+    if request.method == 'OPTIONS':
+        return jsonify(success=True), 200
+
+    fields = requested_fields(phone_schema)
+    query, search_rank, _ = _filtered_phones_query()
 
     sort_by_param = request.args.get('sort_by', 'id').lower()
     order_param = request.args.get('order', 'asc').lower()
@@ -57,8 +104,6 @@ def handle_get_or_options_phones():
     
     if order_param not in ['asc', 'desc']:
         abort(400, description="Tham số 'order' không hợp lệ. Chỉ chấp nhận 'asc' hoặc 'desc'.")
-    
-    query = query.order_by(desc(sort_column) if order_param == 'desc' else asc(sort_column))
 
     try:
         page = request.args.get('page', 1, type=int)
@@ -70,6 +115,18 @@ def handle_get_or_options_phones():
     except ValueError: 
          abort(400, description="'page' và 'per_page' phải là số nguyên hợp lệ.")
 
+    # Chỉ đọc để serialize: lấy Row các cột cần thiết (theo 'fields') thay vì instance ORM.
+    query = phone_rows(query, fields, required=(sort_column,))
+
+    # Chế độ cursor (keyset): bật khi có tham số 'cursor' (để trống cho trang đầu).
+    if 'cursor' in request.args:
+        return _keyset_phones_response(query, sort_by_param, sort_column, order_param, per_page, fields)
+
+    if search_rank is not None and 'sort_by' not in request.args:
+        # Có 'q' mà không chỉ định sort_by: sắp theo độ liên quan.
+        query = query.order_by(asc(search_rank), asc(Phone.id))
+    else:
+        query = query.order_by(desc(sort_column) if order_param == 'desc' else asc(sort_column))
     paginated_phones = query.paginate(page=page, per_page=per_page, error_out=False)
     current_args = request.args.copy()
     filters_applied_display = {k: v for k, v in current_args.items() if k != 'page'}
@@ -86,7 +143,7 @@ def handle_get_or_options_phones():
         prev_url = f"{base_url_for_pagination}?{('&'.join([f'{k}={v}' for k, v in prev_url_params.items()]))}"
 
     return jsonify({
-        "data": phones_schema.dump(paginated_phones.items),
+        "data": phones_serializer.only(fields).dump(to_phone_rows(paginated_phones.items)),
         "meta": {
             "page": paginated_phones.page, 
             "per_page": paginated_phones.per_page,
@@ -98,6 +155,69 @@ def handle_get_or_options_phones():
         }
     }), 200
 
+def _keyset_phones_response(query, sort_key, sort_column, order, per_page, fields=None):
+    include_total = request.args.get('include_total', 'false').lower() in ('1', 'true', 'yes')
+    total_items = query.order_by(None).count() if include_total else None
+
+    items, next_cursor, prev_cursor = keyset_paginate(
+        query, sort_key, sort_column, Phone.id, order, per_page,
+        cursor_token=request.args.get('cursor') or None
+    )
+
+    current_args = request.args.copy()
+    filters_applied_display = {k: v for k, v in current_args.items() if k not in ('page', 'cursor')}
+    next_url, prev_url = None, None
+    if next_cursor:
+        next_params = current_args.copy(); next_params['cursor'] = next_cursor
+        next_url = url_for(request.endpoint, _external=False, **next_params)
+    if prev_cursor:
+        prev_params = current_args.copy(); prev_params['cursor'] = prev_cursor
+        prev_url = url_for(request.endpoint, _external=False, **prev_params)
+
+    meta = {
+        "per_page": per_page,
+        "next_cursor": next_cursor,
+        "prev_cursor": prev_cursor,
+        "next_page_url": next_url,
+        "prev_page_url": prev_url,
+        "filters_applied": filters_applied_display
+    }
+    if include_total:
+        meta["total_items"] = total_items
+    return jsonify({"data": phones_serializer.only(fields).dump(to_phone_rows(items)), "meta": meta}), 200
+
+@phones_bp.route('/facets', methods=['GET'])
+@cached_response([PHONE_LIST_TAG])
+def get_phone_facets_route():
+    """Số phone theo hãng, khoảng giá và tình trạng còn hàng cho cùng bộ lọc với GET /phones/."""
+    query, _, filtered = _filtered_phones_query()
+    facets, source = compute_facets(query if filtered else None)
+    facets['meta'] = {
+        'source': source,
+        'filters_applied': {k: v for k, v in request.args.items()
+                            if k in ('manufacturer', 'model_name_contains', 'q', 'price_min', 'price_max')},
+    }
+    return jsonify(facets), 200
+
+@phones_bp.route('/mine', methods=['GET'])
+@jwt_required()
+@seller_or_admin_required
+@primary_db  # người bán cần thấy ngay sản phẩm vừa thêm/sửa
+def get_my_phones_route():
+    """Kho hàng của người bán hiện tại, phân trang cursor theo id (chỉ mục (user_id, id))."""
+    current_user_id = int(get_jwt_identity())
+    fields = requested_fields(phone_schema)
+    order_param = request.args.get('order', 'desc').lower()
+    if order_param not in ['asc', 'desc']:
+        abort(400, description="Tham số 'order' không hợp lệ. Chỉ chấp nhận 'asc' hoặc 'desc'.")
+    per_page = request.args.get('per_page', current_app.config.get('DEFAULT_PER_PAGE', 9), type=int)
+    if per_page <= 0:
+        abort(400, description="'per_page' phải là số nguyên dương.")
+    per_page = min(per_page, current_app.config.get('MAX_PER_PAGE', 100))
+
+    query = phone_rows(Phone.query.filter(Phone.user_id == current_user_id), fields)
+    return _keyset_phones_response(query, 'id', Phone.id, order_param, per_page, fields)
+
 @phones_bp.route('/', methods=['POST'])
 @jwt_required()
 @seller_or_admin_required
@@ -126,13 +246,49 @@ def create_phone_route():
         db.session.rollback()
         current_app.logger.error(f"Lỗi khi lưu sản phẩm vào CSDL: {str(e)}")
         abort(500, description="Lỗi máy chủ khi lưu sản phẩm.")
-    return jsonify(phone_schema.dump(new_phone)), 201
+    invalidate_phone_cache(new_phone.id)
+    return jsonify(phone_serializer.dump(new_phone)), 201
+
+
+@phones_bp.route('/bulk', methods=['POST'])
+@jwt_required()
+@seller_or_admin_required
+def bulk_create_phones_route():
+    current_user_id = int(get_jwt_identity())
+
+    import_format = request.args.get('format', '').lower()
+    if not import_format:
+        if request.mimetype in ('text/csv', 'application/csv'):
+            import_format = BULK_FORMAT_CSV
+        elif request.mimetype in ('application/x-ndjson', 'application/jsonl', 'application/json'):
+            import_format = BULK_FORMAT_NDJSON
+    if import_format not in (BULK_FORMAT_NDJSON, BULK_FORMAT_CSV):
+        abort(415, description="Chỉ hỗ trợ NDJSON (application/x-ndjson) hoặc CSV (text/csv).")
+
+    # Đọc trực tiếp từ request.stream để bộ nhớ không phụ thuộc kích thước file tải lên.
+    rows = iter_csv_rows(request.stream) if import_format == BULK_FORMAT_CSV else iter_ndjson_rows(request.stream)
+    report = import_phone_rows(
+        rows, current_user_id,
+        chunk_size=current_app.config.get('BULK_IMPORT_CHUNK_SIZE', 500),
+        max_errors=current_app.config.get('BULK_IMPORT_MAX_ERRORS', 1000)
+    )
+    if report.received == 0:
+        abort(400, description="Không có dòng dữ liệu nào trong nội dung yêu cầu.")
+
+    status_code = 201 if report.failed == 0 else 200
+    return jsonify(report.to_dict()), status_code
 
 
 @phones_bp.route('/<int:phone_id>', methods=['GET'])
+@cached_response(lambda phone_id: [phone_tag(phone_id)])
 def get_phone_route(phone_id):
-    phone = Phone.query.get_or_404(phone_id, description=f"Không tìm thấy điện thoại với ID: {phone_id}")
-    return jsonify(phone_schema.dump(phone)), 200
+    fields = requested_fields(phone_schema)
+    query = Phone.query
+    if fields is not None:
+        query = query.options(load_only(*select_columns(PHONE_FIELD_COLUMNS, fields, (Phone.updated_at,))))
+    phone = query.get_or_404(phone_id, description=f"Không tìm thấy điện thoại với ID: {phone_id}")
+    etag = make_etag('phone', phone.id, phone.updated_at, fields_etag_part(fields))
+    return conditional_json(etag, phone.updated_at, lambda: phone_serializer.only(fields).dump(phone))
 
 @phones_bp.route('/<int:phone_id>', methods=['PUT', 'OPTIONS']) 
 @jwt_required()
@@ -164,22 +320,27 @@ def update_phone_route(phone_id):
     if not validated_data:
          abort(400, description="Không có trường hợp lệ nào được cung cấp để cập nhật.")
     updated_fields_count = 0
+    price_changed = False
     for key, value in validated_data.items():
         if hasattr(phone, key) and getattr(phone, key) != value:
             if key == 'user_id' or key == 'added_by_user_id': 
                 continue
             setattr(phone, key, value)
             updated_fields_count +=1
+            price_changed = price_changed or key == 'price'
     if updated_fields_count > 0:
         try:
+            if price_changed:
+                invalidate_cart_subtotals(phone.id)
             db.session.commit()
         except Exception as e:
             db.session.rollback()
             current_app.logger.error(f"Lỗi khi cập nhật sản phẩm ID {phone_id}: {str(e)}")
             abort(500, description="Lỗi máy chủ khi cập nhật sản phẩm.")
-        return jsonify(phone_schema.dump(phone)), 200
+        invalidate_phone_cache(phone_id)
+        return jsonify(phone_serializer.dump(phone)), 200
     else:
-        return jsonify(message="Không có thay đổi nào được thực hiện.", data=phone_schema.dump(phone)), 200
+        return jsonify(message="Không có thay đổi nào được thực hiện.", data=phone_serializer.dump(phone)), 200
 
 
 @phones_bp.route('/<int:phone_id>', methods=['DELETE', 'OPTIONS']) 
@@ -204,9 +365,17 @@ def delete_phone_route(phone_id):
     
     try:
         db.session.delete(phone)
+        invalidate_cart_subtotals(phone_id)
         db.session.commit()
     except Exception as e:
         db.session.rollback()
         current_app.logger.error(f"Lỗi khi xóa sản phẩm ID {phone_id}: {str(e)}")
         abort(500, description="Lỗi máy chủ khi xóa sản phẩm.")
-    return jsonify(message="Đã xóa điện thoại thành công."), 200
\ No newline at end of file
+    invalidate_phone_cache(phone_id)
+    return jsonify(message="Đã xóa điện thoại thành công."), 200
+
+@phones_bp.route('/cache/stats', methods=['GET'])
+@jwt_required()
+@admin_required
+def get_phone_cache_stats_route():
+    return jsonify(current_app.extensions['response_cache'].stats()), 200
\ No newline at end of file
@@ -2,8 +2,9 @@
 
 from .user_schema import UserRegisterSchema, UserSchema
 from .phone_schema import PhoneSchema
-from .cart_schema import CartItemSchema, CartSchema, CartItemInputSchema, CartItemUpdateSchema
+from .cart_schema import CartItemSchema, CartSchema, CartItemInputSchema, CartItemUpdateSchema, CartBatchSchema
 from .order_schema import OrderSchema, OrderItemSchema, OrderCreateSchema, OrderStatusUpdateSchema
+from .compiled import CompiledSerializer
 
 
 
@@ -19,10 +20,18 @@ phones_schema = PhoneSchema(many=True)
 # Cart schemas
 cart_item_input_schema = CartItemInputSchema()
 cart_item_update_schema = CartItemUpdateSchema()
+cart_batch_schema = CartBatchSchema()
 cart_schema_output = CartSchema()
 
 
 order_schema_output = OrderSchema() 
 orders_schema_output = OrderSchema(many=True) 
 order_create_schema_input = OrderCreateSchema()
-order_status_update_schema_input = OrderStatusUpdateSchema() 
+order_status_update_schema_input = OrderStatusUpdateSchema()
+
+# Serializer biên dịch sẵn cho các endpoint nóng (JSON giống hệt schema tương ứng)
+phone_serializer = CompiledSerializer(phone_schema)
+phones_serializer = CompiledSerializer(phones_schema)
+cart_serializer = CompiledSerializer(cart_schema_output)
+order_serializer = CompiledSerializer(order_schema_output)
+orders_serializer = CompiledSerializer(orders_schema_output)
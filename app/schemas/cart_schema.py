@@ -1,8 +1,9 @@
 # phone_management_api/app/schemas/cart_schema.py
-from marshmallow import fields, validate 
+from marshmallow import fields, validate, validates_schema, ValidationError
 from app.extensions import ma
 from app.models.cart import Cart, CartItem
 from .phone_schema import PhoneSchema 
+from app.utils.metrics import TimedDumpMixin
 
 class CartItemInputSchema(ma.Schema): # Input schema
     phone_id = fields.Int(required=True)
@@ -17,6 +18,41 @@ class CartItemUpdateSchema(ma.Schema): # Input schema
         validate=validate.Range(min=1, error="Số lượng phải ít nhất là 1.")
     )
 
+CART_BATCH_OP_ADD = 'add'
+CART_BATCH_OP_SET = 'set'
+CART_BATCH_OP_REMOVE = 'remove'
+
+class CartBatchOperationSchema(ma.Schema): # Input schema: một thao tác của PATCH /cart/items
+    op = fields.Str(
+        required=True,
+        validate=validate.OneOf([CART_BATCH_OP_ADD, CART_BATCH_OP_SET, CART_BATCH_OP_REMOVE],
+                                error="Thao tác phải là 'add', 'set' hoặc 'remove'.")
+    )
+    phone_id = fields.Int()
+    cart_item_id = fields.Int()
+    quantity = fields.Int(validate=validate.Range(min=0, error="Số lượng không được âm."))
+
+    @validates_schema
+    def validate_operation(self, data, **kwargs):
+        op = data.get('op')
+        has_phone, has_item = 'phone_id' in data, 'cart_item_id' in data
+        if op == CART_BATCH_OP_ADD:
+            if not has_phone or has_item:
+                raise ValidationError("Thao tác 'add' cần 'phone_id' (không dùng 'cart_item_id').", 'phone_id')
+            if data.get('quantity', 0) < 1:
+                raise ValidationError("Số lượng phải ít nhất là 1.", 'quantity')
+            return
+        if has_phone == has_item:
+            raise ValidationError("Cần đúng một trong hai: 'phone_id' hoặc 'cart_item_id'.", 'phone_id')
+        if op == CART_BATCH_OP_SET and 'quantity' not in data:
+            raise ValidationError("Thao tác 'set' cần 'quantity' (0 = xóa khỏi giỏ).", 'quantity')
+
+class CartBatchSchema(ma.Schema): # Input schema cho PATCH /cart/items
+    operations = fields.List(
+        fields.Nested(CartBatchOperationSchema), required=True,
+        validate=validate.Length(min=1, error="Cần ít nhất một thao tác.")
+    )
+
 class CartItemSchema(ma.SQLAlchemySchema): # Output schema cho CartItem
     class Meta:
         model = CartItem
@@ -35,9 +71,11 @@ class CartItemSchema(ma.SQLAlchemySchema): # Output schema cho CartItem
             return round(obj.quantity * obj.phone.price, 2)
         return 0
 
-class CartSchema(ma.SQLAlchemyAutoSchema):
+class CartSchema(TimedDumpMixin, ma.SQLAlchemyAutoSchema):
     class Meta:
         model = Cart
         load_instance = True
+        exclude = ('subtotal',)  # có thể là NULL khi chờ tính lại: dùng total_price
 
-    items = fields.List(fields.Nested(CartItemSchema), dump_only=True)
\ No newline at end of file
+    items = fields.List(fields.Nested(CartItemSchema), dump_only=True)
+    total_price = fields.Float(dump_only=True)
\ No newline at end of file
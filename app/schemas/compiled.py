@@ -0,0 +1,99 @@
+# phone_management_api/app/schemas/compiled.py
+from flask import current_app, has_app_context
+from marshmallow import fields
+
+from app.utils.metrics import RequestMetrics
+
+# Field -> hàm chuyển đổi cho kết quả giống hệt Field._serialize của marshmallow (None giữ nguyên).
+# So khớp đúng kiểu (không tính lớp con) để field tùy biến luôn đi qua đường marshmallow.
+_CONVERTERS = {
+    fields.Float: 'float',
+    fields.Integer: 'int',
+    fields.String: 'str',
+}
+
+
+def _converter_name(field):
+    if isinstance(field, fields.Number) and field.as_string:
+        return None
+    if type(field) is fields.DateTime:
+        return 'isoformat' if (field.format or field.DEFAULT_FORMAT) == 'iso' else None
+    return _CONVERTERS.get(type(field))
+
+
+def _isoformat(value):
+    return value.isoformat()
+
+
+def compile_schema(schema):
+    """Sinh một hàm dump(obj) -> dict chuyên biệt cho schema (gồm Nested/List(Nested)/Method).
+
+    Kết quả giống hệt schema.dump(obj) cho các field được hỗ trợ; field khác gọi lại field.serialize().
+    """
+    namespace = {'float': float, 'int': int, 'str': str, 'isoformat': _isoformat}
+    lines = ['def dump(obj):', '    out = {}']
+    for index, (field_name, field) in enumerate(schema.dump_fields.items()):
+        key = field.data_key if field.data_key is not None else field_name
+        attribute = field.attribute or field_name
+        value_expr = 'obj.' + attribute if attribute.isidentifier() else None
+
+        if isinstance(field, fields.Method):
+            namespace[f'method_{index}'] = getattr(schema, field.serialize_method_name)
+            lines.append(f'    out[{key!r}] = method_{index}(obj)')
+            continue
+
+        if value_expr is None:
+            namespace[f'field_{index}'] = field
+            lines.append(f'    out[{key!r}] = field_{index}.serialize({attribute!r}, obj)')
+            continue
+
+        lines.append(f'    v = {value_expr}')
+        if isinstance(field, fields.Nested) and not field.many:
+            namespace[f'nested_{index}'] = compile_schema(field.schema)
+            lines.append(f'    out[{key!r}] = None if v is None else nested_{index}(v)')
+        elif isinstance(field, fields.List) and isinstance(field.inner, fields.Nested) and not field.inner.many:
+            namespace[f'nested_{index}'] = compile_schema(field.inner.schema)
+            lines.append(f'    out[{key!r}] = None if v is None else '
+                         f'[None if item is None else nested_{index}(item) for item in v]')
+        else:
+            converter = _converter_name(field)
+            if converter is None:
+                namespace[f'field_{index}'] = field
+                lines.append(f'    out[{key!r}] = field_{index}._serialize(v, {attribute!r}, obj)')
+            else:
+                lines.append(f'    out[{key!r}] = None if v is None else {converter}(v)')
+    lines.append('    return out')
+    exec('\n'.join(lines), namespace)
+    return namespace['dump']
+
+
+class CompiledSerializer:
+    """Bản dump biên dịch sẵn của một schema; tắt bằng FAST_SERIALIZERS_ENABLED=False để dùng marshmallow."""
+
+    def __init__(self, schema):
+        self.schema = schema
+        self._dump_one = compile_schema(schema)
+        self._subsets = {}
+
+    def only(self, fields):
+        """Serializer chỉ dump các field trong `fields` (None = tất cả); biên dịch một lần cho mỗi tập field."""
+        if fields is None:
+            return self
+        subset = self._subsets.get(fields)
+        if subset is None:
+            subset = CompiledSerializer(type(self.schema)(only=fields, many=self.schema.many))
+            self._subsets[fields] = subset
+        return subset
+
+    def dump(self, obj, many=None):
+        many = self.schema.many if many is None else many
+        if has_app_context() and not current_app.config.get('FAST_SERIALIZERS_ENABLED', True):
+            return self.schema.dump(obj, many=many)
+        started_at = RequestMetrics.serialization_started()
+        try:
+            if many:
+                dump_one = self._dump_one
+                return [dump_one(item) for item in obj]
+            return self._dump_one(obj)
+        finally:
+            RequestMetrics.serialization_finished(started_at)
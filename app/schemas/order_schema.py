@@ -4,6 +4,7 @@ from app.extensions import ma
 from app.models.order import Order, OrderItem, ALLOWED_ORDER_STATUSES
 from .user_schema import UserSchema
 from .phone_schema import PhoneSchema
+from app.utils.metrics import TimedDumpMixin
 
 class OrderItemSchema(ma.SQLAlchemySchema): 
     class Meta:
@@ -27,7 +28,7 @@ class OrderStatusUpdateSchema(ma.Schema):
         validate=validate.OneOf(ALLOWED_ORDER_STATUSES, error="Trạng thái không hợp lệ.")
     )
 
-class OrderSchema(ma.SQLAlchemyAutoSchema):
+class OrderSchema(TimedDumpMixin, ma.SQLAlchemyAutoSchema):
     class Meta:
         model = Order
         load_instance = True
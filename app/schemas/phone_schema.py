@@ -2,8 +2,9 @@
 from marshmallow import fields, validate
 from app.extensions import ma
 from app.models.phone import Phone
+from app.utils.metrics import TimedDumpMixin
 
-class PhoneSchema(ma.SQLAlchemySchema):
+class PhoneSchema(TimedDumpMixin, ma.SQLAlchemySchema):
     class Meta:
         model = Phone
 
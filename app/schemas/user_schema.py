@@ -2,6 +2,7 @@
 from marshmallow import fields, validate 
 from app.extensions import ma 
 from app.models.user import User 
+from app.utils.metrics import TimedDumpMixin
 
 class UserRegisterSchema(ma.Schema):
     username = fields.Str(
@@ -22,7 +23,7 @@ class UserRegisterSchema(ma.Schema):
     )
 
 
-class UserSchema(ma.SQLAlchemyAutoSchema):
+class UserSchema(TimedDumpMixin, ma.SQLAlchemyAutoSchema):
     class Meta:
         model = User
         load_instance = True
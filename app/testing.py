@@ -0,0 +1,150 @@
+# phone_management_api/app/testing.py
+"""Fixture pytest cho ngân sách truy vấn SQL và các hàm tạo dữ liệu cho test/benchmark.
+
+Bật trong conftest.py của bộ test (cần một fixture `app` trả về Flask app):
+
+    pytest_plugins = ['app.testing']
+
+- `query_budget`: factory, vd. `with query_budget(3): client.get('/cart/', headers=h)`.
+- `endpoint_query_budgets`: mọi request trong test được so với ngân sách khai báo bằng
+  declare_query_budgets(); test fail khi kết thúc nếu có endpoint vượt ngân sách hoặc chưa khai báo.
+
+Các hàm tạo dữ liệu (create_user, create_phones, create_orders, exercise_endpoints, sync_replica) dùng chung cho
+bộ test (tests/) và các script đo hiệu năng (benchmarks/).
+"""
+import pytest
+from flask_jwt_extended import create_access_token
+from werkzeug.security import generate_password_hash
+
+from app.utils.query_budget import EndpointBudgetMonitor, query_budget as _query_budget
+
+
+@pytest.fixture
+def query_budget(app):
+    def factory(max_queries, label='Khối lệnh'):
+        with app.app_context():
+            from app.extensions import db
+            engine = db.engine
+        return _query_budget(max_queries, engine=engine, label=label)
+    return factory
+
+
+@pytest.fixture
+def endpoint_query_budgets(app):
+    monitor = EndpointBudgetMonitor(app).start()
+    try:
+        yield monitor
+    finally:
+        monitor.stop()
+    monitor.check()
+
+
+def sync_replica(app):
+    """Chép CSDL primary sang replica SQLite (READ_REPLICA_DATABASE_URL) của app, như `flask sync-read-replica`."""
+    from sqlalchemy.engine import make_url
+    from app.commands import sync_sqlite_replica
+
+    sync_sqlite_replica(make_url(app.config['SQLALCHEMY_DATABASE_URI']).database,
+                        make_url(app.config['READ_REPLICA_DATABASE_URL']).database)
+
+
+def create_user(app, username, role, password='123456'):
+    """Tạo user (nếu chưa có) và trả về header Authorization cho user đó."""
+    from app.extensions import db
+    from app.models.user import User
+
+    with app.app_context():
+        user = User.query.filter_by(username=username).first()
+        if not user:
+            user = User(username=username, password_hash=generate_password_hash(password), role=role)
+            db.session.add(user)
+            db.session.commit()
+        token = create_access_token(identity=str(user.id))
+        return user.id, {'Authorization': f'Bearer {token}'}
+
+
+def create_phones(app, owner_id, count, **overrides):
+    """Chèn nhanh `count` phone cho owner_id; trả về danh sách id."""
+    from sqlalchemy import insert
+    from app.extensions import db
+    from app.models.phone import Phone
+
+    rows = [dict({'model_name': f'Bench {i}', 'manufacturer': 'BenchCo', 'price': 1000 + i,
+                  'stock_quantity': 1000, 'specifications': f'Spec {i}', 'user_id': owner_id}, **overrides)
+            for i in range(count)]
+    with app.app_context():
+        result = db.session.execute(insert(Phone).returning(Phone.id, sort_by_parameter_order=True), rows)
+        ids = [row.id for row in result]
+        db.session.commit()
+    return ids
+
+
+def create_orders(app, buyer_id, phone_ids, count, items_per_order=3, seller_id=None):
+    """Chèn nhanh `count` đơn hàng (mỗi đơn items_per_order dòng) bằng Core insert."""
+    from sqlalchemy import insert
+    from app.extensions import db
+    from app.models.order import Order, OrderItem, OrderSeller
+
+    with app.app_context():
+        order_rows = [{'user_id': buyer_id, 'total_amount': 0, 'status': 'pending',
+                       'shipping_address': f'{i} Bench Street'} for i in range(count)]
+        result = db.session.execute(insert(Order).returning(Order.id, sort_by_parameter_order=True), order_rows)
+        order_ids = [row.id for row in result]
+        item_rows = []
+        for n, order_id in enumerate(order_ids):
+            for k in range(items_per_order):
+                item_rows.append({'order_id': order_id, 'phone_id': phone_ids[(n + k) % len(phone_ids)],
+                                  'quantity': 1 + k, 'price_at_purchase': 1000 + k})
+        db.session.execute(insert(OrderItem), item_rows)
+        if seller_id is not None:
+            db.session.execute(insert(OrderSeller), [{'order_id': oid, 'seller_id': seller_id} for oid in order_ids])
+        db.session.commit()
+    return order_ids
+
+
+def exercise_endpoints(client, buyer, seller, admin):
+    """Một lượt gọi qua các luồng chính; giỏ hàng/đơn hàng có nhiều dòng để lộ mẫu N+1."""
+    client.post('/auth/register', json={'username': 'budget_user', 'password': '123456', 'role': 'buyer'})
+    client.post('/auth/login', json={'username': 'budget_user', 'password': '123456'})
+
+    client.get('/phones/?page=1&per_page=10&sort_by=price&order=desc')
+    client.get('/phones/?manufacturer=Apple&price_min=1000&price_max=50000000')
+    client.get('/phones/?q=galaxy')
+    next_cursor = client.get('/phones/?cursor=&per_page=3').get_json()['meta']['next_cursor']
+    client.get(f'/phones/?cursor={next_cursor}&per_page=3')
+    client.get('/phones/1')
+    client.get('/phones/mine?per_page=5&include_total=true', headers=seller)
+    client.get('/phones/facets')
+    client.get('/phones/facets?manufacturer=Apple&price_max=50000000')
+    created = client.post('/phones/', json={'model_name': 'Budget 1', 'manufacturer': 'Nokia', 'price': 100,
+                                            'stock_quantity': 5}, headers=seller).get_json()
+    client.put(f"/phones/{created['id']}", json={'price': 120}, headers=seller)
+    client.delete(f"/phones/{created['id']}", headers=seller)
+    client.post('/phones/bulk?format=ndjson', headers=seller,
+                data='{"model_name": "Bulk 1", "manufacturer": "Nokia", "price": 1, "stock_quantity": 1}\n',
+                content_type='application/x-ndjson')
+    client.get('/phones/cache/stats', headers=admin)
+
+    for phone_id in (1, 2, 3):
+        client.post('/cart/items', json={'phone_id': phone_id, 'quantity': 1}, headers=buyer)
+    client.patch('/cart/items', headers=buyer, json={'operations': [
+        {'op': 'add', 'phone_id': 5, 'quantity': 1}, {'op': 'add', 'phone_id': 6, 'quantity': 1},
+        {'op': 'set', 'phone_id': 1, 'quantity': 2}, {'op': 'remove', 'phone_id': 6}]})
+    cart = client.get('/cart/', headers=buyer).get_json()
+    client.get('/cart/summary', headers=buyer)
+    client.put('/phones/1', json={'price': cart['items'][0]['phone']['price'] + 1}, headers=admin)
+    client.get('/cart/summary', headers=buyer)  # tạm tính bị vô hiệu do đổi giá: tính lại
+    client.put(f"/cart/items/{cart['items'][0]['id']}", json={'quantity': 2}, headers=buyer)
+    client.delete(f"/cart/items/{cart['items'][1]['id']}", headers=buyer)
+    checkout_headers = dict(buyer, **{'Idempotency-Key': 'budget-checkout'})
+    order = client.post('/orders/', json={'shipping_address': '1 Budget Street'}, headers=checkout_headers).get_json()
+    client.post('/orders/', json={'shipping_address': '1 Budget Street'}, headers=checkout_headers)  # phát lại
+    client.post('/cart/items', json={'phone_id': 4, 'quantity': 1},
+                headers=dict(buyer, **{'Idempotency-Key': 'budget-add'}))
+    client.delete('/cart/', headers=buyer)
+
+    for headers in (buyer, seller, admin):
+        client.get('/orders/?page=1&per_page=10', headers=headers)
+    client.get(f"/orders/{order['id']}", headers=buyer)
+    client.put(f"/orders/{order['id']}/status", json={'status': 'processing'}, headers=seller)
+    client.post(f"/orders/{order['id']}/cancel", headers=dict(buyer, **{'Idempotency-Key': 'budget-cancel'}))
@@ -0,0 +1,145 @@
+# phone_management_api/app/utils/bulk_import.py
+import csv
+import io
+import json
+
+from flask import current_app
+from marshmallow import ValidationError
+from sqlalchemy import insert
+
+from app.extensions import db
+from app.models.phone import Phone
+from app.schemas import phone_schema
+from app.utils.cache import invalidate_phone_cache
+
+BULK_FORMAT_NDJSON = 'ndjson'
+BULK_FORMAT_CSV = 'csv'
+
+_PHONE_COLUMNS = ('model_name', 'manufacturer', 'price', 'stock_quantity', 'specifications')
+
+
+def iter_ndjson_rows(stream):
+    """Đọc từng dòng JSON từ stream; dòng lỗi được trả về dưới dạng ValidationError."""
+    text_stream = io.TextIOWrapper(stream, encoding='utf-8', errors='replace', newline='')
+    row_number = 0
+    for line in text_stream:
+        line = line.strip()
+        if not line:
+            continue
+        row_number += 1
+        try:
+            row = json.loads(line)
+        except ValueError:
+            yield row_number, ValidationError({'_schema': ["Dòng JSON không hợp lệ."]})
+            continue
+        if not isinstance(row, dict):
+            yield row_number, ValidationError({'_schema': ["Mỗi dòng phải là một JSON object."]})
+            continue
+        yield row_number, row
+
+
+def iter_csv_rows(stream):
+    """Đọc CSV có dòng tiêu đề từ stream; ô trống được coi là không có giá trị."""
+    text_stream = io.TextIOWrapper(stream, encoding='utf-8-sig', errors='replace', newline='')
+    for row_number, row in enumerate(csv.DictReader(text_stream), start=1):
+        if None in row:
+            yield row_number, ValidationError({'_schema': ["Dòng CSV có nhiều cột hơn tiêu đề."]})
+            continue
+        yield row_number, {k: v for k, v in row.items() if v not in ('', None)}
+
+
+class BulkImportReport:
+    def __init__(self, max_errors):
+        self.max_errors = max_errors
+        self.received = 0
+        self.inserted = 0
+        self.failed = 0
+        self.chunks = 0
+        self.errors = []
+
+    def add_error(self, row_number, messages):
+        self.failed += 1
+        if len(self.errors) < self.max_errors:
+            self.errors.append({'row': row_number, 'errors': messages})
+
+    def to_dict(self):
+        return {
+            'received': self.received,
+            'inserted': self.inserted,
+            'failed': self.failed,
+            'chunks': self.chunks,
+            'errors': self.errors,
+            'errors_truncated': self.failed > len(self.errors),
+        }
+
+
+def _validate_chunk(chunk, owner_id, errors):
+    """Validate cả lô bằng một lần PhoneSchema.load(many=True); trả về các dòng hợp lệ.
+
+    Dòng đọc lỗi (ValidationError giữ chỗ trong lô) và dòng sai schema được thêm vào `errors`.
+    """
+    raw_rows = [row for _, row in chunk if not isinstance(row, ValidationError)]
+    try:
+        loaded_rows = phone_schema.load(raw_rows, many=True)
+        messages = {}
+    except ValidationError as err:
+        loaded_rows, messages = err.valid_data, err.messages
+
+    valid = []
+    index = -1
+    for row_number, row in chunk:
+        if isinstance(row, ValidationError):
+            errors.append((row_number, row.messages))
+            continue
+        index += 1
+        if index in messages:
+            errors.append((row_number, messages[index]))
+            continue
+        values = {column: loaded_rows[index].get(column) for column in _PHONE_COLUMNS}
+        values['user_id'] = owner_id
+        valid.append((row_number, values))
+    return valid
+
+
+def _flush_chunk(chunk, owner_id, report):
+    errors = []
+    _insert_chunk(_validate_chunk(chunk, owner_id, errors), report, errors)
+    # Các lô nối tiếp nhau theo số dòng: sắp lỗi trong lô là đủ để report.errors theo đúng thứ tự dòng,
+    # kể cả khi bị cắt ở max_errors.
+    for row_number, messages in sorted(errors, key=lambda error: error[0]):
+        report.add_error(row_number, messages)
+
+
+def _insert_chunk(chunk, report, errors):
+    if not chunk:
+        return
+    report.chunks += 1
+    rows = [row for _, row in chunk]
+    try:
+        db.session.execute(insert(Phone), rows)
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        current_app.logger.error(f"Lỗi khi nhập lô {report.chunks} ({len(rows)} dòng): {str(e)}")
+        errors.extend((row_number, {'_schema': ["Lỗi máy chủ khi lưu lô dữ liệu chứa dòng này."]})
+                      for row_number, _ in chunk)
+        return
+    report.inserted += len(rows)
+    invalidate_phone_cache()
+
+
+def import_phone_rows(rows, owner_id, chunk_size, max_errors):
+    """Validate bằng PhoneSchema và chèn theo lô (executemany), mỗi lô một transaction.
+
+    report.errors theo thứ tự dòng: dòng đọc lỗi vẫn nằm trong lô và được ghi cùng lỗi schema của lô.
+    """
+    report = BulkImportReport(max_errors)
+    chunk = []
+    for row_number, row in rows:
+        report.received += 1
+        chunk.append((row_number, row))
+        if len(chunk) >= chunk_size:
+            _flush_chunk(chunk, owner_id, report)
+            chunk = []
+    _flush_chunk(chunk, owner_id, report)
+    return report
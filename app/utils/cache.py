@@ -0,0 +1,291 @@
+# phone_management_api/app/utils/cache.py
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from urllib.parse import urlencode
+
+from flask import current_app, g, request
+
+from app.utils.db_routing import DB_ROUTE_PRIMARY, DB_ROUTE_REPLICA, READ_CONSISTENCY_HEADER
+
+PHONE_LIST_TAG = 'phones:list'
+CACHED_HEADERS = ('ETag', 'Last-Modified', 'Cache-Control')
+_NEVER_INVALIDATED = (0, 0.0)  # (generation, thời điểm vô hiệu hóa gần nhất) của tag chưa từng bị vô hiệu hóa
+
+
+def phone_tag(phone_id):
+    return f'phone:{phone_id}'
+
+
+class _SQLiteCacheBackend:
+    """Kho cache dùng chung giữa các process (một file SQLite cục bộ)."""
+
+    def __init__(self, path):
+        self.path = path
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("CREATE TABLE IF NOT EXISTS response_cache ("
+                         "key TEXT PRIMARY KEY, status INTEGER, mimetype TEXT, body BLOB, headers TEXT, expires_at REAL)")
+            conn.execute("CREATE TABLE IF NOT EXISTS response_cache_tags ("
+                         "tag TEXT, key TEXT, PRIMARY KEY (tag, key))")
+            conn.execute("CREATE TABLE IF NOT EXISTS response_cache_generations ("
+                         "tag TEXT PRIMARY KEY, generation INTEGER NOT NULL, invalidated_at REAL NOT NULL)")
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=5)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    def get(self, key):
+        with self._connect() as conn:
+            row = conn.execute("SELECT status, mimetype, body, headers, expires_at FROM response_cache WHERE key = ?",
+                               (key,)).fetchone()
+            if row is None or row[4] < time.time():
+                return None, ()
+            tags = [tag for (tag,) in conn.execute("SELECT tag FROM response_cache_tags WHERE key = ?", (key,))]
+        return (row[0], row[1], bytes(row[2]), json.loads(row[3]), row[4]), tags
+
+    @staticmethod
+    def _generations(conn, tags):
+        if not tags:
+            return ()
+        placeholders = ', '.join('?' for _ in tags)
+        current = {tag: (generation, invalidated_at) for tag, generation, invalidated_at in conn.execute(
+            f"SELECT tag, generation, invalidated_at FROM response_cache_generations "
+            f"WHERE tag IN ({placeholders})", list(tags))}
+        return tuple(current.get(tag, _NEVER_INVALIDATED) for tag in tags)
+
+    def generations(self, tags):
+        with self._connect() as conn:
+            return self._generations(conn, tags)
+
+    def set(self, key, entry, tags, generations=None):
+        """Ghi mục; bỏ qua (trả về False) nếu một tag đã bị vô hiệu hóa kể từ khi lấy `generations`."""
+        status, mimetype, body, headers, expires_at = entry
+        with self._connect() as conn:
+            # BEGIN IMMEDIATE: so sánh generation và ghi trong cùng một transaction ghi, không xen với invalidate.
+            conn.execute("BEGIN IMMEDIATE")
+            if generations is not None and self._generations(conn, tags) != tuple(generations):
+                return False
+            conn.execute("INSERT OR REPLACE INTO response_cache VALUES (?, ?, ?, ?, ?, ?)",
+                         (key, status, mimetype, body, json.dumps(headers), expires_at))
+            conn.executemany("INSERT OR IGNORE INTO response_cache_tags VALUES (?, ?)",
+                             [(tag, key) for tag in tags])
+        return True
+
+    def invalidate_tags(self, tags):
+        placeholders = ', '.join('?' for _ in tags)
+        with self._connect() as conn:
+            conn.execute(f"DELETE FROM response_cache WHERE key IN "
+                         f"(SELECT key FROM response_cache_tags WHERE tag IN ({placeholders}))", tags)
+            conn.execute(f"DELETE FROM response_cache_tags WHERE tag IN ({placeholders})", tags)
+            now = time.time()
+            conn.executemany("INSERT INTO response_cache_generations VALUES (?, 1, ?) ON CONFLICT (tag) "
+                             "DO UPDATE SET generation = generation + 1, invalidated_at = excluded.invalidated_at",
+                             [(tag, now) for tag in tags])
+
+    def clear(self):
+        with self._connect() as conn:
+            conn.execute("DELETE FROM response_cache")
+            conn.execute("DELETE FROM response_cache_tags")
+
+
+class ResponseCache:
+    """Cache phản hồi GET: LRU + TTL trong process, tùy chọn thêm kho SQLite dùng chung.
+
+    Mỗi mục được gắn tag (vd. 'phones:list', 'phone:12') để có thể vô hiệu hóa theo tag
+    khi dữ liệu thay đổi. Mỗi lần vô hiệu hóa tăng generation của tag; phản hồi được tính từ trước
+    lần vô hiệu hóa gần nhất (generation đã đổi) sẽ không được ghi vào cache. Phản hồi đọc từ replica
+    cũng không được ghi trong `replica_grace` giây sau lần vô hiệu hóa (replica có thể chưa bắt kịp).
+    """
+
+    def __init__(self, app=None):
+        self.enabled = False
+        self.max_entries = 1024
+        self.ttl = 60
+        self.local_ttl = 60
+        self.replica_grace = 5
+        self.backend = None
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._entry_tags = {}
+        self._tags = {}
+        self._generations = {}
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.enabled = app.config.get('RESPONSE_CACHE_ENABLED', False)
+        self.max_entries = app.config.get('RESPONSE_CACHE_MAX_ENTRIES', 1024)
+        self.ttl = app.config.get('RESPONSE_CACHE_TTL', 60)
+        self.replica_grace = app.config.get('RESPONSE_CACHE_REPLICA_GRACE', 5)
+        backend_path = app.config.get('RESPONSE_CACHE_BACKEND_PATH')
+        self.backend = _SQLiteCacheBackend(backend_path) if backend_path else None
+        # Với kho dùng chung, bản sao trong process chỉ sống ngắn để process khác thấy được việc vô hiệu hóa.
+        self.local_ttl = app.config.get('RESPONSE_CACHE_LOCAL_TTL', 2) if self.backend else self.ttl
+        self.clear()
+        with self._lock:
+            # Generation của app trước (vd. CSDL khác) không áp dụng cho app này.
+            self._generations.clear()
+        app.extensions['response_cache'] = self
+
+    def make_key(self):
+        args = urlencode(sorted(request.args.items(multi=True)))
+        return f'{request.path}?{args}'
+
+    def get(self, key):
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[-1] >= now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry
+                self._drop(key)
+        if self.backend is not None:
+            entry, tags = self.backend.get(key)
+            if entry is not None:
+                with self._lock:
+                    self._store(key, entry[:-1] + (min(entry[-1], now + self.local_ttl),), tags)
+                    self.hits += 1
+                return entry
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def generations(self, tags):
+        """Ảnh chụp (generation, thời điểm vô hiệu hóa) của các tag, lấy TRƯỚC khi tính phản hồi
+        rồi truyền lại cho set()."""
+        if self.backend is not None:
+            return self.backend.generations(tags)
+        with self._lock:
+            return tuple(self._generations.get(tag, _NEVER_INVALIDATED) for tag in tags)
+
+    def invalidated_within(self, generations, seconds):
+        """True nếu một tag trong ảnh chụp `generations` bị vô hiệu hóa trong `seconds` giây gần đây."""
+        return any(time.time() - invalidated_at < seconds for _, invalidated_at in generations)
+
+    def set(self, key, status, mimetype, body, headers, tags, generations=None):
+        """Ghi phản hồi vào cache. Trả về False (không ghi) nếu một tag đã bị vô hiệu hóa sau `generations`."""
+        expires_at = time.time() + self.ttl
+        if self.backend is not None:
+            # Kho dùng chung giữ generation chung cho mọi process: kiểm tra ở đó trước khi ghi bản sao cục bộ.
+            if not self.backend.set(key, (status, mimetype, body, headers, expires_at), tags, generations):
+                return False
+            generations = None
+        with self._lock:
+            if generations is not None and \
+                    tuple(self._generations.get(tag, _NEVER_INVALIDATED) for tag in tags) != tuple(generations):
+                return False
+            self._store(key, (status, mimetype, body, headers, min(expires_at, time.time() + self.local_ttl)), tags)
+        return True
+
+    def invalidate_tags(self, *tags):
+        if not tags:
+            return
+        now = time.time()
+        with self._lock:
+            for tag in tags:
+                self._generations[tag] = (self._generations.get(tag, _NEVER_INVALIDATED)[0] + 1, now)
+                for key in list(self._tags.get(tag, ())):
+                    self._drop(key)
+        if self.backend is not None:
+            self.backend.invalidate_tags(list(tags))
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._entry_tags.clear()
+            self._tags.clear()
+            self.hits = 0
+            self.misses = 0
+        if self.backend is not None:
+            self.backend.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'enabled': self.enabled,
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': round(self.hits / lookups, 4) if lookups else 0.0,
+                'shared_backend': self.backend.path if self.backend else None,
+            }
+
+    def _store(self, key, entry, tags):
+        self._drop(key)
+        self._entries[key] = entry
+        self._entry_tags[key] = tuple(tags)
+        for tag in tags:
+            self._tags.setdefault(tag, set()).add(key)
+        while len(self._entries) > self.max_entries:
+            self._drop(next(iter(self._entries)))
+
+    def _drop(self, key):
+        self._entries.pop(key, None)
+        for tag in self._entry_tags.pop(key, ()):
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+
+
+def cached_response(tags):
+    """Cache phản hồi 200 của một view GET công khai. `tags` là list hoặc hàm nhận view kwargs.
+
+    Request đọc từ primary (X-Read-Consistency: strong, hoặc đã bị chuyển sang primary) không đọc và
+    không ghi cache: nó phải thấy dữ liệu mới nhất, và phản hồi từ replica trong cache có thể đã cũ.
+    """
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            cache = current_app.extensions.get('response_cache')
+            if request.method != 'GET' or cache is None or not cache.enabled:
+                return fn(*args, **kwargs)
+            db_route = g.get('_db_route')
+            if db_route == DB_ROUTE_PRIMARY or request.headers.get(READ_CONSISTENCY_HEADER, '').lower() == 'strong':
+                response = current_app.make_response(fn(*args, **kwargs))
+                response.headers['X-Cache'] = 'BYPASS'
+                return response
+
+            key = cache.make_key()
+            entry_tags = tags(**kwargs) if callable(tags) else tags
+            entry = cache.get(key)
+            if entry is not None:
+                status, mimetype, body, headers, _ = entry
+                response = current_app.response_class(body, status=status, mimetype=mimetype, headers=headers)
+                response.headers['X-Cache'] = 'HIT'
+                return response.make_conditional(request)
+
+            # Lấy generation trước khi đọc CSDL: nếu một lần ghi commit + vô hiệu hóa xen vào giữa lúc view
+            # đang chạy, phản hồi (có thể đã cũ) bị bỏ thay vì được lưu sau lần vô hiệu hóa.
+            generations = cache.generations(entry_tags)
+            response = current_app.make_response(fn(*args, **kwargs))
+            if response.status_code == 200 and not (
+                    db_route == DB_ROUTE_REPLICA and cache.invalidated_within(generations, cache.replica_grace)):
+                headers = {name: response.headers[name] for name in CACHED_HEADERS if name in response.headers}
+                cache.set(key, response.status_code, response.mimetype, response.get_data(), headers, entry_tags,
+                          generations)
+            response.headers['X-Cache'] = 'MISS'
+            return response
+        return wrapper
+    return decorator
+
+
+def invalidate_phone_cache(*phone_ids):
+    cache = current_app.extensions.get('response_cache')
+    if cache is None:
+        return
+    cache.invalidate_tags(PHONE_LIST_TAG, *(phone_tag(phone_id) for phone_id in phone_ids))
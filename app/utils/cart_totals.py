@@ -0,0 +1,86 @@
+# phone_management_api/app/utils/cart_totals.py
+from sqlalchemy import func, inspect, select, text, update
+
+from app.extensions import db
+from app.models.cart import Cart, CartItem
+from app.models.phone import Phone
+
+# carts.item_count / total_quantity / subtotal được cập nhật cùng transaction với cart_items,
+# bằng biểu thức SQL (item_count = item_count + :n) để hai request đồng thời không ghi đè nhau.
+# Đổi giá phone chỉ đặt subtotal = NULL cho các giỏ chứa phone đó; giỏ được tính lại khi đọc.
+# Hai thao tác này giữ nguyên carts.updated_at (nội dung giỏ không đổi).
+CART_TOTAL_COLUMNS = ('item_count', 'total_quantity', 'subtotal')
+
+
+def adjust_cart_totals(cart, lines=0, quantity=0, amount=0.0):
+    """Cộng chênh lệch vào tổng của giỏ (flush cùng câu UPDATE carts của cart.updated_at).
+
+    amount=None: không biết giá (vd. phone đã bị xóa) -> đánh dấu subtotal cần tính lại.
+    """
+    if lines:
+        cart.item_count = Cart.item_count + lines
+    if quantity:
+        cart.total_quantity = Cart.total_quantity + quantity
+    if amount is None:
+        cart.subtotal = None
+    elif amount:
+        # NULL + x vẫn là NULL: giỏ đang chờ tính lại thì giữ nguyên trạng thái đó.
+        cart.subtotal = Cart.subtotal + amount
+
+
+def reset_cart_totals(cart):
+    """Giỏ vừa được dọn sạch (xóa hết / đặt hàng)."""
+    cart.item_count = 0
+    cart.total_quantity = 0
+    cart.subtotal = 0
+
+
+def invalidate_cart_subtotals(*phone_ids):
+    """Đặt subtotal = NULL cho mọi giỏ chứa các phone vừa đổi giá (một câu UPDATE). Trả về số giỏ."""
+    if not phone_ids:
+        return 0
+    carts_with_phone = select(CartItem.cart_id).where(CartItem.phone_id.in_(phone_ids))
+    return db.session.execute(
+        update(Cart).where(Cart.id.in_(carts_with_phone), Cart.subtotal.is_not(None))
+        .values(subtotal=None, updated_at=Cart.updated_at).execution_options(synchronize_session=False)
+    ).rowcount
+
+
+def _totals_update():
+    items = select(func.count(CartItem.id)).where(CartItem.cart_id == Cart.id).scalar_subquery()
+    quantity = select(func.coalesce(func.sum(CartItem.quantity), 0))\
+        .where(CartItem.cart_id == Cart.id).scalar_subquery()
+    subtotal = select(func.coalesce(func.sum(CartItem.quantity * Phone.price), 0))\
+        .join(Phone, CartItem.phone_id == Phone.id)\
+        .where(CartItem.cart_id == Cart.id).scalar_subquery()
+    return update(Cart).values(item_count=items, total_quantity=quantity, subtotal=subtotal,
+                               updated_at=Cart.updated_at)\
+                       .execution_options(synchronize_session=False)
+
+
+def refresh_cart_totals(cart_ids=None, stale_only=False):
+    """Tính lại tổng từ cart_items cho cart_ids (None = mọi giỏ) bằng một câu UPDATE. Trả về số giỏ.
+
+    Không commit: gọi trong transaction của thay đổi tương ứng.
+    """
+    statement = _totals_update()
+    if cart_ids is not None:
+        statement = statement.where(Cart.id.in_(cart_ids))
+    if stale_only:
+        statement = statement.where(Cart.subtotal.is_(None))
+    return db.session.execute(statement).rowcount
+
+
+def ensure_cart_totals():
+    """Thêm các cột tổng vào bảng carts của CSDL cũ (create_all không sửa bảng đã có) và điền giá trị."""
+    existing = {column['name'] for column in inspect(db.engine).get_columns(Cart.__tablename__)}
+    missing = [name for name in CART_TOTAL_COLUMNS if name not in existing]
+    if not missing:
+        return 0
+    for name in missing:
+        column_type = Cart.__table__.c[name].type.compile(dialect=db.engine.dialect)
+        db.session.execute(text(f"ALTER TABLE {Cart.__tablename__} ADD COLUMN {name} {column_type} DEFAULT 0"
+                                + (" NOT NULL" if name != 'subtotal' else "")))
+    refreshed = refresh_cart_totals()
+    db.session.commit()
+    return refreshed
@@ -0,0 +1,46 @@
+# phone_management_api/app/utils/conditional.py
+import hashlib
+from datetime import timezone
+
+from flask import current_app, jsonify, request
+
+
+def make_etag(*parts):
+    """ETag mạnh từ các thành phần phiên bản (id, updated_at, ...)."""
+    raw = '|'.join('' if part is None else str(part) for part in parts)
+    return hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+
+def as_utc(value):
+    if value is None:
+        return None
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def latest(*values):
+    values = [as_utc(v) for v in values if v is not None]
+    return max(values) if values else None
+
+
+def is_not_modified(etag, last_modified=None):
+    if request.if_none_match:
+        return request.if_none_match.contains_weak(etag)
+    if last_modified is not None and request.if_modified_since is not None:
+        return as_utc(last_modified).replace(microsecond=0) <= request.if_modified_since
+    return False
+
+
+def conditional_json(etag, last_modified, build_body, status=200, cache_control='no-cache'):
+    """Trả về 304 nếu client đã có phiên bản hiện tại; chỉ gọi build_body() (marshmallow dump) khi cần."""
+    if is_not_modified(etag, last_modified):
+        response = current_app.response_class(status=304)
+    else:
+        response = jsonify(build_body())
+        response.status_code = status
+    response.set_etag(etag)
+    if last_modified is not None:
+        response.last_modified = as_utc(last_modified)
+    response.headers['Cache-Control'] = cache_control
+    return response
@@ -0,0 +1,65 @@
+# phone_management_api/app/utils/db_routing.py
+from functools import wraps
+
+from flask import current_app, g, has_request_context, request
+from flask_sqlalchemy.session import Session
+
+REPLICA_BIND_KEY = 'replica'
+DB_ROUTE_PRIMARY = 'primary'
+DB_ROUTE_REPLICA = 'replica'
+# Header để client yêu cầu đọc từ primary (vd. ngay sau khi vừa ghi ở request trước).
+READ_CONSISTENCY_HEADER = 'X-Read-Consistency'
+DB_ROUTE_HEADER = 'X-DB-Route'
+
+_REPLICA_METHODS = ('GET', 'HEAD')
+
+
+def primary_db(fn):
+    """Đánh dấu view GET luôn đọc từ primary (vd. view có thể ghi hoặc cần read-your-writes)."""
+    fn._use_primary_db = True
+    return fn
+
+
+class RoutingSession(Session):
+    """Session chọn engine replica cho truy vấn đọc của request GET an toàn.
+
+    Khi request bắt đầu ghi (flush hoặc câu DML), phần còn lại của request dính vào primary
+    để các lần đọc sau đó thấy được dữ liệu vừa ghi.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and REPLICA_BIND_KEY in self._db.engines and self._route_to_replica(clause):
+            return self._db.engines[REPLICA_BIND_KEY]
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+    def _route_to_replica(self, clause):
+        if not has_request_context() or g.get('_db_route') != DB_ROUTE_REPLICA:
+            return False
+        if self._flushing or getattr(clause, 'is_dml', False):
+            g._db_route = DB_ROUTE_PRIMARY
+            return False
+        return True
+
+
+def _choose_db_route():
+    if REPLICA_BIND_KEY not in current_app.config.get('SQLALCHEMY_BINDS', {}):
+        return
+    view = current_app.view_functions.get(request.endpoint)
+    if request.method not in _REPLICA_METHODS or view is None or getattr(view, '_use_primary_db', False):
+        g._db_route = DB_ROUTE_PRIMARY
+    elif request.headers.get(READ_CONSISTENCY_HEADER, '').lower() == 'strong':
+        g._db_route = DB_ROUTE_PRIMARY
+    else:
+        g._db_route = DB_ROUTE_REPLICA
+
+
+def _expose_db_route(response):
+    route = g.get('_db_route')
+    if route is not None:
+        response.headers[DB_ROUTE_HEADER] = route
+    return response
+
+
+def init_read_routing(app):
+    app.before_request(_choose_db_route)
+    app.after_request(_expose_db_route)
@@ -0,0 +1,64 @@
+# phone_management_api/app/utils/db_tuning.py
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+
+from app.utils.db_routing import REPLICA_BIND_KEY, init_read_routing
+
+
+def _is_sqlite(uri):
+    return make_url(uri).get_backend_name() == 'sqlite'
+
+
+def build_engine_options(config, uri=None):
+    """SQLALCHEMY_ENGINE_OPTIONS theo loại CSDL; giá trị khai báo sẵn trong config được ưu tiên."""
+    uri = uri or config['SQLALCHEMY_DATABASE_URI']
+    options = {}
+    if _is_sqlite(uri):
+        busy_timeout_ms = (config.get('SQLITE_PRAGMAS') or {}).get('busy_timeout')
+        if busy_timeout_ms:
+            options['connect_args'] = {'timeout': busy_timeout_ms / 1000.0}
+    else:
+        options.update(
+            pool_size=config.get('DB_POOL_SIZE', 10),
+            max_overflow=config.get('DB_MAX_OVERFLOW', 20),
+            pool_timeout=config.get('DB_POOL_TIMEOUT', 30),
+            pool_recycle=config.get('DB_POOL_RECYCLE', 1800),
+            pool_pre_ping=config.get('DB_POOL_PRE_PING', True),
+        )
+    options.update(config.get('SQLALCHEMY_ENGINE_OPTIONS') or {})
+    return options
+
+
+def install_sqlite_pragmas(engine, pragmas):
+    """Chạy các PRAGMA cho mỗi kết nối DBAPI mới của engine SQLite (WAL, synchronous, ...)."""
+    statements = [f"PRAGMA {name} = {value}" for name, value in (pragmas or {}).items()
+                  if value is not None and value != '']
+    if engine.dialect.name != 'sqlite' or not statements:
+        return
+
+    @event.listens_for(engine, 'connect')
+    def _apply_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for statement in statements:
+                cursor.execute(statement)
+        finally:
+            cursor.close()
+
+
+def init_db_engine(app, db):
+    """Cấu hình engine (và engine replica chỉ đọc nếu có READ_REPLICA_DATABASE_URL) rồi khởi tạo Flask-SQLAlchemy."""
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = build_engine_options(app.config)
+    replica_url = app.config.get('READ_REPLICA_DATABASE_URL')
+    if replica_url:
+        binds = dict(app.config.get('SQLALCHEMY_BINDS') or {})
+        binds[REPLICA_BIND_KEY] = dict(build_engine_options(app.config, replica_url), url=replica_url)
+        app.config['SQLALCHEMY_BINDS'] = binds
+    db.init_app(app)
+    with app.app_context():
+        install_sqlite_pragmas(db.engine, app.config.get('SQLITE_PRAGMAS'))
+        if replica_url:
+            # Replica chỉ đọc: ghi nhầm vào replica sẽ báo lỗi ngay thay vì lệch dữ liệu.
+            install_sqlite_pragmas(db.engines[REPLICA_BIND_KEY],
+                                   dict(app.config.get('SQLITE_PRAGMAS') or {}, query_only='ON'))
+    init_read_routing(app)
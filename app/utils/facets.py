@@ -0,0 +1,155 @@
+# phone_management_api/app/utils/facets.py
+import time
+
+from sqlalchemy import case, func, text
+
+from app.extensions import db
+from app.models.phone import Phone
+from app.utils.search import NOT_READY_RECHECK_SECONDS
+
+# SQLite: bảng tổng hợp (hãng, khoảng giá, còn hàng) -> số phone, được trigger trên bảng phones cập nhật
+# trong cùng transaction với mọi thay đổi (ORM, bulk import, trừ/hoàn tồn kho bằng Core UPDATE).
+# Facet không lọc đọc từ bảng này (O(số ô facet)); facet có lọc quét phones một lần với GROUP BY.
+FACET_TABLE = 'phone_facet_counts'
+FACET_SOURCE_SUMMARY = 'summary'
+FACET_SOURCE_SCAN = 'scan'
+
+# Cận trên (không bao gồm) của các khoảng giá; khoảng cuối không có cận trên.
+# Đổi giá trị này cần chạy lại 'flask rebuild-facet-summary' để trigger dùng cận mới.
+PRICE_BUCKET_BOUNDS = (5_000_000, 10_000_000, 20_000_000, 30_000_000)
+
+_TRIGGER_NAMES = ('phones_facets_ai', 'phones_facets_ad', 'phones_facets_au')
+# url CSDL -> True hoặc thời điểm (monotonic) lần kiểm tra thấy chưa có bảng tổng hợp; như search_index_ready,
+# kết quả False được kiểm tra lại sau NOT_READY_RECHECK_SECONDS (bảng có thể do `flask rebuild-facet-summary`
+# ở process khác tạo ra).
+_summary_ready = {}
+
+
+def _is_sqlite():
+    return db.engine.dialect.name == 'sqlite'
+
+
+def _bucket_sql(price):
+    whens = ' '.join(f"WHEN {price} < {bound} THEN {index}" for index, bound in enumerate(PRICE_BUCKET_BOUNDS))
+    return f"(CASE {whens} ELSE {len(PRICE_BUCKET_BOUNDS)} END)"
+
+
+def price_bucket_expression():
+    return case(*((Phone.price < bound, index) for index, bound in enumerate(PRICE_BUCKET_BOUNDS)),
+                else_=len(PRICE_BUCKET_BOUNDS))
+
+
+def _upsert_sql(row):
+    return (f"INSERT INTO {FACET_TABLE}(manufacturer, price_bucket, in_stock, phone_count) "
+            f"VALUES ({row}.manufacturer, {_bucket_sql(row + '.price')}, {row}.stock_quantity > 0, 1) "
+            "ON CONFLICT(manufacturer, price_bucket, in_stock) DO UPDATE SET phone_count = phone_count + 1;")
+
+
+def _decrement_sql(row):
+    return (f"UPDATE {FACET_TABLE} SET phone_count = phone_count - 1 "
+            f"WHERE manufacturer = {row}.manufacturer AND price_bucket = {_bucket_sql(row + '.price')} "
+            f"AND in_stock = ({row}.stock_quantity > 0);")
+
+
+def facet_summary_ready():
+    key = str(db.engine.url)
+    state = _summary_ready.get(key)
+    if state is True:
+        return True
+    if state is not None and time.monotonic() - state < NOT_READY_RECHECK_SECONDS:
+        return False
+    ready = _is_sqlite() and db.session.execute(
+        text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"), {'name': FACET_TABLE}
+    ).first() is not None
+    _summary_ready[key] = True if ready else time.monotonic()
+    return ready
+
+
+def drop_facet_summary():
+    """Gỡ bảng tổng hợp và trigger (vd. trước khi nạp dữ liệu lớn; dựng lại bằng rebuild_facet_summary)."""
+    if not _is_sqlite():
+        return
+    for name in _TRIGGER_NAMES:
+        db.session.execute(text(f"DROP TRIGGER IF EXISTS {name}"))
+    db.session.execute(text(f"DROP TABLE IF EXISTS {FACET_TABLE}"))
+    db.session.commit()
+    _summary_ready[str(db.engine.url)] = time.monotonic()
+
+
+def rebuild_facet_summary():
+    """Tạo (lại) bảng tổng hợp facet + trigger và đổ số đếm từ bảng phones. Trả về số ô facet."""
+    if not _is_sqlite():
+        return 0
+    for name in _TRIGGER_NAMES:
+        db.session.execute(text(f"DROP TRIGGER IF EXISTS {name}"))
+    db.session.execute(text(f"DROP TABLE IF EXISTS {FACET_TABLE}"))
+    db.session.execute(text(
+        f"CREATE TABLE {FACET_TABLE} (manufacturer TEXT NOT NULL, price_bucket INTEGER NOT NULL, "
+        "in_stock INTEGER NOT NULL, phone_count INTEGER NOT NULL, "
+        "PRIMARY KEY (manufacturer, price_bucket, in_stock))"
+    ))
+    db.session.execute(text(
+        f"INSERT INTO {FACET_TABLE}(manufacturer, price_bucket, in_stock, phone_count) "
+        f"SELECT manufacturer, {_bucket_sql('price')}, stock_quantity > 0, COUNT(*) FROM phones GROUP BY 1, 2, 3"
+    ))
+    insert_trigger, delete_trigger, update_trigger = _TRIGGER_NAMES
+    db.session.execute(text(
+        f"CREATE TRIGGER {insert_trigger} AFTER INSERT ON phones BEGIN {_upsert_sql('NEW')} END"
+    ))
+    db.session.execute(text(
+        f"CREATE TRIGGER {delete_trigger} AFTER DELETE ON phones BEGIN {_decrement_sql('OLD')} END"
+    ))
+    # Chỉ chạy khi phone đổi ô facet (vd. tồn kho về 0), không phải mọi lần trừ tồn kho.
+    db.session.execute(text(
+        f"CREATE TRIGGER {update_trigger} AFTER UPDATE OF manufacturer, price, stock_quantity ON phones "
+        f"WHEN OLD.manufacturer IS NOT NEW.manufacturer "
+        f"OR {_bucket_sql('OLD.price')} != {_bucket_sql('NEW.price')} "
+        f"OR (OLD.stock_quantity > 0) != (NEW.stock_quantity > 0) "
+        f"BEGIN {_decrement_sql('OLD')} {_upsert_sql('NEW')} END"
+    ))
+    db.session.commit()
+    _summary_ready[str(db.engine.url)] = True
+    return db.session.execute(text(f"SELECT COUNT(*) FROM {FACET_TABLE}")).scalar()
+
+
+def ensure_facet_summary():
+    """Tạo bảng tổng hợp facet nếu chưa có (kèm đổ số đếm hiện tại)."""
+    if _is_sqlite() and not facet_summary_ready():
+        rebuild_facet_summary()
+
+
+def _facet_cells(filtered_query=None):
+    """[(hãng, khoảng giá, còn hàng, số phone)] từ bảng tổng hợp, hoặc một lần quét query đã lọc."""
+    if filtered_query is None and facet_summary_ready():
+        rows = db.session.execute(text(
+            f"SELECT manufacturer, price_bucket, in_stock, phone_count FROM {FACET_TABLE} WHERE phone_count > 0"
+        )).all()
+        return rows, FACET_SOURCE_SUMMARY
+    query = filtered_query if filtered_query is not None else Phone.query
+    bucket = price_bucket_expression()
+    in_stock = case((Phone.stock_quantity > 0, 1), else_=0)
+    rows = query.order_by(None).with_entities(Phone.manufacturer, bucket, in_stock, func.count(Phone.id))\
+                .group_by(Phone.manufacturer, bucket, in_stock).all()
+    return rows, FACET_SOURCE_SCAN
+
+
+def compute_facets(filtered_query=None):
+    """Facet theo hãng, khoảng giá và tình trạng còn hàng. filtered_query=None: toàn bộ catalog."""
+    cells, source = _facet_cells(filtered_query)
+    manufacturers = {}
+    buckets = [0] * (len(PRICE_BUCKET_BOUNDS) + 1)
+    stock = {'in_stock': 0, 'out_of_stock': 0}
+    for manufacturer, price_bucket, in_stock, count in cells:
+        manufacturers[manufacturer] = manufacturers.get(manufacturer, 0) + count
+        buckets[price_bucket] += count
+        stock['in_stock' if in_stock else 'out_of_stock'] += count
+
+    bounds = (None, *PRICE_BUCKET_BOUNDS, None)
+    return {
+        'total_items': sum(buckets),
+        'manufacturers': [{'value': name, 'count': count} for name, count in
+                          sorted(manufacturers.items(), key=lambda item: (-item[1], item[0]))],
+        'price_buckets': [{'min': bounds[index], 'max': bounds[index + 1], 'count': count}
+                          for index, count in enumerate(buckets)],
+        'availability': stock,
+    }, source
@@ -0,0 +1,28 @@
+# phone_management_api/app/utils/fieldsets.py
+from flask import abort, request
+
+FIELDS_PARAM = 'fields'
+
+
+def requested_fields(schema):
+    """Đọc ?fields=a,b,c (sparse fieldset) theo các field output của schema.
+
+    Trả về tuple tên field theo thứ tự khai báo trong schema, hoặc None nếu không truyền 'fields'.
+    """
+    raw = request.args.get(FIELDS_PARAM)
+    if raw is None:
+        return None
+    names = {name.strip() for name in raw.split(',') if name.strip()}
+    if not names:
+        abort(400, description="Tham số 'fields' phải chứa ít nhất một trường.")
+    allowed = list(schema.dump_fields)
+    unknown = sorted(names.difference(allowed))
+    if unknown:
+        abort(400, description=f"Trường không hợp lệ trong 'fields': {', '.join(unknown)}. "
+                               f"Các trường hợp lệ: {', '.join(allowed)}")
+    return tuple(name for name in allowed if name in names)
+
+
+def fields_etag_part(fields):
+    """Thành phần ETag theo fieldset: mỗi fieldset là một biểu diễn khác nhau của cùng tài nguyên."""
+    return None if fields is None else ','.join(fields)
@@ -1,51 +1,114 @@
 # phone_management_api/app/utils/helpers.py
-from flask import abort, current_app 
+from flask import abort, current_app, g
+from flask_jwt_extended import get_jwt_identity
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import joinedload, load_only, selectinload
+from sqlalchemy.orm.attributes import set_committed_value
 import traceback 
 
 from app.extensions import db
 from app.models.user import User
-from app.models.cart import Cart 
+from app.models.cart import Cart, CartItem
+from app.models.order import Order, OrderItem
+from app.utils.read_rows import ORDER_FIELD_COLUMNS, select_columns
 
-def get_or_create_user_cart(user_id):
+_UPSERT_INSERTS = {'sqlite': sqlite_insert, 'postgresql': postgresql_insert}
+
+
+def upsert_insert(model):
+    """insert() theo dialect có on_conflict_do_nothing (SQLite, PostgreSQL); None với dialect khác."""
+    dialect_insert = _UPSERT_INSERTS.get(db.engine.dialect.name)
+    return dialect_insert(model) if dialect_insert is not None else None
 
-    current_app.logger.info(f"Gọi get_or_create_user_cart với user_id: {user_id} (kiểu: {type(user_id)})")
 
+def get_or_create_user_cart(user_id):
+    """Giỏ hàng của user_id (tạo nếu chưa có) cho ngữ cảnh ngoài request, vd. lệnh seed-db.
+
+    Trong route dùng resolve_user_cart: vai trò đã được kiểm tra từ claims JWT.
+    """
     try:
         processed_user_id = int(user_id)
     except ValueError:
-        current_app.logger.error(f"user_id '{user_id}' không thể chuyển đổi sang integer.")
         abort(400, description="Định dạng user ID không hợp lệ.")
 
-    user = User.query.get(processed_user_id)
+    user = db.session.get(User, processed_user_id)
     if not user:
-        current_app.logger.error(f"Không tìm thấy User với ID {processed_user_id} trong CSDL.")
         abort(404, description=f"Người dùng với ID {processed_user_id} không tồn tại.")
-
-    current_app.logger.info(f"Tìm thấy User: {user.username} (ID: {user.id}, Role: {user.role})")
-
     if user.role != 'buyer':
-        current_app.logger.warning(f"User {user.username} (ID: {user.id}) có vai trò '{user.role}', không phải 'buyer'. Không thể có giỏ hàng.")
         abort(403, description="Chỉ người dùng có vai trò 'buyer' mới có thể có giỏ hàng.")
 
-
-    cart = user.cart 
-
+    cart = user.cart
     if not cart:
-        current_app.logger.info(f"Không tìm thấy giỏ hàng cho user ID {user.id} ({user.username}). Đang tạo giỏ hàng mới...")
-        cart = Cart(user_id=user.id) 
-
-        
+        cart = Cart(user_id=user.id)
         db.session.add(cart)
         try:
-            current_app.logger.info(f"Chuẩn bị commit giỏ hàng mới cho user ID {user.id}...")
-            db.session.commit() 
-            current_app.logger.info(f"ĐÃ TẠO và commit giỏ hàng mới ID {cart.id} cho user ID {user.id} ({user.username}).")
+            db.session.commit()
         except Exception as e:
             db.session.rollback()
-            current_app.logger.error(f"LỖI EXCEPTION khi commit giỏ hàng mới cho user ID {user.id} ({user.username}): {str(e)}")
-            current_app.logger.error(traceback.format_exc()) 
-            abort(500, description="Không thể tạo giỏ hàng cho người dùng do lỗi máy chủ.") 
-    else:
-        current_app.logger.info(f"Đã tìm thấy giỏ hàng ID {cart.id} cho user ID {user.id} ({user.username}).")
-        
-    return cart
\ No newline at end of file
+            current_app.logger.error(f"Lỗi khi tạo giỏ hàng cho user ID {user.id}: {str(e)}")
+            current_app.logger.error(traceback.format_exc())
+            abort(500, description="Không thể tạo giỏ hàng cho người dùng do lỗi máy chủ.")
+    return cart
+
+
+def _insert_cart_if_missing(user_id):
+    """INSERT ... ON CONFLICT (user_id) DO NOTHING: an toàn khi nhiều request cùng tạo giỏ cho một user."""
+    statement = upsert_insert(Cart)
+    if statement is None:
+        db.session.add(Cart(user_id=user_id))
+        try:
+            db.session.commit()
+        except IntegrityError:
+            db.session.rollback()
+        return
+    db.session.execute(statement.values(user_id=user_id).on_conflict_do_nothing(index_elements=[Cart.user_id]))
+    db.session.commit()
+
+
+def resolve_user_cart(create=True):
+    """Giỏ hàng của người mua trong JWT của request hiện tại, ghi nhớ trong flask.g.
+
+    Tin vào claims đã được buyer_required kiểm tra (không nạp lại User): một SELECT theo carts.user_id;
+    chỉ khi chưa có giỏ (và create=True) mới thêm một câu INSERT ... ON CONFLICT DO NOTHING.
+    Trả về None nếu chưa có giỏ và create=False.
+    """
+    cart = g.get('_user_cart')
+    if cart is not None:
+        return cart
+    user_id = int(get_jwt_identity())
+    cart = Cart.query.filter_by(user_id=user_id).first()
+    if cart is None and create:
+        _insert_cart_if_missing(user_id)
+        cart = Cart.query.filter_by(user_id=user_id).one()
+    g._user_cart = cart
+    return cart
+
+def load_cart_for_read(cart):
+    """Nạp sẵn các mục và phone của giỏ bằng một truy vấn JOIN (tránh N+1 khi serialize)."""
+    items = CartItem.query.options(joinedload(CartItem.phone))\
+                          .filter(CartItem.cart_id == cart.id)\
+                          .order_by(CartItem.id).all()
+    set_committed_value(cart, 'items', items)
+    return cart
+
+
+def order_read_options(fields=None):
+    """Eager-load cho serialize đơn hàng: items + phone (selectin) và user (một truy vấn cho cả trang).
+
+    Với sparse fieldset (`fields`), chỉ nạp các cột/quan hệ được yêu cầu.
+    """
+    options = []
+    if fields is None or 'items' in fields:
+        options.append(selectinload(Order.items).joinedload(OrderItem.phone))
+    if fields is None or 'user' in fields:
+        options.append(selectinload(Order.user))
+    if fields is not None:
+        options.append(load_only(*select_columns(ORDER_FIELD_COLUMNS, fields, (Order.id,))))
+    return tuple(options)
+
+
+def load_order_for_read(order_id, fields=None):
+    return Order.query.options(*order_read_options(fields)).populate_existing()\
+                      .filter(Order.id == order_id).one()
\ No newline at end of file
@@ -0,0 +1,185 @@
+# phone_management_api/app/utils/idempotency.py
+import hashlib
+from datetime import datetime, timedelta, timezone
+from functools import wraps
+
+from flask import current_app, abort, g, make_response, request
+from flask_jwt_extended import get_jwt_identity
+from sqlalchemy import and_, delete, insert, or_, select, update
+from sqlalchemy.exc import IntegrityError
+from werkzeug.exceptions import Conflict, UnprocessableEntity
+
+from app.extensions import db
+from app.models.idempotency import IdempotencyKey
+from app.utils.conditional import as_utc
+from app.utils.helpers import upsert_insert
+
+# Header Idempotency-Key cho các POST có tác dụng phụ (đặt hàng, thêm vào giỏ, hủy đơn).
+# Request đầu tiên giữ khóa in-flight (một dòng idempotency_keys, commit ngay) rồi mới chạy handler;
+# phản hồi thành công (2xx) hoặc lỗi dữ liệu đầu vào (400/422, lặp lại y hệt với cùng body) được lưu lại
+# và trả nguyên văn cho các lần gửi lại cùng key trong thời hạn, không chạy lại handler (không đụng tới
+# bảng phones/carts/orders). Các phản hồi khác (409 hết hàng, 404, 5xx...) phụ thuộc trạng thái hiện tại:
+# bỏ khóa để lần gửi lại chạy lại request.
+IDEMPOTENCY_KEY_HEADER = 'Idempotency-Key'
+IDEMPOTENT_REPLAYED_HEADER = 'Idempotent-Replayed'
+MAX_IDEMPOTENCY_KEY_LENGTH = 255
+_STORED_ERROR_STATUSES = (400, 422)
+
+# Đọc Row (không phải instance ORM) để commit không làm hết hạn và nạp lại dòng.
+_STORED_COLUMNS = select(IdempotencyKey.id, IdempotencyKey.request_hash, IdempotencyKey.response_status,
+                         IdempotencyKey.response_body, IdempotencyKey.response_content_type,
+                         IdempotencyKey.locked_until, IdempotencyKey.expires_at)
+
+
+def _request_hash():
+    """Dấu vân tay của request: cùng key phải đi kèm cùng method, đường dẫn và body."""
+    digest = hashlib.sha256()
+    for part in (request.method.encode(), request.path.encode(), request.get_data()):
+        digest.update(part)
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+
+def _claim(user_id, key, request_hash, now):
+    """Giữ khóa in-flight cho (user_id, key). Trả về None nếu giữ được, ngược lại là dòng đã có."""
+    config = current_app.config
+    lock = dict(request_hash=request_hash, response_status=None, response_body=None, response_content_type=None,
+                created_at=now, locked_until=now + timedelta(seconds=config.get('IDEMPOTENCY_LOCK_TIMEOUT', 60)),
+                expires_at=now + timedelta(seconds=config.get('IDEMPOTENCY_KEY_TTL', 86400)))
+
+    statement = upsert_insert(IdempotencyKey)
+    if statement is not None:
+        claimed = db.session.execute(statement.values(user_id=user_id, key=key, **lock)
+                                     .on_conflict_do_nothing(index_elements=['user_id', 'key'])).rowcount == 1
+    else:
+        try:
+            db.session.execute(insert(IdempotencyKey).values(user_id=user_id, key=key, **lock))
+            claimed = True
+        except IntegrityError:
+            db.session.rollback()
+            claimed = False
+    if claimed:
+        db.session.commit()
+        return None
+
+    existing = db.session.execute(_STORED_COLUMNS.where(IdempotencyKey.user_id == user_id,
+                                                        IdempotencyKey.key == key)).first()
+    if existing is None:  # request giữ khóa vừa lỗi và bỏ khóa: thử giữ lại
+        db.session.commit()
+        return _claim(user_id, key, request_hash, now)
+    stale = existing is not None and (
+        as_utc(existing.expires_at) <= now
+        or (existing.response_status is None and as_utc(existing.locked_until) <= now))
+    if stale:
+        # Key đã hết hạn, hoặc request trước bị gián đoạn giữa chừng: chiếm lại (UPDATE có điều kiện
+        # để chỉ một trong các request đồng thời thắng).
+        claimed = db.session.execute(
+            update(IdempotencyKey)
+            .where(IdempotencyKey.id == existing.id,
+                   or_(IdempotencyKey.expires_at <= now,
+                       and_(IdempotencyKey.response_status.is_(None), IdempotencyKey.locked_until <= now)))
+            .values(**lock).execution_options(synchronize_session=False)
+        ).rowcount == 1
+        db.session.commit()
+        if claimed:
+            return None
+        existing = db.session.execute(_STORED_COLUMNS.where(IdempotencyKey.id == existing.id)).first()
+    db.session.commit()
+    return existing
+
+
+def _in_flight_response(message):
+    response = make_response(current_app.handle_user_exception(Conflict(description=message)))
+    response.headers['Retry-After'] = '1'
+    return response
+
+
+def _is_stored(status_code):
+    return (200 <= status_code < 300 or status_code in _STORED_ERROR_STATUSES) \
+        and not g.get('_idempotency_transient', False)
+
+
+def abort_transient(code, description):
+    """abort() cho lỗi phụ thuộc trạng thái hiện tại (vd. hết hàng, giỏ trống): không lưu theo Idempotency-Key,
+    lần gửi lại cùng key sẽ chạy lại request."""
+    g._idempotency_transient = True
+    abort(code, description=description)
+
+
+def _release(user_id, key):
+    """Bỏ khóa in-flight (phản hồi không được lưu/exception) để client gửi lại cùng key được chạy lại."""
+    db.session.rollback()
+    db.session.execute(delete(IdempotencyKey).where(IdempotencyKey.user_id == user_id, IdempotencyKey.key == key,
+                                                    IdempotencyKey.response_status.is_(None)))
+    db.session.commit()
+
+
+def _store(user_id, key, request_hash, response):
+    db.session.rollback()  # handler đã commit; bỏ mọi thay đổi còn dở của session
+    db.session.execute(
+        update(IdempotencyKey)
+        .where(IdempotencyKey.user_id == user_id, IdempotencyKey.key == key,
+               IdempotencyKey.request_hash == request_hash, IdempotencyKey.response_status.is_(None))
+        .values(response_status=response.status_code, response_body=response.get_data(as_text=True),
+                response_content_type=response.content_type)
+        .execution_options(synchronize_session=False)
+    )
+    db.session.commit()
+
+
+def idempotent(fn):
+    """Hỗ trợ header Idempotency-Key cho view (đặt sau jwt_required / kiểm tra vai trò).
+
+    Không có header: chạy như bình thường. Gửi lại cùng key: trả phản hồi đã lưu (2xx, 400, 422; kèm
+    Idempotent-Replayed: true), các phản hồi khác thì chạy lại request;
+    key đang được request khác xử lý: 409 + Retry-After; cùng key nhưng request khác: 422.
+    """
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        key = request.headers.get(IDEMPOTENCY_KEY_HEADER)
+        if key is None or request.method == 'OPTIONS':
+            return fn(*args, **kwargs)
+        key = key.strip()
+        if not key or len(key) > MAX_IDEMPOTENCY_KEY_LENGTH:
+            abort(400, description=f"Header {IDEMPOTENCY_KEY_HEADER} phải có từ 1 đến "
+                                   f"{MAX_IDEMPOTENCY_KEY_LENGTH} ký tự.")
+
+        user_id = int(get_jwt_identity())
+        request_hash = _request_hash()
+        existing = _claim(user_id, key, request_hash, datetime.now(timezone.utc))
+        if existing is not None:
+            if existing.request_hash != request_hash:
+                return current_app.handle_user_exception(UnprocessableEntity(
+                    description=f"{IDEMPOTENCY_KEY_HEADER} này đã được dùng cho một yêu cầu khác."))
+            if existing.response_status is None:
+                return _in_flight_response("Yêu cầu với Idempotency-Key này đang được xử lý. Vui lòng thử lại sau.")
+            response = current_app.response_class(existing.response_body, status=existing.response_status,
+                                                  content_type=existing.response_content_type)
+            response.headers[IDEMPOTENT_REPLAYED_HEADER] = 'true'
+            return response
+
+        try:
+            try:
+                response = make_response(fn(*args, **kwargs))
+            except Exception as e:
+                # abort()/ValidationError -> phản hồi lỗi qua errorhandler của app.
+                response = make_response(current_app.handle_user_exception(e))
+        except Exception:
+            _release(user_id, key)
+            raise
+        if _is_stored(response.status_code):
+            _store(user_id, key, request_hash, response)
+        else:
+            _release(user_id, key)
+        return response
+    return wrapper
+
+
+def purge_expired_idempotency_keys():
+    """Xóa các key đã hết hạn (không còn khóa in-flight). Trả về số dòng đã xóa."""
+    now = datetime.now(timezone.utc)
+    result = db.session.execute(delete(IdempotencyKey).where(
+        IdempotencyKey.expires_at <= now,
+        or_(IdempotencyKey.response_status.is_not(None), IdempotencyKey.locked_until <= now)))
+    db.session.commit()
+    return result.rowcount
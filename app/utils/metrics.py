@@ -0,0 +1,243 @@
+# phone_management_api/app/utils/metrics.py
+import hmac
+import threading
+import time
+from bisect import bisect_left
+
+from flask import current_app, g, has_request_context, request, request_finished, request_started
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.utils.decorators import admin_required
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 200)
+MAX_RECORDED_STATEMENTS = 50
+
+
+class _Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.total = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        index = bisect_left(self.buckets, value)
+        if index < len(self.counts):
+            self.counts[index] += 1
+        self.total += 1
+        self.sum += value
+
+
+def _escape_label_value(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(**labels):
+    return '{' + ','.join(f'{key}="{_escape_label_value(value)}"' for key, value in labels.items()) + '}'
+
+
+def _format_number(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _RequestState:
+    __slots__ = ('started_at', 'query_count', 'db_time', 'serialization_time', 'serialization_depth', 'statements')
+
+    def __init__(self):
+        self.started_at = time.perf_counter()
+        self.query_count = 0
+        self.db_time = 0.0
+        self.serialization_time = 0.0
+        self.serialization_depth = 0
+        self.statements = []
+
+
+def _current_state():
+    if not has_request_context():
+        return None
+    return g.get('_request_metrics')
+
+
+class RequestMetrics:
+    """Thu thập số liệu theo endpoint: độ trễ, số truy vấn/thời gian DB, thời gian serialize.
+
+    Dựa trên signal request_started/request_finished của Flask và sự kiện
+    before/after_cursor_execute của SQLAlchemy; xuất ở /metrics theo định dạng Prometheus.
+    """
+
+    def __init__(self, app=None):
+        self.enabled = False
+        self.slow_request_threshold = None
+        self._lock = threading.Lock()
+        self._latency = {}
+        self._query_counts = {}
+        self._requests_total = {}
+        self._db_queries_total = {}
+        self._db_seconds_total = {}
+        self._serialization_seconds_total = {}
+        self._engine_listeners_installed = False
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.enabled = app.config.get('METRICS_ENABLED', False)
+        threshold_ms = app.config.get('SLOW_REQUEST_THRESHOLD_MS')
+        self.slow_request_threshold = threshold_ms / 1000.0 if threshold_ms else None
+        app.extensions['request_metrics'] = self
+        if not self.enabled:
+            return
+
+        request_started.connect(self._on_request_started, app)
+        request_finished.connect(self._on_request_finished, app)
+        if not self._engine_listeners_installed:
+            event.listen(Engine, 'before_cursor_execute', self._before_cursor_execute)
+            event.listen(Engine, 'after_cursor_execute', self._after_cursor_execute)
+            self._engine_listeners_installed = True
+        app.add_url_rule(app.config.get('METRICS_PATH', '/metrics'), 'metrics', self.metrics_view)
+
+    # --- hooks ---
+
+    def _on_request_started(self, sender, **extra):
+        g._request_metrics = _RequestState()
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        if _current_state() is not None:
+            conn.info.setdefault('_metrics_query_started', []).append(time.perf_counter())
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        state = _current_state()
+        started_stack = conn.info.get('_metrics_query_started')
+        if state is None or not started_stack:
+            return
+        elapsed = time.perf_counter() - started_stack.pop()
+        state.query_count += 1
+        state.db_time += elapsed
+        if self.slow_request_threshold is not None and len(state.statements) < MAX_RECORDED_STATEMENTS:
+            state.statements.append((elapsed, statement))
+
+    def _on_request_finished(self, sender, response, **extra):
+        state = _current_state()
+        if state is None:
+            return
+        duration = time.perf_counter() - state.started_at
+        endpoint = request.endpoint or 'unmatched'
+        method = request.method
+        key = (endpoint, method)
+
+        with self._lock:
+            self._latency.setdefault(key, _Histogram(LATENCY_BUCKETS)).observe(duration)
+            self._query_counts.setdefault(key, _Histogram(QUERY_COUNT_BUCKETS)).observe(state.query_count)
+            status_key = (endpoint, method, response.status_code)
+            self._requests_total[status_key] = self._requests_total.get(status_key, 0) + 1
+            self._db_queries_total[key] = self._db_queries_total.get(key, 0) + state.query_count
+            self._db_seconds_total[key] = self._db_seconds_total.get(key, 0.0) + state.db_time
+            self._serialization_seconds_total[key] = \
+                self._serialization_seconds_total.get(key, 0.0) + state.serialization_time
+
+        if self.slow_request_threshold is not None and duration >= self.slow_request_threshold:
+            slowest = sorted(state.statements, key=lambda item: item[0], reverse=True)[:5]
+            statements_text = '\n'.join(f"    [{elapsed * 1000:.1f} ms] {statement}" for elapsed, statement in slowest)
+            current_app.logger.warning(
+                f"Request chậm: {method} {request.full_path} ({endpoint}) mất {duration * 1000:.1f} ms, "
+                f"{state.query_count} truy vấn / {state.db_time * 1000:.1f} ms DB, "
+                f"serialize {state.serialization_time * 1000:.1f} ms. Truy vấn chậm nhất:\n{statements_text}"
+            )
+
+    # --- serialize ---
+
+    @staticmethod
+    def serialization_started():
+        state = _current_state()
+        if state is None:
+            return None
+        state.serialization_depth += 1
+        return time.perf_counter() if state.serialization_depth == 1 else None
+
+    @staticmethod
+    def serialization_finished(started_at):
+        state = _current_state()
+        if state is None:
+            return
+        state.serialization_depth -= 1
+        if started_at is not None:
+            state.serialization_time += time.perf_counter() - started_at
+
+    # --- export ---
+
+    def reset(self):
+        with self._lock:
+            for store in (self._latency, self._query_counts, self._requests_total, self._db_queries_total,
+                          self._db_seconds_total, self._serialization_seconds_total):
+                store.clear()
+
+    def render_prometheus(self):
+        lines = []
+        with self._lock:
+            self._render_histograms(lines, 'http_request_duration_seconds',
+                                    "Độ trễ request theo endpoint.", self._latency)
+            self._render_histograms(lines, 'http_request_db_queries',
+                                    "Số truy vấn SQL trên mỗi request.", self._query_counts)
+            lines.append('# HELP http_requests_total Tổng số request theo endpoint và status.')
+            lines.append('# TYPE http_requests_total counter')
+            for (endpoint, method, status), value in sorted(self._requests_total.items()):
+                lines.append(f'http_requests_total{_labels(endpoint=endpoint, method=method, status=status)} {value}')
+            for name, help_text, store in (
+                ('db_queries_total', "Tổng số truy vấn SQL theo endpoint.", self._db_queries_total),
+                ('db_query_seconds_total', "Tổng thời gian thực thi SQL theo endpoint.", self._db_seconds_total),
+                ('serialization_seconds_total', "Tổng thời gian marshmallow dump theo endpoint.",
+                 self._serialization_seconds_total),
+            ):
+                lines.append(f'# HELP {name} {help_text}')
+                lines.append(f'# TYPE {name} counter')
+                for (endpoint, method), value in sorted(store.items()):
+                    lines.append(f'{name}{_labels(endpoint=endpoint, method=method)} {_format_number(value)}')
+
+        cache = current_app.extensions.get('response_cache')
+        if cache is not None:
+            stats = cache.stats()
+            for name, field in (('response_cache_hits_total', 'hits'), ('response_cache_misses_total', 'misses')):
+                lines.append(f'# HELP {name} Số lần {field} của cache phản hồi catalog.')
+                lines.append(f'# TYPE {name} counter')
+                lines.append(f'{name} {stats[field]}')
+            lines.append('# HELP response_cache_entries Số mục đang có trong cache phản hồi (trong process).')
+            lines.append('# TYPE response_cache_entries gauge')
+            lines.append(f"response_cache_entries {stats['entries']}")
+        return '\n'.join(lines) + '\n'
+
+    @staticmethod
+    def _render_histograms(lines, name, help_text, store):
+        lines.append(f'# HELP {name} {help_text}')
+        lines.append(f'# TYPE {name} histogram')
+        for (endpoint, method), histogram in sorted(store.items()):
+            cumulative = 0
+            for bound, count in zip(histogram.buckets, histogram.counts):
+                cumulative += count
+                lines.append(f'{name}_bucket{_labels(endpoint=endpoint, method=method, le=_format_number(bound))} '
+                             f'{cumulative}')
+            lines.append(f'{name}_bucket{_labels(endpoint=endpoint, method=method, le="+Inf")} {histogram.total}')
+            lines.append(f'{name}_sum{_labels(endpoint=endpoint, method=method)} {_format_number(histogram.sum)}')
+            lines.append(f'{name}_count{_labels(endpoint=endpoint, method=method)} {histogram.total}')
+
+    def metrics_view(self):
+        """/metrics cho Prometheus (Authorization: Bearer <METRICS_TOKEN>) hoặc admin đăng nhập (JWT)."""
+        token = current_app.config.get('METRICS_TOKEN')
+        if token and hmac.compare_digest(request.headers.get('Authorization', ''), f'Bearer {token}'):
+            return self._metrics_response()
+        return admin_required(self._metrics_response)()
+
+    def _metrics_response(self):
+        return current_app.response_class(self.render_prometheus(),
+                                          content_type='text/plain; version=0.0.4; charset=utf-8')
+
+
+class TimedDumpMixin:
+    """Đo thời gian Schema.dump cho /metrics (chỉ tính lần dump ngoài cùng, bỏ qua Nested)."""
+
+    def dump(self, obj, *args, **kwargs):
+        started_at = RequestMetrics.serialization_started()
+        try:
+            return super().dump(obj, *args, **kwargs)
+        finally:
+            RequestMetrics.serialization_finished(started_at)
@@ -0,0 +1,82 @@
+# phone_management_api/app/utils/pagination.py
+import base64
+import binascii
+import json
+
+from flask import abort
+from sqlalchemy import and_, or_, asc, desc
+
+CURSOR_DIRECTION_NEXT = 'n'
+CURSOR_DIRECTION_PREV = 'p'
+
+
+def encode_cursor(sort_key, order, sort_value, row_id, direction):
+    payload = {'k': sort_key, 'o': order, 'v': sort_value, 'i': row_id, 'd': direction}
+    raw = json.dumps(payload, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(token, sort_key, order):
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')).decode('utf-8'))
+        direction = payload['d']
+        row_id = int(payload['i'])
+        sort_value = payload['v']
+    except (ValueError, KeyError, TypeError, binascii.Error, UnicodeError):
+        abort(400, description="Tham số 'cursor' không hợp lệ.")
+
+    if direction not in (CURSOR_DIRECTION_NEXT, CURSOR_DIRECTION_PREV):
+        abort(400, description="Tham số 'cursor' không hợp lệ.")
+    if payload.get('k') != sort_key or payload.get('o') != order:
+        abort(400, description="'cursor' không khớp với 'sort_by'/'order' hiện tại. Hãy bắt đầu lại từ trang đầu.")
+    return sort_value, row_id, direction
+
+
+def keyset_paginate(query, sort_key, sort_column, id_column, order, per_page, cursor_token=None):
+    """Phân trang theo keyset (sort_column, id): không dùng OFFSET, không đếm COUNT(*).
+
+    Trả về (items, next_cursor, prev_cursor).
+    """
+    direction = CURSOR_DIRECTION_NEXT
+    if cursor_token:
+        sort_value, last_id, direction = decode_cursor(cursor_token, sort_key, order)
+
+    # Trang "prev" được đọc theo chiều ngược lại rồi đảo kết quả.
+    ascending = (order == 'asc') == (direction == CURSOR_DIRECTION_NEXT)
+
+    if cursor_token:
+        if sort_column is id_column:
+            query = query.filter(id_column > last_id if ascending else id_column < last_id)
+        elif ascending:
+            query = query.filter(or_(sort_column > sort_value,
+                                     and_(sort_column == sort_value, id_column > last_id)))
+        else:
+            query = query.filter(or_(sort_column < sort_value,
+                                     and_(sort_column == sort_value, id_column < last_id)))
+
+    order_fn = asc if ascending else desc
+    if sort_column is id_column:
+        query = query.order_by(order_fn(id_column))
+    else:
+        query = query.order_by(order_fn(sort_column), order_fn(id_column))
+
+    rows = query.limit(per_page + 1).all()
+    has_more = len(rows) > per_page
+    items = rows[:per_page]
+    if direction == CURSOR_DIRECTION_PREV:
+        items.reverse()
+
+    if not items:
+        return items, None, None
+
+    def cursor_for(item, item_direction):
+        return encode_cursor(sort_key, order, getattr(item, sort_key), item.id, item_direction)
+
+    if direction == CURSOR_DIRECTION_NEXT:
+        next_cursor = cursor_for(items[-1], CURSOR_DIRECTION_NEXT) if has_more else None
+        prev_cursor = cursor_for(items[0], CURSOR_DIRECTION_PREV) if cursor_token else None
+    else:
+        next_cursor = cursor_for(items[-1], CURSOR_DIRECTION_NEXT)
+        prev_cursor = cursor_for(items[0], CURSOR_DIRECTION_PREV) if has_more else None
+    return items, next_cursor, prev_cursor
@@ -0,0 +1,180 @@
+# phone_management_api/app/utils/query_budget.py
+import re
+import threading
+from collections import Counter
+from contextlib import ContextDecorator
+
+from flask import request, request_finished, request_started
+from sqlalchemy import event
+
+from app.extensions import db
+
+# Ngân sách số câu SQL cho mỗi endpoint, khai báo cạnh blueprint bằng declare_query_budgets().
+# Giá trị None = không giới hạn (endpoint có số truy vấn tỷ lệ với dữ liệu đầu vào, vd. bulk import).
+_endpoint_budgets = {}
+
+_WHITESPACE_RE = re.compile(r'\s+')
+_IN_LIST_RE = re.compile(r'\bIN\s*\((?:\s*[?%:][^,()]*,?)+\)', re.IGNORECASE)
+_LITERAL_RE = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+def declare_query_budgets(blueprint, budgets):
+    """Khai báo số câu SQL tối đa cho từng view của blueprint: {tên_view: số | None}."""
+    for view_name, max_queries in budgets.items():
+        _endpoint_budgets[f'{blueprint.name}.{view_name}'] = max_queries
+
+
+def get_query_budget(endpoint):
+    """Trả về (có_khai_báo, ngân_sách) cho endpoint dạng 'bp_name.view_name'."""
+    return endpoint in _endpoint_budgets, _endpoint_budgets.get(endpoint)
+
+
+def endpoints_without_budget(app):
+    """Các endpoint thuộc blueprint chưa khai báo ngân sách truy vấn."""
+    return sorted(rule.endpoint for rule in app.url_map.iter_rules()
+                  if '.' in rule.endpoint and rule.endpoint not in _endpoint_budgets
+                  and not rule.endpoint.endswith('.static'))
+
+
+def normalize_statement(statement):
+    """Chuẩn hóa câu SQL để gom các câu chỉ khác tham số (phát hiện mẫu N+1)."""
+    statement = _WHITESPACE_RE.sub(' ', statement).strip()
+    statement = _IN_LIST_RE.sub('IN (...)', statement)
+    return _LITERAL_RE.sub('?', statement)
+
+
+def repeated_statements(statements, min_repeats=2):
+    """[(số lần, câu SQL đã chuẩn hóa)] của các câu lặp lại >= min_repeats lần, nhiều nhất trước."""
+    counts = Counter(normalize_statement(statement) for statement in statements)
+    return [(count, statement) for statement, count in counts.most_common() if count >= min_repeats]
+
+
+def format_query_report(label, statements, max_queries):
+    lines = [f"{label}: {len(statements)} truy vấn SQL, vượt ngân sách {max_queries}."]
+    repeated = repeated_statements(statements)
+    if repeated:
+        lines.append("Các câu lặp lại (nghi N+1):")
+        lines.extend(f"  {count}x {statement[:300]}" for count, statement in repeated[:5])
+    else:
+        lines.append("Các câu SQL đã chạy:")
+        lines.extend(f"  {normalize_statement(statement)[:300]}" for statement in statements[:20])
+    return '\n'.join(lines)
+
+
+class QueryRecorder:
+    """Ghi lại các câu SQL gửi tới engine trong khối `with` (mặc định: db.engine của app hiện tại)."""
+
+    def __init__(self, engine=None):
+        self.engine = engine
+        self.statements = []
+
+    def _on_execute(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+
+    def __enter__(self):
+        if self.engine is None:
+            self.engine = db.engine
+        self.statements = []
+        event.listen(self.engine, 'before_cursor_execute', self._on_execute)
+        return self
+
+    def __exit__(self, *exc):
+        event.remove(self.engine, 'before_cursor_execute', self._on_execute)
+        return False
+
+    @property
+    def count(self):
+        return len(self.statements)
+
+
+class query_budget(ContextDecorator):
+    """Context manager/decorator: raise QueryBudgetExceeded nếu khối chạy quá `max_queries` câu SQL.
+
+        with query_budget(3):
+            client.get('/cart/', headers=headers)
+    """
+
+    def __init__(self, max_queries, engine=None, label='Khối lệnh'):
+        self.max_queries = max_queries
+        self.engine = engine
+        self.label = label
+        self.recorder = None
+
+    def __enter__(self):
+        self.recorder = QueryRecorder(self.engine).__enter__()
+        return self.recorder
+
+    def __exit__(self, exc_type, exc, tb):
+        self.recorder.__exit__(exc_type, exc, tb)
+        if exc_type is None and self.recorder.count > self.max_queries:
+            raise QueryBudgetExceeded(format_query_report(self.label, self.recorder.statements, self.max_queries))
+        return False
+
+
+class EndpointBudgetMonitor:
+    """Đếm câu SQL cho từng request của app và so với ngân sách đã khai báo của endpoint.
+
+    Dùng trong test (fixture endpoint_query_budgets) hoặc script kiểm tra; check() raise nếu có vi phạm.
+    """
+
+    def __init__(self, app, require_budget=True):
+        self.app = app
+        self.require_budget = require_budget
+        self.observed = {}
+        self.violations = []
+        self._local = threading.local()
+        self._engines = []
+
+    def _on_execute(self, conn, cursor, statement, parameters, context, executemany):
+        statements = getattr(self._local, 'statements', None)
+        if statements is not None:
+            statements.append(statement)
+
+    def _on_request_started(self, sender, **extra):
+        self._local.statements = []
+
+    def _on_request_finished(self, sender, response, **extra):
+        statements = getattr(self._local, 'statements', None)
+        self._local.statements = None
+        endpoint = request.endpoint
+        if statements is None or endpoint is None or request.method == 'OPTIONS':
+            return
+        self.observed[endpoint] = max(self.observed.get(endpoint, 0), len(statements))
+        declared, max_queries = get_query_budget(endpoint)
+        if not declared:
+            if self.require_budget and '.' in endpoint:
+                self.violations.append(f"{endpoint}: chưa khai báo ngân sách truy vấn (declare_query_budgets).")
+            return
+        if max_queries is not None and len(statements) > max_queries:
+            self.violations.append(format_query_report(f"{request.method} {request.full_path} ({endpoint})",
+                                                       statements, max_queries))
+
+    def start(self):
+        with self.app.app_context():
+            self._engines = list(db.engines.values())  # gồm cả engine replica nếu có
+        for engine in self._engines:
+            event.listen(engine, 'before_cursor_execute', self._on_execute)
+        request_started.connect(self._on_request_started, self.app)
+        request_finished.connect(self._on_request_finished, self.app)
+        return self
+
+    def stop(self):
+        request_started.disconnect(self._on_request_started, self.app)
+        request_finished.disconnect(self._on_request_finished, self.app)
+        for engine in self._engines:
+            event.remove(engine, 'before_cursor_execute', self._on_execute)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+        return False
+
+    def check(self):
+        if self.violations:
+            raise QueryBudgetExceeded('\n\n'.join(self.violations))
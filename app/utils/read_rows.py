@@ -0,0 +1,117 @@
+# phone_management_api/app/utils/read_rows.py
+from collections import namedtuple
+from functools import lru_cache
+
+from sqlalchemy import select
+
+from app.extensions import db
+from app.models.order import Order, OrderItem
+from app.models.phone import Phone
+from app.models.user import User
+
+# Các endpoint danh sách chỉ đọc rồi serialize: chọn đúng các cột cần thiết và trả về Row/DTO nhẹ
+# thay vì instance ORM (không vào identity map, không theo dõi thay đổi).
+# Tên thuộc tính trùng với model nên phones_serializer/orders_serializer dump được trực tiếp.
+
+# Field output của PhoneSchema / OrderSchema -> cột cần SELECT (sparse fieldset: ?fields=...).
+PHONE_FIELD_COLUMNS = {
+    'id': Phone.id, 'model_name': Phone.model_name, 'manufacturer': Phone.manufacturer,
+    'price': Phone.price, 'stock_quantity': Phone.stock_quantity,
+    'specifications': Phone.specifications, 'added_by_user_id': Phone.user_id,
+}
+ORDER_FIELD_COLUMNS = {
+    'id': Order.id, 'total_amount': Order.total_amount, 'status': Order.status,
+    'shipping_address': Order.shipping_address, 'created_at': Order.created_at,
+    'updated_at': Order.updated_at, 'user': Order.user_id, 'items': None,
+}
+
+PHONE_ROW_COLUMNS = tuple(PHONE_FIELD_COLUMNS.values())
+ORDER_ROW_COLUMNS = tuple(column for column in ORDER_FIELD_COLUMNS.values() if column is not None)
+
+PhoneRef = namedtuple('PhoneRef', 'id model_name manufacturer')
+UserRef = namedtuple('UserRef', 'id username')
+
+
+class OrderItemRow:
+    __slots__ = ('id', 'quantity', 'price_at_purchase', 'phone')
+
+    def __init__(self, id, quantity, price_at_purchase, phone):
+        self.id = id
+        self.quantity = quantity
+        self.price_at_purchase = price_at_purchase
+        self.phone = phone
+
+
+class OrderRow:
+    __slots__ = tuple(column.key for column in ORDER_ROW_COLUMNS) + ('user', 'items')
+
+    def __init__(self, row, user, items):
+        for key, value in zip(row._fields, row):
+            setattr(self, key, value)
+        self.user = user
+        self.items = items
+
+
+def select_columns(field_columns, fields, required=()):
+    """Các cột cần SELECT cho `fields` (None = tất cả) cộng các cột bắt buộc (id, cột sắp xếp...)."""
+    wanted = field_columns.values() if fields is None else (field_columns[name] for name in fields)
+    columns = {}
+    for column in (*required, *wanted):
+        if column is not None:
+            columns.setdefault(column.key, column)
+    return tuple(columns.values())
+
+
+@lru_cache(maxsize=None)
+def _row_type(keys):
+    return namedtuple('PhoneRow', keys)
+
+
+def phone_rows(query, fields=None, required=()):
+    """Query Phone (đã lọc) -> query trả về Row chỉ gồm các cột của `fields` (và `required`)."""
+    return query.with_entities(*select_columns(PHONE_FIELD_COLUMNS, fields, (Phone.id, *required)))
+
+
+def to_phone_rows(rows):
+    """Row (từ phone_rows) -> namedtuple để serialize.
+
+    Truy cập thuộc tính trên namedtuple nhanh hơn nhiều so với Row của SQLAlchemy.
+    """
+    if not rows:
+        return []
+    row_type = _row_type(tuple(rows[0]._fields))
+    return [row_type._make(row) for row in rows]
+
+
+def order_rows(query, fields=None, required=()):
+    """Query Order (đã lọc/join) -> query trả về Row gồm các cột của `fields` (và `required`)."""
+    return query.with_entities(*select_columns(ORDER_FIELD_COLUMNS, fields, (Order.id, *required)))
+
+
+def build_order_rows(rows, fields=None):
+    """Gắn user và items (kèm phone) cho một trang Row đơn hàng: tối đa 2 truy vấn Core.
+
+    Bỏ qua truy vấn của 'user'/'items' khi fieldset không yêu cầu.
+    """
+    if not rows:
+        return []
+    order_ids = [row.id for row in rows]
+
+    users = {}
+    if fields is None or 'user' in fields:
+        user_ids = {row.user_id for row in rows}
+        users = {user_id: UserRef(user_id, username) for user_id, username in db.session.execute(
+            select(User.id, User.username).where(User.id.in_(user_ids)))}
+
+    items_by_order = {order_id: [] for order_id in order_ids}
+    if fields is None or 'items' in fields:
+        item_query = select(OrderItem.order_id, OrderItem.id, OrderItem.quantity, OrderItem.price_at_purchase,
+                            Phone.id, Phone.model_name, Phone.manufacturer)\
+            .outerjoin(Phone, Phone.id == OrderItem.phone_id)\
+            .where(OrderItem.order_id.in_(order_ids))\
+            .order_by(OrderItem.id)
+        for order_id, item_id, quantity, price, phone_id, model_name, manufacturer in db.session.execute(item_query):
+            phone = PhoneRef(phone_id, model_name, manufacturer) if phone_id is not None else None
+            items_by_order[order_id].append(OrderItemRow(item_id, quantity, price, phone))
+
+    return [OrderRow(row, users.get(getattr(row, 'user_id', None)), items_by_order[row.id]) for row in rows]
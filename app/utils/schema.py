@@ -0,0 +1,35 @@
+# phone_management_api/app/utils/schema.py
+from datetime import datetime, timezone
+
+from sqlalchemy import inspect, text, update
+
+from app.extensions import db
+from app.models.phone import Phone
+
+# Cột/chỉ mục của bảng phones được thêm sau khi CSDL đã tạo (create_all không sửa bảng đã có).
+PHONE_ADDED_COLUMNS = ('updated_at',)
+PHONE_ADDED_INDEXES = ('ix_phones_user_id_id',)
+
+
+def ensure_phone_columns():
+    """Thêm phones.updated_at (điền thời điểm hiện tại) và chỉ mục ix_phones_user_id_id vào CSDL cũ.
+
+    Trả về danh sách cột đã thêm.
+    """
+    existing = {column['name'] for column in inspect(db.engine).get_columns(Phone.__tablename__)}
+    missing = [name for name in PHONE_ADDED_COLUMNS if name not in existing]
+    for name in missing:
+        column_type = Phone.__table__.c[name].type.compile(dialect=db.engine.dialect)
+        db.session.execute(text(f"ALTER TABLE {Phone.__tablename__} ADD COLUMN {name} {column_type}"))
+    if missing:
+        # Phone cũ chưa có phiên bản: lấy thời điểm nâng cấp làm Last-Modified/ETag ban đầu.
+        db.session.execute(update(Phone).where(Phone.updated_at.is_(None))
+                           .values(updated_at=datetime.now(timezone.utc))
+                           .execution_options(synchronize_session=False))
+    for index in Phone.__table__.indexes:
+        if index.name in PHONE_ADDED_INDEXES:
+            columns = ', '.join(column.name for column in index.columns)
+            db.session.execute(text(f"CREATE INDEX IF NOT EXISTS {index.name} "
+                                    f"ON {Phone.__tablename__} ({columns})"))
+    db.session.commit()
+    return missing
@@ -0,0 +1,140 @@
+# phone_management_api/app/utils/search.py
+import re
+import time
+
+from flask import abort, current_app
+from sqlalchemy import column, func, literal, or_, select, table, text
+
+from app.extensions import db
+from app.models.phone import Phone
+
+# SQLite: bảng FTS5 "bóng" (rowid = phones.id), được trigger trên bảng phones cập nhật trong cùng transaction
+# với mọi thay đổi (ORM, bulk import, Core insert/update, script ngoài). Các CSDL khác: chỉ mục trigram (pg_trgm).
+SEARCH_TABLE = 'phones_fts'
+_SEARCH_TRIGGER_NAMES = ('phones_fts_ai', 'phones_fts_ad', 'phones_fts_au')
+
+_SEARCH_TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+# url CSDL -> True (đã có chỉ mục và trigger) hoặc thời điểm (monotonic) của lần kiểm tra thấy chưa có.
+# Chỉ nhớ vĩnh viễn kết quả True: bảng có thể được tạo sau bởi process khác (worker khác,
+# `flask rebuild-search-index`), nên kết quả False được kiểm tra lại sau NOT_READY_RECHECK_SECONDS.
+_index_ready = {}
+NOT_READY_RECHECK_SECONDS = 5
+
+
+def _is_sqlite():
+    return db.engine.dialect.name == 'sqlite'
+
+
+def search_index_ready():
+    key = str(db.engine.url)
+    state = _index_ready.get(key)
+    if state is True:
+        return True
+    if state is not None and time.monotonic() - state < NOT_READY_RECHECK_SECONDS:
+        return False
+    # Bảng có mà thiếu trigger (CSDL cũ chưa chạy `flask init-db`) thì chỉ mục có thể đã lệch: coi như chưa có.
+    ready = not _is_sqlite() or db.session.execute(
+        text("SELECT COUNT(*) FROM sqlite_master WHERE (type = 'table' AND name = :table) "
+             "OR (type = 'trigger' AND name IN (:ai, :ad, :au))"),
+        dict(zip(('table', 'ai', 'ad', 'au'), (SEARCH_TABLE, *_SEARCH_TRIGGER_NAMES)))
+    ).scalar() == 1 + len(_SEARCH_TRIGGER_NAMES)
+    _index_ready[key] = True if ready else time.monotonic()
+    return ready
+
+
+def _insert_sql(row):
+    return (f"INSERT INTO {SEARCH_TABLE}(rowid, model_name, manufacturer) "
+            f"VALUES ({row}.id, {row}.model_name, {row}.manufacturer);")
+
+
+def _delete_sql(row):
+    return f"DELETE FROM {SEARCH_TABLE} WHERE rowid = {row}.id;"
+
+
+def ensure_search_index():
+    """Tạo chỉ mục tìm kiếm và trigger đồng bộ nếu chưa có (không đổ dữ liệu)."""
+    if _is_sqlite():
+        db.session.execute(text(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} "
+            "USING fts5(model_name, manufacturer, tokenize = 'unicode61 remove_diacritics 2')"
+        ))
+        insert_trigger, delete_trigger, update_trigger = _SEARCH_TRIGGER_NAMES
+        db.session.execute(text(
+            f"CREATE TRIGGER IF NOT EXISTS {insert_trigger} AFTER INSERT ON phones BEGIN {_insert_sql('NEW')} END"
+        ))
+        db.session.execute(text(
+            f"CREATE TRIGGER IF NOT EXISTS {delete_trigger} AFTER DELETE ON phones BEGIN {_delete_sql('OLD')} END"
+        ))
+        # Chỉ khi đổi các cột được đánh chỉ mục, không phải mỗi lần trừ tồn kho.
+        db.session.execute(text(
+            f"CREATE TRIGGER IF NOT EXISTS {update_trigger} AFTER UPDATE OF id, model_name, manufacturer ON phones "
+            f"BEGIN {_delete_sql('OLD')} {_insert_sql('NEW')} END"
+        ))
+    elif db.engine.dialect.name == 'postgresql':
+        db.session.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+        for col in ('model_name', 'manufacturer'):
+            db.session.execute(text(
+                f"CREATE INDEX IF NOT EXISTS ix_phones_{col}_trgm ON phones USING gin ({col} gin_trgm_ops)"
+            ))
+    db.session.commit()
+    _index_ready[str(db.engine.url)] = True
+
+
+def drop_search_index():
+    """Gỡ chỉ mục FTS5 và trigger (vd. trước khi nạp dữ liệu lớn; dựng lại bằng rebuild_search_index)."""
+    if not _is_sqlite():
+        return
+    for name in _SEARCH_TRIGGER_NAMES:
+        db.session.execute(text(f"DROP TRIGGER IF EXISTS {name}"))
+    db.session.execute(text(f"DROP TABLE IF EXISTS {SEARCH_TABLE}"))
+    db.session.commit()
+    _index_ready[str(db.engine.url)] = time.monotonic()
+
+
+def rebuild_search_index():
+    """Dựng lại toàn bộ chỉ mục (kèm trigger) từ bảng phones. Trả về số dòng đã đánh chỉ mục."""
+    if _is_sqlite():
+        for name in _SEARCH_TRIGGER_NAMES:
+            db.session.execute(text(f"DROP TRIGGER IF EXISTS {name}"))
+        db.session.execute(text(f"DROP TABLE IF EXISTS {SEARCH_TABLE}"))
+        _index_ready.pop(str(db.engine.url), None)
+        ensure_search_index()
+        db.session.execute(text(
+            f"INSERT INTO {SEARCH_TABLE}(rowid, model_name, manufacturer) "
+            "SELECT id, model_name, manufacturer FROM phones"
+        ))
+        db.session.commit()
+    else:
+        ensure_search_index()
+    return db.session.query(func.count(Phone.id)).scalar()
+
+
+def _fts_match_expression(q):
+    tokens = _SEARCH_TOKEN_RE.findall(q)
+    if not tokens:
+        abort(400, description="Tham số 'q' phải chứa ít nhất một từ khóa hợp lệ.")
+    # Mỗi từ khóa là một prefix query; các từ khóa được AND với nhau.
+    return ' '.join(f'"{token}"*' for token in tokens)
+
+
+def apply_search(query, q):
+    """Lọc query Phone theo 'q'. Trả về (query, rank_expression) - rank càng nhỏ càng khớp."""
+    if _is_sqlite():
+        if not search_index_ready():
+            current_app.logger.warning("Chưa có chỉ mục tìm kiếm; hãy chạy 'flask rebuild-search-index'.")
+            pattern = f"%{q}%"
+            query = query.filter(or_(Phone.model_name.ilike(pattern), Phone.manufacturer.ilike(pattern)))
+            return query, literal(0)
+
+        fts = table(SEARCH_TABLE, column('rowid'), column('rank'))
+        matches = select(fts.c.rowid.label('phone_id'), fts.c.rank.label('score'))\
+            .where(text(f"{SEARCH_TABLE} MATCH :fts_q").bindparams(fts_q=_fts_match_expression(q)))\
+            .subquery('search_matches')
+        query = query.join(matches, Phone.id == matches.c.phone_id)
+        return query, matches.c.score
+
+    pattern = f"%{q}%"
+    query = query.filter(or_(Phone.model_name.ilike(pattern), Phone.manufacturer.ilike(pattern)))
+    if db.engine.dialect.name == 'postgresql':
+        return query, -func.greatest(func.similarity(Phone.model_name, q), func.similarity(Phone.manufacturer, q))
+    return query, literal(0)
@@ -0,0 +1,254 @@
+# phone_management_api/app/utils/synthetic_data.py
+import random
+import time
+from array import array
+from datetime import datetime, timedelta
+from itertools import accumulate
+from math import gcd
+
+from sqlalchemy import func, insert
+
+from app.extensions import db
+from app.models.cart import Cart, CartItem
+from app.models.order import (Order, OrderItem, ORDER_STATUS_PENDING, ORDER_STATUS_PROCESSING,
+                              ORDER_STATUS_SHIPPED, ORDER_STATUS_DELIVERED, ORDER_STATUS_CANCELLED)
+from app.models.phone import Phone
+from app.models.user import User
+
+# Mốc thời gian cố định để cùng seed luôn cho cùng dữ liệu (kể cả created_at/updated_at).
+SYNTHETIC_EPOCH = datetime(2025, 1, 1)
+SYNTHETIC_SPAN_SECONDS = 365 * 24 * 3600
+
+# Thị phần lệch: vài hãng lớn chiếm phần lớn catalog.
+MANUFACTURER_WEIGHTS = {
+    'Samsung': 30, 'Apple': 24, 'Xiaomi': 18, 'Oppo': 10, 'Vivo': 7,
+    'Realme': 5, 'Google': 3, 'Nokia': 2, 'Sony': 1,
+}
+MANUFACTURER_SERIES = {
+    'Samsung': ('Galaxy S', 'Galaxy A', 'Galaxy Z Fold', 'Galaxy Z Flip', 'Galaxy Tab S'),
+    'Apple': ('iPhone', 'iPhone Pro', 'iPad Air', 'iPad Pro', 'MacBook Air M'),
+    'Xiaomi': ('Xiaomi', 'Redmi Note', 'Poco F', 'Xiaomi Pad'),
+    'Oppo': ('Find X', 'Reno', 'A'),
+    'Vivo': ('X', 'V', 'Y'),
+    'Realme': ('GT', 'C', 'Number'),
+    'Google': ('Pixel', 'Pixel Pro', 'Pixel Fold'),
+    'Nokia': ('G', 'C', 'XR'),
+    'Sony': ('Xperia 1', 'Xperia 5', 'Xperia 10'),
+}
+SPEC_FRAGMENTS = ('Camera 50MP', 'Camera 200MP', 'Pin 5000mAh', 'Sạc nhanh 67W', 'Màn hình AMOLED 120Hz',
+                  '8GB RAM', '12GB RAM', '256GB', '512GB', 'Kháng nước IP68', 'Hỗ trợ 5G')
+
+# Tỷ lệ trạng thái đơn hàng: phần lớn đã giao, một phần nhỏ bị hủy/đang chờ.
+ORDER_STATUS_WEIGHTS = {
+    ORDER_STATUS_DELIVERED: 48, ORDER_STATUS_SHIPPED: 17, ORDER_STATUS_PROCESSING: 13,
+    ORDER_STATUS_PENDING: 12, ORDER_STATUS_CANCELLED: 10,
+}
+QUANTITY_WEIGHTS = (70, 20, 7, 3)  # số lượng 1..4 cho mỗi dòng giỏ hàng/đơn hàng
+PHONE_ZIPF_EXPONENT = 1.07
+SELLER_ZIPF_EXPONENT = 1.2
+SYNTHETIC_ADDRESSES = ('Quận 1, TP. HCM', 'Quận 7, TP. HCM', 'Thủ Đức, TP. HCM', 'Ba Đình, Hà Nội',
+                       'Cầu Giấy, Hà Nội', 'Hải Châu, Đà Nẵng', 'Ninh Kiều, Cần Thơ')
+
+
+class ZipfSampler:
+    """Chọn chỉ số 0..n-1 theo phân phối Zipf; hạng được hoán vị cố định để SKU 'nóng' rải đều theo id."""
+
+    def __init__(self, n, exponent, rng):
+        self.n = n
+        self.rng = rng
+        self.cum_weights = array('d', accumulate(1.0 / (rank ** exponent) for rank in range(1, n + 1)))
+        self.population = range(n)
+        stride = rng.randrange(n // 2 + 1, n + 1) if n > 2 else 1
+        while gcd(stride, n) != 1:
+            stride += 1
+        self.stride = stride
+        self.offset = rng.randrange(n)
+
+    def sample(self, k=1):
+        ranks = self.rng.choices(self.population, cum_weights=self.cum_weights, k=k)
+        return [(rank * self.stride + self.offset) % self.n for rank in ranks]
+
+
+class _Progress:
+    def __init__(self, label, total, echo):
+        self.label = label
+        self.total = total
+        self.echo = echo
+        self.done = 0
+        self.started_at = time.perf_counter()
+
+    def advance(self, count):
+        self.done += count
+        elapsed = time.perf_counter() - self.started_at
+        rate = self.done / elapsed if elapsed else 0.0
+        if self.total:
+            done_text = f"{self.done:,}/{self.total:,} ({self.done * 100 // self.total}%)"
+        else:
+            done_text = f"{self.done:,}"
+        self.echo(f"  {self.label}: {done_text} - {rate:,.0f} dòng/s")
+
+    def finish(self):
+        elapsed = time.perf_counter() - self.started_at
+        rate = self.done / elapsed if elapsed else 0.0
+        self.echo(f"Đã tạo {self.done:,} {self.label} trong {elapsed:.1f}s ({rate:,.0f} dòng/s).")
+        return self.done, elapsed
+
+
+def _next_id(column):
+    return (db.session.query(func.max(column)).scalar() or 0) + 1
+
+
+def _timestamp(rng):
+    return SYNTHETIC_EPOCH + timedelta(seconds=rng.randrange(SYNTHETIC_SPAN_SECONDS))
+
+
+def _insert_chunked(table, rows, chunk_size, progress):
+    """Chèn bằng Core executemany, mỗi lô một transaction."""
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= chunk_size:
+            db.session.execute(insert(table), chunk)
+            db.session.commit()
+            progress.advance(len(chunk))
+            chunk = []
+    if chunk:
+        db.session.execute(insert(table), chunk)
+        db.session.commit()
+        progress.advance(len(chunk))
+    return progress.finish()
+
+
+def synthetic_counts(scale):
+    """Số dòng mỗi bảng cho --scale N (N = số phone)."""
+    buyers = max(10, scale // 2)
+    return {
+        'sellers': max(3, scale // 500),
+        'buyers': buyers,
+        'phones': scale,
+        'carts': max(1, buyers * 2 // 5),
+        'orders': scale,
+    }
+
+
+def generate_synthetic_data(scale, password_hash, seed=42, chunk_size=10000, echo=print):
+    """Sinh dữ liệu lớn, tái lập được theo seed: users, phones, carts và orders.
+
+    Đơn hàng tổng hợp không trừ tồn kho (coi như đã nhập thêm hàng); order_sellers và
+    chỉ mục tìm kiếm do nơi gọi điền lại sau đó. Trả về dict {bảng: (số dòng, giây)}.
+    """
+    rng = random.Random(seed)
+    counts = synthetic_counts(scale)
+    stats = {}
+
+    # --- USERS ---
+    first_user_id = _next_id(User.id)
+    seller_ids = range(first_user_id, first_user_id + counts['sellers'])
+    buyer_ids = range(seller_ids.stop, seller_ids.stop + counts['buyers'])
+
+    def user_rows():
+        for user_id in seller_ids:
+            yield {'id': user_id, 'username': f'synthetic_seller_{user_id}', 'password_hash': password_hash,
+                   'role': 'seller'}
+        for user_id in buyer_ids:
+            yield {'id': user_id, 'username': f'synthetic_buyer_{user_id}', 'password_hash': password_hash,
+                   'role': 'buyer'}
+
+    stats['users'] = _insert_chunked(User.__table__, user_rows(), chunk_size,
+                                     _Progress('users', len(seller_ids) + len(buyer_ids), echo))
+
+    # --- PHONES ---
+    first_phone_id = _next_id(Phone.id)
+    phone_prices = array('d')
+    manufacturers = list(MANUFACTURER_WEIGHTS)
+    manufacturer_weights = list(MANUFACTURER_WEIGHTS.values())
+    seller_sampler = ZipfSampler(len(seller_ids), SELLER_ZIPF_EXPONENT, rng)
+
+    def phone_rows():
+        for offset in range(counts['phones']):
+            manufacturer = rng.choices(manufacturers, weights=manufacturer_weights)[0]
+            series = rng.choice(MANUFACTURER_SERIES[manufacturer])
+            # Giá lệch phải quanh ~10 triệu, làm tròn 10.000 VND.
+            price = round(min(max(rng.lognormvariate(16.1, 0.6), 1_000_000), 80_000_000), -4)
+            phone_prices.append(price)
+            yield {
+                'id': first_phone_id + offset,
+                'model_name': f'{series} {rng.randint(1, 30)} {offset:07d}',
+                'manufacturer': manufacturer,
+                'price': price,
+                'stock_quantity': rng.choice((0, rng.randint(1, 20), rng.randint(20, 500))),
+                'specifications': ', '.join(rng.sample(SPEC_FRAGMENTS, 3)),
+                'user_id': seller_ids[seller_sampler.sample()[0]],
+                'updated_at': _timestamp(rng),
+            }
+
+    stats['phones'] = _insert_chunked(Phone.__table__, phone_rows(), chunk_size,
+                                      _Progress('phones', counts['phones'], echo))
+
+    phone_sampler = ZipfSampler(counts['phones'], PHONE_ZIPF_EXPONENT, rng)
+    quantities = range(1, len(QUANTITY_WEIGHTS) + 1)
+
+    def pick_lines(max_lines):
+        picked = dict.fromkeys(phone_sampler.sample(rng.randint(1, max_lines)))
+        return [(offset, rng.choices(quantities, weights=QUANTITY_WEIGHTS)[0]) for offset in picked]
+
+    # --- CARTS ---
+    first_cart_id = _next_id(Cart.id)
+    cart_lines = []
+
+    def cart_rows():
+        for index, buyer_id in enumerate(rng.sample(buyer_ids, counts['carts'])):
+            cart_id = first_cart_id + index
+            created_at = _timestamp(rng)
+            cart_lines.append((cart_id, created_at, pick_lines(5)))
+            yield {'id': cart_id, 'user_id': buyer_id, 'created_at': created_at, 'updated_at': created_at}
+
+    stats['carts'] = _insert_chunked(Cart.__table__, cart_rows(), chunk_size,
+                                     _Progress('carts', counts['carts'], echo))
+
+    def cart_item_rows():
+        while cart_lines:
+            cart_id, added_at, lines = cart_lines.pop()
+            for phone_offset, quantity in lines:
+                yield {'cart_id': cart_id, 'phone_id': first_phone_id + phone_offset, 'quantity': quantity,
+                       'added_at': added_at}
+
+    total_cart_items = sum(len(lines) for _, _, lines in cart_lines)
+    stats['cart_items'] = _insert_chunked(CartItem.__table__, cart_item_rows(), chunk_size,
+                                          _Progress('cart_items', total_cart_items, echo))
+
+    # --- ORDERS + ORDER ITEMS (sinh cùng nhau theo lô để không giữ toàn bộ trong bộ nhớ) ---
+    first_order_id = _next_id(Order.id)
+    statuses = list(ORDER_STATUS_WEIGHTS)
+    status_weights = list(ORDER_STATUS_WEIGHTS.values())
+    order_progress = _Progress('orders', counts['orders'], echo)
+    item_progress = _Progress('order_items', None, echo)
+    for chunk_start in range(0, counts['orders'], chunk_size):
+        orders, items = [], []
+        for order_id in range(first_order_id + chunk_start,
+                              first_order_id + min(chunk_start + chunk_size, counts['orders'])):
+            total = 0.0
+            for phone_offset, quantity in pick_lines(4):
+                price = phone_prices[phone_offset]
+                total += price * quantity
+                items.append({'order_id': order_id, 'phone_id': first_phone_id + phone_offset,
+                              'quantity': quantity, 'price_at_purchase': price})
+            created_at = _timestamp(rng)
+            orders.append({
+                'id': order_id,
+                'user_id': buyer_ids[rng.randrange(len(buyer_ids))],
+                'total_amount': round(total, 2),
+                'status': rng.choices(statuses, weights=status_weights)[0],
+                'shipping_address': f'{rng.randint(1, 999)} Đường số {rng.randint(1, 60)}, '
+                                    f'{rng.choice(SYNTHETIC_ADDRESSES)}',
+                'created_at': created_at,
+                'updated_at': created_at + timedelta(hours=rng.randint(0, 72)),
+            })
+        db.session.execute(insert(Order.__table__), orders)
+        db.session.execute(insert(OrderItem.__table__), items)
+        db.session.commit()
+        order_progress.advance(len(orders))
+        item_progress.advance(len(items))
+    stats['orders'] = order_progress.finish()
+    stats['order_items'] = item_progress.finish()
+    return stats
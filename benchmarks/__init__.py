@@ -0,0 +1 @@
+# phone_management_api/benchmarks/__init__.py
@@ -0,0 +1,71 @@
+# phone_management_api/benchmarks/bulk_import.py
+"""Đo tốc độ POST /phones/bulk (rows/sec) và bộ nhớ tối đa của process.
+
+    python -m benchmarks.bulk_import --rows 100000 --format ndjson
+"""
+import argparse
+import json
+import resource
+import tempfile
+import time
+
+from app.testing import create_user
+from benchmarks.common import make_app
+
+MANUFACTURERS = ['Apple', 'Samsung', 'Xiaomi', 'Oppo', 'Vivo', 'Nokia']
+
+
+def generate_lines(rows, import_format):
+    if import_format == 'csv':
+        yield b'model_name,manufacturer,price,stock_quantity,specifications\n'
+    for i in range(rows):
+        manufacturer = MANUFACTURERS[i % len(MANUFACTURERS)]
+        if import_format == 'csv':
+            yield f'Model {i},{manufacturer},{1000000 + i},{i % 200},Spec {i}\n'.encode('utf-8')
+        else:
+            yield (json.dumps({'model_name': f'Model {i}', 'manufacturer': manufacturer,
+                               'price': 1000000 + i, 'stock_quantity': i % 200,
+                               'specifications': f'Spec {i}'}) + '\n').encode('utf-8')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=50000)
+    parser.add_argument('--format', choices=['ndjson', 'csv'], default='ndjson')
+    parser.add_argument('--chunk-size', type=int, default=500)
+    args = parser.parse_args()
+
+    app, db_path = make_app(BULK_IMPORT_CHUNK_SIZE=args.chunk_size)
+    _, headers = create_user(app, 'bench_seller', 'seller')
+    content_type = 'text/csv' if args.format == 'csv' else 'application/x-ndjson'
+
+    # Dữ liệu được ghi ra file tạm (không giữ trong RAM) rồi stream lên endpoint.
+    with tempfile.TemporaryFile() as upload:
+        for line in generate_lines(args.rows, args.format):
+            upload.write(line)
+        upload.seek(0)
+
+        client = app.test_client()
+        rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        started = time.perf_counter()
+        response = client.post('/phones/bulk', input_stream=upload, content_type=content_type, headers=headers)
+        elapsed = time.perf_counter() - started
+        rss_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    report = response.get_json()
+    print(json.dumps({
+        'rows': args.rows,
+        'format': args.format,
+        'chunk_size': args.chunk_size,
+        'status': response.status_code,
+        'inserted': report.get('inserted'),
+        'failed': report.get('failed'),
+        'seconds': round(elapsed, 3),
+        'rows_per_sec': round(args.rows / elapsed, 1),
+        'max_rss_growth_kb': rss_after - rss_before,
+        'database': db_path,
+    }, indent=2))
+
+
+if __name__ == '__main__':
+    main()
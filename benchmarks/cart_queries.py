@@ -0,0 +1,47 @@
+# phone_management_api/benchmarks/cart_queries.py
+"""Kiểm tra hồi quy N+1: số câu SQL của GET /cart/ không được tăng theo số mục trong giỏ.
+
+    python -m benchmarks.cart_queries --lines 30
+"""
+import argparse
+import sys
+
+from app.testing import create_user, create_phones
+from benchmarks.common import make_app, QueryCounter
+
+
+def count_cart_queries(app, client, headers):
+    from app.extensions import db
+    with app.app_context():
+        engine = db.engine
+    with QueryCounter(engine) as counter:
+        response = client.get('/cart/', headers=headers)
+    assert response.status_code == 200, response.get_json()
+    return counter.count
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--lines', type=int, default=30)
+    args = parser.parse_args()
+
+    app, _ = make_app()
+    seller_id, _ = create_user(app, 'bench_seller', 'seller')
+    _, buyer_headers = create_user(app, 'bench_buyer', 'buyer')
+    phone_ids = create_phones(app, seller_id, args.lines)
+    client = app.test_client()
+
+    client.post('/cart/items', json={'phone_id': phone_ids[0], 'quantity': 1}, headers=buyer_headers)
+    one_line = count_cart_queries(app, client, buyer_headers)
+    for phone_id in phone_ids[1:]:
+        client.post('/cart/items', json={'phone_id': phone_id, 'quantity': 1}, headers=buyer_headers)
+    many_lines = count_cart_queries(app, client, buyer_headers)
+
+    print(f"GET /cart/: 1 mục -> {one_line} truy vấn, {args.lines} mục -> {many_lines} truy vấn")
+    if many_lines != one_line:
+        print("LỖI: số truy vấn tăng theo số mục trong giỏ (N+1).")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,87 @@
+# phone_management_api/benchmarks/cart_resolution.py
+"""So sánh GET /cart/ với cách resolve giỏ hàng cũ (nạp User, kiểm tra lại vai trò, log INFO)
+và resolve_user_cart (tin claims JWT, một SELECT theo carts.user_id, ghi nhớ trong request).
+
+    python -m benchmarks.cart_resolution --lines 5 --repeat 500
+"""
+import argparse
+import statistics
+import time
+from unittest import mock
+
+from app.testing import create_user, create_phones
+from benchmarks.common import make_app, QueryCounter
+
+
+def legacy_resolve_user_cart():
+    """Đường cũ của get_or_create_user_cart (trước khi có resolve_user_cart), giữ lại để so sánh."""
+    from flask import abort, current_app
+    from flask_jwt_extended import get_jwt_identity
+    from app.extensions import db
+    from app.models.cart import Cart
+    from app.models.user import User
+
+    user_id = get_jwt_identity()
+    current_app.logger.info(f"Gọi get_or_create_user_cart với user_id: {user_id} (kiểu: {type(user_id)})")
+    user = db.session.get(User, int(user_id))
+    if not user:
+        abort(404)
+    current_app.logger.info(f"Tìm thấy User: {user.username} (ID: {user.id}, Role: {user.role})")
+    if user.role != 'buyer':
+        abort(403)
+    cart = user.cart
+    if not cart:
+        cart = Cart(user_id=user.id)
+        db.session.add(cart)
+        db.session.commit()
+    else:
+        current_app.logger.info(f"Đã tìm thấy giỏ hàng ID {cart.id} cho user ID {user.id} ({user.username}).")
+    return cart
+
+
+def measure(app, client, headers, repeat):
+    """(median ms, số câu SQL) của một GET /cart/ đầy đủ."""
+    from app.extensions import db
+    with app.app_context():
+        engine = db.engine
+    with QueryCounter(engine) as counter:
+        response = client.get('/cart/', headers=headers)
+    assert response.status_code == 200, response.get_json()
+
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        client.get('/cart/', headers=headers)
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings), counter.count
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--lines', type=int, default=5)
+    parser.add_argument('--repeat', type=int, default=500)
+    args = parser.parse_args()
+
+    app, _ = make_app(METRICS_ENABLED=False)
+    # Log INFO như môi trường chạy thật để thấy chi phí format/ghi log của đường cũ.
+    app.logger.setLevel('INFO')
+    seller_id, _ = create_user(app, 'bench_seller', 'seller')
+    _, buyer_headers = create_user(app, 'bench_buyer', 'buyer')
+    client = app.test_client()
+    for phone_id in create_phones(app, seller_id, args.lines):
+        client.post('/cart/items', json={'phone_id': phone_id, 'quantity': 1}, headers=buyer_headers)
+
+    with mock.patch('app.routes.cart_routes.resolve_user_cart', legacy_resolve_user_cart), \
+            mock.patch.object(app.logger, 'handlers', []), mock.patch.object(app.logger, 'propagate', False):
+        legacy_ms, legacy_queries = measure(app, client, buyer_headers, args.repeat)
+    with mock.patch.object(app.logger, 'handlers', []), mock.patch.object(app.logger, 'propagate', False):
+        resolver_ms, resolver_queries = measure(app, client, buyer_headers, args.repeat)
+
+    print(f"GET /cart/ ({args.lines} mục, median {args.repeat} lần):")
+    print(f"  cũ (User + log)     : {legacy_ms:7.3f} ms, {legacy_queries} truy vấn")
+    print(f"  resolve_user_cart   : {resolver_ms:7.3f} ms, {resolver_queries} truy vấn")
+    print(f"  tiết kiệm mỗi request: {legacy_ms - resolver_ms:.3f} ms, {legacy_queries - resolver_queries} truy vấn")
+
+
+if __name__ == '__main__':
+    main()
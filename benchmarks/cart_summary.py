@@ -0,0 +1,65 @@
+# phone_management_api/benchmarks/cart_summary.py
+"""So sánh chi phí polling badge giỏ hàng: GET /cart/ (dump đầy đủ) và GET /cart/summary,
+kể cả khi client gửi lại ETag (304).
+
+    python -m benchmarks.cart_summary --lines 20 --repeat 300
+"""
+import argparse
+import statistics
+import time
+
+from app.testing import create_user, create_phones
+from benchmarks.common import make_app, QueryCounter
+
+
+def measure(app, client, url, headers, repeat):
+    """(median ms 200, median ms 304, số câu SQL, số byte) cho url."""
+    from app.extensions import db
+    with app.app_context():
+        engine = db.engine
+    with QueryCounter(engine) as counter:
+        response = client.get(url, headers=headers)
+    assert response.status_code == 200, response.get_json()
+    etag_headers = dict(headers, **{'If-None-Match': response.headers['ETag']})
+
+    def median_ms(request_headers, expected_status):
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            status = client.get(url, headers=request_headers).status_code
+            timings.append((time.perf_counter() - started) * 1000)
+            assert status == expected_status, status
+        return statistics.median(timings)
+
+    return median_ms(headers, 200), median_ms(etag_headers, 304), counter.count, len(response.data)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--lines', type=int, default=20)
+    parser.add_argument('--repeat', type=int, default=300)
+    args = parser.parse_args()
+
+    app, _ = make_app(METRICS_ENABLED=False)
+    seller_id, _ = create_user(app, 'bench_seller', 'seller')
+    _, buyer_headers = create_user(app, 'bench_buyer', 'buyer')
+    client = app.test_client()
+    client.patch('/cart/items', headers=buyer_headers, json={'operations': [
+        {'op': 'add', 'phone_id': phone_id, 'quantity': 1 + index % 3}
+        for index, phone_id in enumerate(create_phones(app, seller_id, args.lines))]})
+
+    cart = client.get('/cart/', headers=buyer_headers).get_json()
+    summary = client.get('/cart/summary', headers=buyer_headers).get_json()
+    assert (summary['item_count'], summary['total_quantity'], summary['subtotal']) == \
+        (len(cart['items']), sum(item['quantity'] for item in cart['items']),
+         round(sum(item['item_subtotal'] for item in cart['items']), 2)), (summary, cart)
+
+    print(f"Giỏ {args.lines} mục, median {args.repeat} lần:")
+    print(f"  {'endpoint':<14} {'200 (ms)':>9} {'304 (ms)':>9} {'truy vấn':>9} {'byte':>8}")
+    for url in ('/cart/', '/cart/summary'):
+        full_ms, not_modified_ms, queries, size = measure(app, client, url, buyer_headers, args.repeat)
+        print(f"  {url:<14} {full_ms:9.3f} {not_modified_ms:9.3f} {queries:9d} {size:8d}")
+
+
+if __name__ == '__main__':
+    main()
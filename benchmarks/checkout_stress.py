@@ -0,0 +1,86 @@
+# phone_management_api/benchmarks/checkout_stress.py
+"""Stress test checkout đa luồng trên một SKU "nóng": không được bán vượt tồn kho.
+
+    python -m benchmarks.checkout_stress --buyers 200 --threads 16 --stock 50
+"""
+import argparse
+import sys
+import threading
+import time
+from collections import Counter
+
+from app.testing import create_user, create_phones
+from benchmarks.common import make_app
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--buyers', type=int, default=200)
+    parser.add_argument('--threads', type=int, default=16)
+    parser.add_argument('--stock', type=int, default=50)
+    parser.add_argument('--quantity', type=int, default=1, help="Số lượng SKU nóng trong mỗi giỏ.")
+    args = parser.parse_args()
+
+    app, db_path = make_app()
+    seller_id, _ = create_user(app, 'bench_seller', 'seller')
+    hot_phone_id, other_phone_id = create_phones(app, seller_id, 2)
+    from app.extensions import db
+    from app.models.phone import Phone
+    from app.models.order import OrderItem
+    with app.app_context():
+        db.session.get(Phone, hot_phone_id).stock_quantity = args.stock
+        db.session.get(Phone, other_phone_id).stock_quantity = args.buyers * 10
+        db.session.commit()
+
+    # Chuẩn bị giỏ hàng trước (không tính vào thời gian đo).
+    client = app.test_client()
+    buyer_headers = []
+    for i in range(args.buyers):
+        _, headers = create_user(app, f'bench_buyer_{i}', 'buyer')
+        client.post('/cart/items', json={'phone_id': hot_phone_id, 'quantity': args.quantity}, headers=headers)
+        client.post('/cart/items', json={'phone_id': other_phone_id, 'quantity': 1}, headers=headers)
+        buyer_headers.append(headers)
+
+    statuses = Counter()
+    lock = threading.Lock()
+    queue = list(buyer_headers)
+
+    def worker():
+        thread_client = app.test_client()
+        while True:
+            with lock:
+                if not queue:
+                    return
+                headers = queue.pop()
+            response = thread_client.post('/orders/', json={'shipping_address': '1 Bench Street'}, headers=headers)
+            with lock:
+                statuses[response.status_code] += 1
+
+    threads = [threading.Thread(target=worker) for _ in range(args.threads)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    with app.app_context():
+        final_stock = db.session.get(Phone, hot_phone_id).stock_quantity
+        sold = db.session.query(db.func.coalesce(db.func.sum(OrderItem.quantity), 0))\
+            .filter(OrderItem.phone_id == hot_phone_id).scalar()
+
+    successful = statuses[201]
+    print(f"checkouts: {args.buyers} trong {elapsed:.2f}s ({args.buyers / elapsed:.1f} checkout/s, "
+          f"{successful / elapsed:.1f} thành công/s) với {args.threads} luồng")
+    print(f"status: {dict(sorted(statuses.items()))}")
+    print(f"tồn kho ban đầu {args.stock}, đã bán {sold}, còn lại {final_stock} (db: {db_path})")
+
+    oversold = final_stock < 0 or sold + final_stock != args.stock or sold != successful * args.quantity
+    if oversold:
+        print("LỖI: bán vượt tồn kho hoặc tồn kho không khớp với số đơn hàng.")
+        sys.exit(1)
+    print("OK: không bán vượt tồn kho.")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,48 @@
+# phone_management_api/benchmarks/common.py
+import os
+import tempfile
+
+
+def make_app(db_path=None, config_name='test', **config_overrides):
+    """Tạo app trên một file SQLite riêng cho benchmark (mặc định: file tạm mới)."""
+    if db_path is None:
+        fd, db_path = tempfile.mkstemp(prefix='bench_', suffix='.db')
+        os.close(fd)
+        os.remove(db_path)
+    database_uri = 'sqlite:///' + os.path.abspath(db_path)
+
+    from app import create_app
+    from app.extensions import db
+    from app.utils.search import ensure_search_index
+    from app.utils.facets import ensure_facet_summary
+
+    app = create_app(config_name, dict(config_overrides, SQLALCHEMY_DATABASE_URI=database_uri))
+    with app.app_context():
+        db.create_all()
+        ensure_search_index()
+        ensure_facet_summary()
+    return app, db_path
+
+
+class QueryCounter:
+    """Đếm số câu SQL được gửi tới engine trong khối `with`."""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.statements = []
+
+    def _on_execute(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+
+    def __enter__(self):
+        from sqlalchemy import event
+        event.listen(self.engine, 'before_cursor_execute', self._on_execute)
+        return self
+
+    def __exit__(self, *exc):
+        from sqlalchemy import event
+        event.remove(self.engine, 'before_cursor_execute', self._on_execute)
+
+    @property
+    def count(self):
+        return len(self.statements)
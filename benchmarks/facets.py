@@ -0,0 +1,71 @@
+# phone_management_api/benchmarks/facets.py
+"""So sánh GET /phones/facets không lọc: đọc bảng tổng hợp (trigger) và quét toàn bộ phones,
+kèm chi phí trigger khi cập nhật tồn kho.
+
+    python -m benchmarks.facets --phones 200000 --repeat 20
+"""
+import argparse
+import statistics
+import time
+
+from app.testing import create_user, create_phones
+from benchmarks.common import make_app
+
+
+def median_ms(fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--phones', type=int, default=200000)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    from sqlalchemy import bindparam, update
+    from app.extensions import db
+    from app.models.phone import Phone
+    from app.utils.facets import compute_facets, drop_facet_summary, rebuild_facet_summary
+
+    app, _ = make_app(METRICS_ENABLED=False, RESPONSE_CACHE_ENABLED=False)
+    seller_id, _ = create_user(app, 'bench_seller', 'seller')
+    manufacturers = ['Apple', 'Samsung', 'Xiaomi', 'Oppo', 'Vivo', 'Nokia']
+    per_manufacturer = args.phones // len(manufacturers)
+    phone_ids = []
+    for index, manufacturer in enumerate(manufacturers):
+        phone_ids += create_phones(app, seller_id, per_manufacturer, manufacturer=manufacturer,
+                                   price=3_000_000 + index * 6_000_000, stock_quantity=index % 3)
+
+    def stock_updates():
+        # Trừ/hoàn tồn kho 500 phone, một nửa trong số đó đổi trạng thái còn hàng <-> hết hàng.
+        rows = [{'pid': phone_id, 'qty': n % 2} for n, phone_id in enumerate(phone_ids[:500])]
+        phones = Phone.__table__
+        db.session.execute(update(phones).where(phones.c.id == bindparam('pid'))
+                           .values(stock_quantity=bindparam('qty')), rows)
+        db.session.commit()
+
+    with app.app_context():
+        rebuild_facet_summary()
+        summary_ms = median_ms(compute_facets, args.repeat)
+        update_with_trigger_ms = median_ms(stock_updates, args.repeat)
+        summary_facets, _ = compute_facets()  # sau các lần cập nhật: trigger phải giữ số đếm đúng
+        drop_facet_summary()
+        scan_facets, _ = compute_facets()
+        scan_ms = median_ms(compute_facets, args.repeat)
+        update_without_trigger_ms = median_ms(stock_updates, args.repeat)
+        assert summary_facets == scan_facets, "Facet từ bảng tổng hợp khác với khi quét bảng phones."
+
+    print(f"{args.phones} phone, facet không lọc:")
+    print(f"  bảng tổng hợp : median {summary_ms:8.2f} ms")
+    print(f"  quét phones   : median {scan_ms:8.2f} ms (x{scan_ms / max(summary_ms, 1e-9):.0f})")
+    print(f"Cập nhật tồn kho 500 phone: {update_with_trigger_ms:.2f} ms có trigger, "
+          f"{update_without_trigger_ms:.2f} ms không trigger")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,367 @@
+# phone_management_api/benchmarks/http_workload.py
+"""Chạy lại một hỗn hợp workload giống frontend/script.js (duyệt/lọc phone, xem chi tiết, thêm vào giỏ,
+checkout, xem đơn hàng, seller cập nhật trạng thái) và đo p50/p95/p99 + throughput theo endpoint.
+
+    python -m benchmarks.http_workload --transport inprocess --operations 2000
+    python -m benchmarks.http_workload --transport http --concurrency 8 --output results.json
+    python -m benchmarks.http_workload --output new.json --baseline results.json --threshold 0.15
+
+Dữ liệu được sinh bằng bộ sinh của `flask seed-db --scale` (cùng --scale/--seed -> cùng dữ liệu).
+Với --baseline, trả về mã thoát 1 nếu p95 của endpoint nào tăng quá ngưỡng.
+"""
+import argparse
+import http.client
+import json
+import platform
+import random
+import statistics
+import sys
+import threading
+import time
+from urllib.parse import urlencode, urlsplit
+
+from app.testing import create_user
+from benchmarks.common import make_app
+
+# Trọng số các thao tác, mô phỏng tỷ lệ gọi API của frontend.
+WORKLOAD_MIX = {
+    'browse_phones': 30,
+    'filter_phones': 12,
+    'phone_detail': 20,
+    'view_cart': 10,
+    'add_to_cart': 10,
+    'checkout': 4,
+    'list_orders': 6,
+    'order_detail': 3,
+    'seller_update_status': 5,
+}
+PHONE_SORTS = ('id', 'price', 'model_name', 'manufacturer')
+
+
+class InProcessTransport:
+    """Gọi app qua Flask test client (không có chi phí mạng/WSGI server)."""
+
+    name = 'inprocess'
+
+    def __init__(self, app):
+        self.app = app
+
+    def send(self, method, path, headers=None, body=None):
+        response = self.app.test_client().open(path, method=method, headers=headers, json=body)
+        return response.status_code, response.get_json(silent=True)
+
+    def close(self):
+        pass
+
+
+class HttpTransport:
+    """Gọi API qua HTTP thật; mỗi thread giữ một kết nối riêng."""
+
+    name = 'http'
+
+    def __init__(self, base_url):
+        parts = urlsplit(base_url)
+        self.host, self.port = parts.hostname, parts.port or 80
+        self.prefix = parts.path.rstrip('/')
+        self._local = threading.local()
+
+    def _connection(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._local.conn = http.client.HTTPConnection(self.host, self.port, timeout=30)
+        return conn
+
+    def send(self, method, path, headers=None, body=None):
+        headers = dict(headers or {})
+        payload = None
+        if body is not None:
+            payload = json.dumps(body).encode('utf-8')
+            headers['Content-Type'] = 'application/json'
+        conn = self._connection()
+        try:
+            conn.request(method, self.prefix + path, body=payload, headers=headers)
+            response = conn.getresponse()
+            data = response.read()
+        except (http.client.HTTPException, OSError):
+            conn.close()
+            self._local.conn = None
+            raise
+        if response.getheader('Connection', '').lower() == 'close':
+            conn.close()
+        try:
+            return response.status, json.loads(data) if data else None
+        except ValueError:
+            return response.status, None
+
+    def close(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            conn.close()
+
+
+def start_local_server(app):
+    """Chạy app trên werkzeug (threaded) ở một cổng ngẫu nhiên; trả về (server, base_url)."""
+    import logging
+    from werkzeug.serving import make_server
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)
+    server = make_server('127.0.0.1', 0, app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f'http://127.0.0.1:{server.server_port}'
+
+
+class Recorder:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latencies = {}
+        self.statuses = {}
+        self.errors = {}
+
+    def record(self, label, elapsed_ms, status):
+        with self._lock:
+            self.latencies.setdefault(label, []).append(elapsed_ms)
+            counts = self.statuses.setdefault(label, {})
+            counts[str(status)] = counts.get(str(status), 0) + 1
+            if status is None or status >= 500:
+                self.errors[label] = self.errors.get(label, 0) + 1
+
+
+class VirtualUser:
+    """Một buyer (và seller dùng chung) thực hiện các thao tác theo WORKLOAD_MIX."""
+
+    def __init__(self, transport, recorder, dataset, buyer_headers, seed):
+        from app.utils.synthetic_data import ZipfSampler, PHONE_ZIPF_EXPONENT
+        self.transport = transport
+        self.recorder = recorder
+        self.dataset = dataset
+        self.buyer_headers = buyer_headers
+        self.rng = random.Random(seed)
+        self.hot_phones = ZipfSampler(len(dataset['phone_ids']), PHONE_ZIPF_EXPONENT, self.rng)
+        self.order_ids = []
+
+    def call(self, label, method, path, headers=None, body=None):
+        started = time.perf_counter()
+        try:
+            status, data = self.transport.send(method, path, headers=headers, body=body)
+        except Exception:
+            status, data = None, None
+        self.recorder.record(label, (time.perf_counter() - started) * 1000, status)
+        return status, data
+
+    def random_phone_id(self):
+        return self.dataset['phone_ids'][self.hot_phones.sample()[0]]
+
+    def run(self, operations):
+        labels = list(WORKLOAD_MIX)
+        weights = list(WORKLOAD_MIX.values())
+        for label in self.rng.choices(labels, weights=weights, k=operations):
+            getattr(self, label)()
+
+    # --- thao tác ---
+
+    def browse_phones(self):
+        params = {'page': self.rng.randint(1, 5), 'per_page': 9,
+                  'sort_by': self.rng.choice(PHONE_SORTS), 'order': self.rng.choice(('asc', 'desc'))}
+        self.call('browse_phones', 'GET', f'/phones/?{urlencode(params)}')
+
+    def filter_phones(self):
+        price_min = self.rng.choice((1_000_000, 5_000_000, 10_000_000))
+        params = {'page': 1, 'per_page': 9, 'sort_by': 'price', 'order': 'asc',
+                  'manufacturer': self.rng.choice(self.dataset['manufacturers']),
+                  'price_min': price_min, 'price_max': price_min * 3}
+        self.call('filter_phones', 'GET', f'/phones/?{urlencode(params)}')
+
+    def phone_detail(self):
+        self.call('phone_detail', 'GET', f'/phones/{self.random_phone_id()}')
+
+    def view_cart(self):
+        self.call('view_cart', 'GET', '/cart/', headers=self.buyer_headers)
+
+    def add_to_cart(self):
+        self.call('add_to_cart', 'POST', '/cart/items', headers=self.buyer_headers,
+                  body={'phone_id': self.random_phone_id(), 'quantity': 1})
+
+    def checkout(self):
+        status, data = self.call('checkout', 'POST', '/orders/', headers=self.buyer_headers,
+                                 body={'shipping_address': '123 Benchmark Street, Quận 1, TP. HCM'})
+        if status == 201 and data:
+            self.order_ids.append(data['id'])
+
+    def list_orders(self):
+        params = {'page': 1, 'per_page': 10, 'sort_by': 'created_at', 'order': 'desc'}
+        self.call('list_orders', 'GET', f'/orders/?{urlencode(params)}', headers=self.buyer_headers)
+
+    def order_detail(self):
+        if not self.order_ids:
+            return self.list_orders()
+        self.call('order_detail', 'GET', f'/orders/{self.rng.choice(self.order_ids)}', headers=self.buyer_headers)
+
+    def seller_update_status(self):
+        headers = self.dataset['seller_headers']
+        status, data = self.call('seller_list_orders', 'GET', '/orders/?status=pending&per_page=5', headers=headers)
+        if status != 200 or not data or not data.get('data'):
+            return
+        order_id = self.rng.choice(data['data'])['id']
+        self.call('seller_update_status', 'PUT', f'/orders/{order_id}/status', headers=headers,
+                  body={'status': 'processing'})
+
+
+def build_dataset(app, scale, seed, concurrency):
+    from sqlalchemy import func
+    from werkzeug.security import generate_password_hash
+    from app.extensions import db
+    from app.models.phone import Phone
+    from app.commands import backfill_order_sellers
+    from app.utils.search import rebuild_search_index
+    from app.utils.synthetic_data import generate_synthetic_data, MANUFACTURER_WEIGHTS
+
+    with app.app_context():
+        generate_synthetic_data(scale, generate_password_hash('123456'), seed=seed, echo=lambda message: None)
+        rebuild_search_index()
+        backfill_order_sellers()
+        phone_ids = [phone_id for (phone_id,) in db.session.query(Phone.id).order_by(Phone.id)]
+        top_seller_id = db.session.query(Phone.user_id).group_by(Phone.user_id)\
+                                  .order_by(func.count(Phone.id).desc()).limit(1).scalar()
+
+    from flask_jwt_extended import create_access_token
+    with app.app_context():
+        seller_headers = {'Authorization': f'Bearer {create_access_token(identity=str(top_seller_id))}'}
+    buyers = [create_user(app, f'bench_buyer_{i}', 'buyer')[1] for i in range(concurrency)]
+    return {
+        'phone_ids': phone_ids,
+        'manufacturers': list(MANUFACTURER_WEIGHTS),
+        'seller_headers': seller_headers,
+        'buyer_headers': buyers,
+    }
+
+
+def percentile(sorted_values, fraction):
+    """Percentile kiểu nearest-rank trên danh sách đã sắp xếp."""
+    if not sorted_values:
+        return None
+    index = max(0, min(len(sorted_values) - 1, int(round(fraction * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[index]
+
+
+def summarize(values, wall_seconds):
+    values = sorted(values)
+    return {
+        'count': len(values),
+        'throughput_rps': round(len(values) / wall_seconds, 2) if wall_seconds else None,
+        'mean_ms': round(statistics.fmean(values), 3),
+        'p50_ms': round(percentile(values, 0.50), 3),
+        'p95_ms': round(percentile(values, 0.95), 3),
+        'p99_ms': round(percentile(values, 0.99), 3),
+        'max_ms': round(values[-1], 3),
+    }
+
+
+def compare_with_baseline(current, baseline, threshold):
+    """Trả về danh sách (endpoint, p95 cũ, p95 mới, tỷ lệ) của các endpoint chậm đi quá ngưỡng."""
+    regressions = []
+    for key in ('transport', 'concurrency', 'scale', 'seed', 'response_cache', 'workload_mix'):
+        if baseline.get('meta', {}).get(key) != current['meta'][key]:
+            print(f"Cảnh báo: '{key}' khác baseline ({baseline.get('meta', {}).get(key)!r} -> "
+                  f"{current['meta'][key]!r}); kết quả có thể không so sánh được.")
+    print(f"\n{'endpoint':<24}{'p95 baseline':>14}{'p95 hiện tại':>14}{'thay đổi':>10}")
+    for label, stats in sorted(current['endpoints'].items()):
+        old = baseline.get('endpoints', {}).get(label)
+        if not old or not old.get('p95_ms'):
+            continue
+        ratio = stats['p95_ms'] / old['p95_ms'] - 1
+        marker = '  <-- chậm hơn' if ratio > threshold else ''
+        print(f"{label:<24}{old['p95_ms']:>14.2f}{stats['p95_ms']:>14.2f}{ratio:>+10.1%}{marker}")
+        if ratio > threshold:
+            regressions.append((label, old['p95_ms'], stats['p95_ms'], ratio))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--transport', choices=('inprocess', 'http'), default='inprocess')
+    parser.add_argument('--base-url', help="Chạy với server có sẵn (mặc định: tự chạy werkzeug cục bộ).")
+    parser.add_argument('--operations', type=int, default=2000, help="Tổng số thao tác (chia đều cho các worker).")
+    parser.add_argument('--concurrency', type=int, default=1)
+    parser.add_argument('--scale', type=int, default=5000, help="Số phone của dữ liệu tổng hợp.")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--no-cache', action='store_true', help="Tắt cache phản hồi catalog.")
+    parser.add_argument('--output', help="Ghi kết quả JSON ra file.")
+    parser.add_argument('--baseline', help="File JSON kết quả trước đó để so sánh.")
+    parser.add_argument('--threshold', type=float, default=0.15, help="Ngưỡng tăng p95 được coi là hồi quy.")
+    args = parser.parse_args()
+
+    app, db_path = make_app()
+    if args.no_cache:
+        app.extensions['response_cache'].enabled = False
+    print(f"Đang sinh dữ liệu (scale={args.scale}, seed={args.seed}) vào {db_path} ...")
+    dataset = build_dataset(app, args.scale, args.seed, args.concurrency)
+
+    server = None
+    if args.transport == 'http':
+        base_url = args.base_url
+        if base_url is None:
+            server, base_url = start_local_server(app)
+        transport = HttpTransport(base_url)
+    else:
+        transport = InProcessTransport(app)
+
+    recorder = Recorder()
+    per_worker = max(1, args.operations // args.concurrency)
+    users = [VirtualUser(transport, recorder, dataset, dataset['buyer_headers'][i], args.seed + i)
+             for i in range(args.concurrency)]
+    threads = [threading.Thread(target=user.run, args=(per_worker,)) for user in users]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall_seconds = time.perf_counter() - started
+    transport.close()
+    if server is not None:
+        server.shutdown()
+
+    all_latencies = [value for values in recorder.latencies.values() for value in values]
+    result = {
+        'meta': {
+            'transport': transport.name,
+            'operations': per_worker * args.concurrency,
+            'concurrency': args.concurrency,
+            'scale': args.scale,
+            'seed': args.seed,
+            'response_cache': not args.no_cache,
+            'workload_mix': WORKLOAD_MIX,
+            'python': platform.python_version(),
+            'started_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'wall_seconds': round(wall_seconds, 3),
+        },
+        'overall': summarize(all_latencies, wall_seconds),
+        'endpoints': {label: dict(summarize(values, wall_seconds),
+                                  statuses=recorder.statuses[label],
+                                  errors=recorder.errors.get(label, 0))
+                      for label, values in sorted(recorder.latencies.items())},
+    }
+
+    print(f"\n{'endpoint':<24}{'count':>7}{'rps':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}  status")
+    for label, stats in result['endpoints'].items():
+        print(f"{label:<24}{stats['count']:>7}{stats['throughput_rps']:>9.1f}{stats['p50_ms']:>9.2f}"
+              f"{stats['p95_ms']:>9.2f}{stats['p99_ms']:>9.2f}  {stats['statuses']}")
+    overall = result['overall']
+    print(f"{'TỔNG':<24}{overall['count']:>7}{overall['throughput_rps']:>9.1f}{overall['p50_ms']:>9.2f}"
+          f"{overall['p95_ms']:>9.2f}{overall['p99_ms']:>9.2f}")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+        print(f"\nĐã ghi kết quả vào {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare_with_baseline(result, baseline, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} endpoint chậm hơn baseline quá {args.threshold:.0%}.")
+            sys.exit(1)
+        print("\nKhông có hồi quy so với baseline.")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,102 @@
+# phone_management_api/benchmarks/list_rows.py
+"""So sánh bộ nhớ đỉnh (tracemalloc) và độ trễ khi đọc + serialize một trang danh sách:
+instance ORM (cách cũ) và Row/DTO chỉ đọc (app/utils/read_rows.py).
+
+    python -m benchmarks.list_rows --phones 100000 --orders 20000 --per-page 100 --repeat 20
+"""
+import argparse
+import json
+import statistics
+import sys
+import time
+import tracemalloc
+
+from app.testing import create_user, create_phones, create_orders
+from benchmarks.common import make_app
+
+
+def phones_orm(page, per_page):
+    from app.models.phone import Phone
+    from app.schemas import phones_serializer
+    result = Phone.query.order_by(Phone.id).paginate(page=page, per_page=per_page, error_out=False)
+    return phones_serializer.dump(result.items)
+
+
+def phones_rows(page, per_page):
+    from app.models.phone import Phone
+    from app.schemas import phones_serializer
+    from app.utils.read_rows import phone_rows, to_phone_rows
+    result = phone_rows(Phone.query).order_by(Phone.id)\
+        .paginate(page=page, per_page=per_page, error_out=False)
+    return phones_serializer.dump(to_phone_rows(result.items))
+
+
+def orders_orm(page, per_page):
+    from app.models.order import Order
+    from app.schemas import orders_serializer
+    from app.utils.helpers import order_read_options
+    result = Order.query.options(*order_read_options()).order_by(Order.created_at.desc(), Order.id.desc())\
+        .paginate(page=page, per_page=per_page, error_out=False)
+    return orders_serializer.dump(result.items)
+
+
+def orders_rows(page, per_page):
+    from app.models.order import Order
+    from app.schemas import orders_serializer
+    from app.utils.read_rows import order_rows, build_order_rows
+    result = order_rows(Order.query).order_by(Order.created_at.desc(), Order.id.desc())\
+        .paginate(page=page, per_page=per_page, error_out=False)
+    return orders_serializer.dump(build_order_rows(result.items))
+
+
+def measure(app, fn, page, per_page, repeat):
+    """Mỗi lần chạy trong app context mới (session rỗng) như một request; trả về (data, median ms, peak KiB)."""
+    timings, peaks = [], []
+    for _ in range(repeat):
+        with app.app_context():
+            started = time.perf_counter()
+            data = fn(page, per_page)
+            timings.append((time.perf_counter() - started) * 1000)
+        with app.app_context():
+            tracemalloc.start()
+            fn(page, per_page)
+            peaks.append(tracemalloc.get_traced_memory()[1] / 1024)
+            tracemalloc.stop()
+    return data, statistics.median(timings), statistics.median(peaks)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--phones', type=int, default=100000)
+    parser.add_argument('--orders', type=int, default=20000)
+    parser.add_argument('--items', type=int, default=3)
+    parser.add_argument('--per-page', type=int, default=100)
+    parser.add_argument('--page', type=int, default=10)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    app, _ = make_app(METRICS_ENABLED=False, RESPONSE_CACHE_ENABLED=False)
+    seller_id, _ = create_user(app, 'bench_seller', 'seller')
+    buyer_id, _ = create_user(app, 'bench_buyer', 'buyer')
+    phone_ids = create_phones(app, seller_id, args.phones)
+    create_orders(app, buyer_id, phone_ids, args.orders, items_per_order=args.items, seller_id=seller_id)
+
+    print(f"{args.phones} phone, {args.orders} đơn ({args.items} dòng/đơn), page={args.page}, "
+          f"per_page={args.per_page}")
+    mismatches = 0
+    for name, orm_fn, rows_fn in (('phones', phones_orm, phones_rows), ('orders', orders_orm, orders_rows)):
+        orm_data, orm_ms, orm_kib = measure(app, orm_fn, args.page, args.per_page, args.repeat)
+        rows_data, rows_ms, rows_kib = measure(app, rows_fn, args.page, args.per_page, args.repeat)
+        if json.dumps(orm_data, sort_keys=True) != json.dumps(rows_data, sort_keys=True):
+            mismatches += 1
+            print(f"KHÁC NHAU: {name}", file=sys.stderr)
+        print(f"  {name:<7} ORM : median {orm_ms:7.2f} ms, bộ nhớ đỉnh {orm_kib:8.1f} KiB")
+        print(f"  {name:<7} Row : median {rows_ms:7.2f} ms, bộ nhớ đỉnh {rows_kib:8.1f} KiB "
+              f"(x{orm_ms / max(rows_ms, 1e-9):.2f} nhanh hơn, {100 * (1 - rows_kib / orm_kib):.0f}% ít bộ nhớ hơn)")
+
+    if mismatches:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
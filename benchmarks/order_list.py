@@ -0,0 +1,83 @@
+# phone_management_api/benchmarks/order_list.py
+"""So sánh số truy vấn và độ trễ khi serialize GET /orders/?per_page=100:
+lazy load (cách cũ) và eager load (order_read_options).
+
+    python -m benchmarks.order_list --orders 1000 --items 3 --repeat 20
+"""
+import argparse
+import statistics
+import time
+
+from app.testing import create_user, create_phones, create_orders
+from benchmarks.common import make_app, QueryCounter
+
+
+def lazy_dump(per_page):
+    """Tái hiện đường đọc cũ: phân trang rồi dump, để relationship tự lazy load."""
+    from app.models.order import Order
+    from app.schemas import orders_schema_output
+    page = Order.query.order_by(Order.created_at.desc()).paginate(page=1, per_page=per_page, error_out=False)
+    return orders_schema_output.dump(page.items)
+
+
+def eager_dump(per_page):
+    from app.models.order import Order
+    from app.schemas import orders_schema_output
+    from app.utils.helpers import order_read_options
+    page = Order.query.options(*order_read_options()).order_by(Order.created_at.desc())\
+                      .paginate(page=1, per_page=per_page, error_out=False)
+    return orders_schema_output.dump(page.items)
+
+
+def measure(app, fn, per_page, repeat):
+    from app.extensions import db
+    timings, query_counts = [], []
+    for _ in range(repeat):
+        with app.app_context():
+            with QueryCounter(db.engine) as counter:
+                started = time.perf_counter()
+                data = fn(per_page)
+                timings.append((time.perf_counter() - started) * 1000)
+            query_counts.append(counter.count)
+    return data, query_counts[-1], statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--orders', type=int, default=1000)
+    parser.add_argument('--items', type=int, default=3)
+    parser.add_argument('--per-page', type=int, default=100)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    app, _ = make_app()
+    seller_id, _ = create_user(app, 'bench_seller', 'seller')
+    buyer_id, _ = create_user(app, 'bench_buyer', 'buyer')
+    _, admin_headers = create_user(app, 'bench_admin', 'admin')
+    phone_ids = create_phones(app, seller_id, 200)
+    create_orders(app, buyer_id, phone_ids, args.orders, items_per_order=args.items, seller_id=seller_id)
+
+    lazy_data, lazy_queries, lazy_ms = measure(app, lazy_dump, args.per_page, args.repeat)
+    eager_data, eager_queries, eager_ms = measure(app, eager_dump, args.per_page, args.repeat)
+    assert lazy_data == eager_data, "Kết quả serialize của hai cách không giống nhau."
+
+    client = app.test_client()
+    from app.extensions import db
+    with app.app_context():
+        engine = db.engine
+    endpoint_ms = []
+    for _ in range(args.repeat):
+        with QueryCounter(engine) as counter:
+            started = time.perf_counter()
+            response = client.get(f'/orders/?per_page={args.per_page}', headers=admin_headers)
+            endpoint_ms.append((time.perf_counter() - started) * 1000)
+        assert response.status_code == 200
+
+    print(f"per_page={args.per_page}, {args.items} dòng/đơn, {args.orders} đơn")
+    print(f"  lazy  : {lazy_queries:4d} truy vấn, median {lazy_ms:7.2f} ms")
+    print(f"  eager : {eager_queries:4d} truy vấn, median {eager_ms:7.2f} ms")
+    print(f"  GET /orders/ (admin): {counter.count} truy vấn, median {statistics.median(endpoint_ms):7.2f} ms")
+
+
+if __name__ == '__main__':
+    main()
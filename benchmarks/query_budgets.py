@@ -0,0 +1,50 @@
+# phone_management_api/benchmarks/query_budgets.py
+"""Gọi mọi endpoint của các blueprint trên dữ liệu seed-db và kiểm tra ngân sách truy vấn đã khai báo.
+
+    python -m benchmarks.query_budgets
+
+Thoát với mã 1 nếu endpoint nào vượt ngân sách (kèm các câu SQL lặp lại nghi N+1) hoặc chưa khai báo.
+"""
+import sys
+
+from app.testing import create_user, exercise_endpoints
+from benchmarks.common import make_app
+
+
+def main():
+    from app.utils.query_budget import EndpointBudgetMonitor, endpoints_without_budget, get_query_budget
+
+    app, _ = make_app()
+    result = app.test_cli_runner().invoke(args=['seed-db'])
+    if result.exception:
+        raise result.exception
+    _, buyer = create_user(app, 'buyer_john', 'buyer')
+    _, seller = create_user(app, 'seller_apple', 'seller')
+    _, admin = create_user(app, 'admin1', 'admin')
+
+    with EndpointBudgetMonitor(app, require_budget=False) as monitor:
+        exercise_endpoints(app.test_client(), buyer, seller, admin)
+
+    print(f"{'endpoint':<48}{'truy vấn':>10}{'ngân sách':>11}")
+    for endpoint, count in sorted(monitor.observed.items()):
+        _, budget = get_query_budget(endpoint)
+        print(f"{endpoint:<48}{count:>10}{'-' if budget is None else budget:>11}")
+
+    problems = list(monitor.violations)
+    problems.extend(f"{endpoint}: chưa khai báo ngân sách truy vấn." for endpoint in endpoints_without_budget(app))
+    not_exercised = sorted(set(endpoint for endpoint in _blueprint_endpoints(app)) - set(monitor.observed))
+    if not_exercised:
+        print(f"\nChưa được gọi trong lượt kiểm tra: {', '.join(not_exercised)}")
+    if problems:
+        print('\n' + '\n\n'.join(dict.fromkeys(problems)))
+        sys.exit(1)
+    print("\nTất cả endpoint nằm trong ngân sách truy vấn.")
+
+
+def _blueprint_endpoints(app):
+    return [rule.endpoint for rule in app.url_map.iter_rules() if '.' in rule.endpoint
+            and not rule.endpoint.endswith('.static')]
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,107 @@
+# phone_management_api/benchmarks/serializers.py
+"""Kiểm tra JSON của serializer biên dịch sẵn (app/schemas/compiled.py) giống hệt marshmallow
+và đo thời gian dump phones/orders/cart ở nhiều cỡ dữ liệu.
+
+    python -m benchmarks.serializers --sizes 1000 10000 --repeat 5
+
+Thoát với mã 1 nếu JSON của hai đường dump khác nhau dù chỉ một byte.
+"""
+import argparse
+import json
+import statistics
+import sys
+import time
+
+from app.testing import create_user, create_phones, create_orders
+from benchmarks.common import make_app
+
+
+def prepare_data(app, size):
+    """size phone (vài phone có giá lẻ / thiếu specifications), size đơn hàng 3 dòng và một giỏ size dòng."""
+    from sqlalchemy import insert
+    from app.extensions import db
+    from app.models.cart import Cart, CartItem
+    from app.models.phone import Phone
+
+    seller_id, _ = create_user(app, 'bench_seller', 'seller')
+    buyer_id, _ = create_user(app, 'bench_buyer', 'buyer')
+    phone_ids = create_phones(app, seller_id, size)
+    with app.app_context():
+        db.session.execute(db.update(Phone).where(Phone.id.in_(phone_ids[::7])).values(specifications=None))
+        db.session.execute(db.update(Phone).where(Phone.id.in_(phone_ids[::5])).values(price=Phone.price + 0.35))
+        db.session.commit()
+    create_orders(app, buyer_id, phone_ids, size, items_per_order=3, seller_id=seller_id)
+    with app.app_context():
+        cart = Cart(user_id=buyer_id)
+        db.session.add(cart)
+        db.session.flush()
+        db.session.execute(insert(CartItem), [{'cart_id': cart.id, 'phone_id': phone_id, 'quantity': 1 + i % 3}
+                                              for i, phone_id in enumerate(phone_ids)])
+        db.session.commit()
+        return cart.id
+
+
+def load_objects(cart_id):
+    from sqlalchemy.orm import joinedload, selectinload
+    from app.models.cart import Cart, CartItem
+    from app.models.order import Order
+    from app.models.phone import Phone
+    from app.utils.helpers import order_read_options
+
+    phones = Phone.query.order_by(Phone.id).all()
+    orders = Order.query.options(*order_read_options()).order_by(Order.id).all()
+    cart = Cart.query.options(selectinload(Cart.items).joinedload(CartItem.phone)).filter_by(id=cart_id).one()
+    return phones, orders, cart
+
+
+def cases(phones, orders, cart):
+    from app.schemas import (phones_schema, phones_serializer, orders_schema_output, orders_serializer,
+                             cart_schema_output, cart_serializer)
+    return [
+        ('phones', phones_schema, phones_serializer, phones),
+        ('orders', orders_schema_output, orders_serializer, orders),
+        ('cart', cart_schema_output, cart_serializer, cart),
+    ]
+
+
+def median_ms(fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000])
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    mismatches = 0
+    print(f"{'dữ liệu':<8} {'số dòng':>8} {'marshmallow':>13} {'biên dịch':>11} {'tăng tốc':>9}")
+    for size in args.sizes:
+        app, _ = make_app(METRICS_ENABLED=False)
+        cart_id = prepare_data(app, size)
+        with app.app_context():
+            phones, orders, cart = load_objects(cart_id)
+            for name, schema, serializer, objs in cases(phones, orders, cart):
+                expected = json.dumps(schema.dump(objs), sort_keys=True)
+                actual = json.dumps(serializer.dump(objs), sort_keys=True)
+                if expected != actual:
+                    mismatches += 1
+                    print(f"KHÁC NHAU: {name} ({size} dòng)", file=sys.stderr)
+                marshmallow_ms = median_ms(lambda: schema.dump(objs), args.repeat)
+                compiled_ms = median_ms(lambda: serializer.dump(objs), args.repeat)
+                print(f"{name:<8} {size:>8} {marshmallow_ms:>10.1f} ms {compiled_ms:>8.1f} ms "
+                      f"{marshmallow_ms / max(compiled_ms, 1e-9):>8.1f}x")
+
+    if mismatches:
+        print(f"\n{mismatches} trường hợp JSON không giống hệt marshmallow.", file=sys.stderr)
+        sys.exit(1)
+    print("\nJSON của serializer biên dịch giống hệt marshmallow ở mọi trường hợp.")
+
+
+if __name__ == '__main__':
+    main()
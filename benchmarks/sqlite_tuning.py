@@ -0,0 +1,90 @@
+# phone_management_api/benchmarks/sqlite_tuning.py
+"""So sánh throughput đọc/ghi đồng thời trên SQLite: mặc định (rollback journal, synchronous=FULL)
+và cấu hình SQLITE_PRAGMAS (WAL, synchronous=NORMAL, busy_timeout, cache_size, mmap_size).
+
+    python -m benchmarks.sqlite_tuning --readers 8 --writers 2 --seconds 10
+"""
+import argparse
+import random
+import statistics
+import threading
+import time
+
+from app.testing import create_user, create_phones
+from benchmarks.common import make_app
+
+DEFAULT_PRAGMAS = {}
+
+
+def run_mode(label, pragmas, args):
+    app, db_path = make_app(SQLITE_PRAGMAS=pragmas, RESPONSE_CACHE_ENABLED=False, METRICS_ENABLED=False)
+    seller_id, seller_headers = create_user(app, 'bench_seller', 'seller')
+    phone_ids = create_phones(app, seller_id, args.phones)
+    with app.app_context():
+        from app.extensions import db
+        journal_mode = db.session.execute(db.text('PRAGMA journal_mode')).scalar()
+        synchronous = db.session.execute(db.text('PRAGMA synchronous')).scalar()
+
+    stop_at = time.perf_counter() + args.seconds
+    results = {'read': [], 'write': []}
+    failures = {'read': 0, 'write': 0}
+    lock = threading.Lock()
+
+    def worker(kind, seed):
+        rng = random.Random(seed)
+        client = app.test_client()
+        latencies, failed = [], 0
+        while time.perf_counter() < stop_at:
+            phone_id = rng.choice(phone_ids)
+            started = time.perf_counter()
+            if kind == 'read':
+                if rng.random() < 0.5:
+                    response = client.get(f'/phones/{phone_id}')
+                else:
+                    response = client.get(f'/phones/?page={rng.randint(1, 20)}&per_page=10&sort_by=price')
+            else:
+                response = client.put(f'/phones/{phone_id}', json={'price': rng.randint(1000, 100000)},
+                                      headers=seller_headers)
+            latencies.append((time.perf_counter() - started) * 1000)
+            if response.status_code != 200:
+                failed += 1
+        with lock:
+            results[kind].extend(latencies)
+            failures[kind] += failed
+
+    threads = [threading.Thread(target=worker, args=('read', i)) for i in range(args.readers)]
+    threads += [threading.Thread(target=worker, args=('write', 1000 + i)) for i in range(args.writers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    print(f"\n[{label}] journal_mode={journal_mode}, synchronous={synchronous} ({db_path})")
+    summary = {}
+    for kind in ('read', 'write'):
+        values = sorted(results[kind])
+        rate = len(values) / args.seconds
+        p95 = values[int(len(values) * 0.95) - 1] if values else 0.0
+        median = statistics.median(values) if values else 0.0
+        summary[kind] = rate
+        print(f"  {kind:<6} {rate:8.1f} req/s   p50 {median:7.2f} ms   p95 {p95:7.2f} ms   lỗi {failures[kind]}")
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--readers', type=int, default=8)
+    parser.add_argument('--writers', type=int, default=2)
+    parser.add_argument('--seconds', type=float, default=10)
+    parser.add_argument('--phones', type=int, default=2000)
+    args = parser.parse_args()
+
+    from config import Config
+    before = run_mode('mặc định', DEFAULT_PRAGMAS, args)
+    after = run_mode('SQLITE_PRAGMAS', Config.SQLITE_PRAGMAS, args)
+    print(f"\nĐọc: x{after['read'] / max(before['read'], 1e-9):.2f}, "
+          f"ghi: x{after['write'] / max(before['write'], 1e-9):.2f} so với mặc định.")
+
+
+if __name__ == '__main__':
+    main()
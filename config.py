@@ -9,6 +9,53 @@ class Config:
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     JWT_ACCESS_TOKEN_EXPIRES = timedelta(hours=1)
 
+    # SQLite: PRAGMA áp dụng cho mỗi kết nối mới (đặt biến môi trường rỗng để bỏ qua một pragma)
+    SQLITE_PRAGMAS = {
+        'journal_mode': os.environ.get('SQLITE_JOURNAL_MODE', 'WAL'),
+        'synchronous': os.environ.get('SQLITE_SYNCHRONOUS', 'NORMAL'),
+        'busy_timeout': int(os.environ.get('SQLITE_BUSY_TIMEOUT_MS', 5000)),
+        'cache_size': int(os.environ.get('SQLITE_CACHE_SIZE', -64000)),  # số âm = KiB (64 MB)
+        'mmap_size': int(os.environ.get('SQLITE_MMAP_SIZE', 256 * 1024 * 1024)),
+    }
+    # CSDL chỉ đọc cho các request GET (vd. bản sao SQLite đồng bộ bằng `flask sync-read-replica`)
+    READ_REPLICA_DATABASE_URL = os.environ.get('READ_REPLICA_DATABASE_URL')
+
+    # CSDL máy chủ (PostgreSQL, MySQL): pool kết nối
+    DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE', 10))
+    DB_MAX_OVERFLOW = int(os.environ.get('DB_MAX_OVERFLOW', 20))
+    DB_POOL_TIMEOUT = int(os.environ.get('DB_POOL_TIMEOUT', 30))
+    DB_POOL_RECYCLE = int(os.environ.get('DB_POOL_RECYCLE', 1800))
+    DB_POOL_PRE_PING = os.environ.get('DB_POOL_PRE_PING', '1') == '1'
+
+    # Cache phản hồi cho GET /phones và GET /phones/<id>
+    RESPONSE_CACHE_ENABLED = os.environ.get('RESPONSE_CACHE_ENABLED', '1') == '1'
+    RESPONSE_CACHE_MAX_ENTRIES = int(os.environ.get('RESPONSE_CACHE_MAX_ENTRIES', 1024))
+    RESPONSE_CACHE_TTL = int(os.environ.get('RESPONSE_CACHE_TTL', 60))
+    RESPONSE_CACHE_BACKEND_PATH = os.environ.get('RESPONSE_CACHE_BACKEND_PATH')  # vd. instance/response_cache.db
+    # Không lưu phản hồi đọc từ replica trong N giây sau khi tag bị vô hiệu hóa (độ trễ tối đa của replica)
+    RESPONSE_CACHE_REPLICA_GRACE = float(os.environ.get('RESPONSE_CACHE_REPLICA_GRACE', 5))
+
+    # Số liệu theo endpoint tại /metrics (định dạng Prometheus) và log request chậm
+    METRICS_ENABLED = os.environ.get('METRICS_ENABLED', '1') == '1'
+    # /metrics chỉ dành cho admin (JWT) hoặc scraper gửi Authorization: Bearer <METRICS_TOKEN>
+    METRICS_TOKEN = os.environ.get('METRICS_TOKEN')
+    SLOW_REQUEST_THRESHOLD_MS = int(os.environ.get('SLOW_REQUEST_THRESHOLD_MS', 0)) or None
+
+    # Dump JSON bằng serializer biên dịch sẵn (app/schemas/compiled.py); tắt để quay về marshmallow
+    FAST_SERIALIZERS_ENABLED = os.environ.get('FAST_SERIALIZERS_ENABLED', '1') == '1'
+
+    # POST /phones/bulk
+    BULK_IMPORT_CHUNK_SIZE = int(os.environ.get('BULK_IMPORT_CHUNK_SIZE', 500))
+    BULK_IMPORT_MAX_ERRORS = int(os.environ.get('BULK_IMPORT_MAX_ERRORS', 1000))
+
+    # PATCH /cart/items: số thao tác tối đa trong một request
+    CART_BATCH_MAX_OPERATIONS = int(os.environ.get('CART_BATCH_MAX_OPERATIONS', 100))
+
+    # Header Idempotency-Key (POST /orders, POST /cart/items, POST /orders/<id>/cancel):
+    # thời gian lưu phản hồi và thời gian giữ khóa in-flight tối đa (giây)
+    IDEMPOTENCY_KEY_TTL = int(os.environ.get('IDEMPOTENCY_KEY_TTL', 24 * 3600))
+    IDEMPOTENCY_LOCK_TIMEOUT = int(os.environ.get('IDEMPOTENCY_LOCK_TIMEOUT', 60))
+
 class DevelopmentConfig(Config):
     DEBUG = True
     SQLALCHEMY_DATABASE_URI = os.environ.get('DEV_DATABASE_URL') or \
@@ -2,6 +2,8 @@
 import { fetchWithAuth, API_BASE_URL, getToken, removeToken } from './services/api.js';
 
 const ALLOWED_ORDER_STATUSES_GLOBAL = ['pending', 'processing', 'shipped', 'delivered', 'cancelled', 'failed'];
+// Các cột của bảng quản lý sản phẩm (tham số 'fields' của GET /phones/)
+const MANAGED_PRODUCT_FIELDS = 'id,model_name,manufacturer,price,stock_quantity,added_by_user_id';
 
 const { createApp } = Vue;
 
@@ -25,8 +27,11 @@ const app = createApp({
             paginationPublic: { page: 1, per_page: 9, total_pages: 1, total_items: 0 },
             currentProductDetail: null,
             productsManaged: [],
+            productsManagedNextCursor: null,
             productForm: { id: null, model_name: '', manufacturer: '', price: null, stock_quantity: null, specifications: '' },
             cart: { items: [], total_price: 0, user_id: null },
+            cartSummary: { item_count: 0, total_quantity: 0, subtotal: 0, updated_at: null }, // badge: GET /cart/summary
+            checkoutIdempotencyKey: null, // giữ nguyên khi gửi lại sau lỗi mạng để không tạo đơn trùng
             shippingAddress: '',
             orders: [],
             orderFilters: { status: '' },
@@ -42,7 +47,7 @@ const app = createApp({
         isAdmin() { return this.userRole === 'admin'; },
         canManageProducts() { return this.isSeller || this.isAdmin; },
         canManageOrders() { return this.isSeller || this.isAdmin; },
-        cartItemCount() { return this.cart?.items?.reduce((sum, item) => sum + item.quantity, 0) || 0; },
+        cartItemCount() { return this.cartSummary?.total_quantity || 0; },
         allowedOrderStatuses() { return ALLOWED_ORDER_STATUSES_GLOBAL; }
     },
     methods: {
@@ -130,12 +135,12 @@ const app = createApp({
         logoutUser() { removeToken(); this.clearAuthDataAndNotify('Bạn đã đăng xuất.'); this.setView('productsPublic'); },
         clearAuthData() {
             this.isLoggedIn = false; this.username = ''; this.userId = null; this.userRole = '';
-            this.cart = { items: [], total_price: 0, user_id: null }; this.orders = []; this.productsManaged = [];
+            this.cart = { items: [], total_price: 0, user_id: null }; this.cartSummary = { item_count: 0, total_quantity: 0, subtotal: 0, updated_at: null }; this.orders = []; this.productsManaged = []; this.productsManagedNextCursor = null;
             this.currentProductDetail = null; this.currentOrderDetail = null; // Cũng reset detail khi logout
         },
         clearAuthDataAndNotify(message) { this.clearAuthData(); if (message) this.showToast(message, 'Thông báo', 'info');},
         loadDataForLoggedInUser() {
-            if (this.isBuyer) this.loadUserCart();
+            if (this.isBuyer) this.loadCartSummary();
             this.loadUserOrders();
             if (this.canManageProducts) this.loadManagedProducts();
         },
@@ -196,8 +201,16 @@ const app = createApp({
                 this.isLoading.productDetail = false;
             }
         },
-        openProductFormModal(product = null) {
-             if (product) this.productForm = { ...product, price: Number(product.price), stock_quantity: Number(product.stock_quantity) }; // Đảm bảo price, stock là số
+        async openProductFormModal(product = null) {
+             if (product) {
+                 this.productForm = { ...product, price: Number(product.price), stock_quantity: Number(product.stock_quantity), specifications: product.specifications ?? '' }; // Đảm bảo price, stock là số
+                 if (product.specifications === undefined) { // Danh sách quản lý không tải 'specifications' (sparse fieldset)
+                     try {
+                         const detail = await fetchWithAuth(`${API_BASE_URL}/phones/${product.id}?fields=specifications`);
+                         if (this.productForm.id === product.id) this.productForm.specifications = detail.specifications || '';
+                     } catch (error) { this.showToast(error.message || 'Lỗi tải thông số sản phẩm.', 'Lỗi', 'danger'); }
+                 }
+             }
              else this.productForm = { id: null, model_name: '', manufacturer: '', price: null, stock_quantity: null, specifications: '' };
         },
         async handleSaveProduct() {
@@ -243,17 +256,23 @@ const app = createApp({
             } catch (error) { this.showToast(error.message || 'Lỗi xóa SP.', 'Lỗi', 'danger');}
             finally { this.isLoading.deleteProduct = null; }
         },
-        async loadManagedProducts() {
+        async loadManagedProducts(append = false) {
             if(!this.canManageProducts) return;
             this.isLoading.productManagement = true;
             try {
-                const result = await fetchWithAuth(`${API_BASE_URL}/phones/?per_page=100&sort_by=id&order=desc`); // Lấy nhiều, sắp xếp theo ID mới nhất
                 if (this.isSeller) {
-                     this.productsManaged = result.data.filter(p => p.added_by_user_id === this.userId);
+                    // Kho của chính người bán, lọc ở server và phân trang cursor (ID mới nhất trước)
+                    let url = `${API_BASE_URL}/phones/mine?per_page=100&fields=${MANAGED_PRODUCT_FIELDS}`;
+                    if (append && this.productsManagedNextCursor) url += `&cursor=${encodeURIComponent(this.productsManagedNextCursor)}`;
+                    const result = await fetchWithAuth(url);
+                    this.productsManaged = append ? this.productsManaged.concat(result.data) : result.data;
+                    this.productsManagedNextCursor = result.meta.next_cursor;
                 } else if (this.isAdmin) {
+                    const result = await fetchWithAuth(`${API_BASE_URL}/phones/?per_page=100&sort_by=id&order=desc&fields=${MANAGED_PRODUCT_FIELDS}`); // Lấy nhiều, sắp xếp theo ID mới nhất; chỉ các cột hiển thị trong bảng
                     this.productsManaged = result.data;
-                } else { this.productsManaged = []; }
-            } catch (error) { this.showToast(error.message || 'Lỗi tải SP quản lý.', 'Lỗi', 'danger'); this.productsManaged = [];}
+                    this.productsManagedNextCursor = null;
+                } else { this.productsManaged = []; this.productsManagedNextCursor = null; }
+            } catch (error) { this.showToast(error.message || 'Lỗi tải SP quản lý.', 'Lỗi', 'danger'); if (!append) this.productsManaged = [];}
             finally { this.isLoading.productManagement = false; }
         },
 
@@ -267,6 +286,12 @@ const app = createApp({
             } catch (error) { this.showToast(error.message || 'Lỗi tải giỏ hàng.', 'Lỗi', 'danger'); this.cart = { items: [], total_price: 0, user_id: this.userId };}
             finally { this.isLoading.cart = false; }
         },
+        async loadCartSummary() {
+            if (!this.isBuyer) return;
+            // Trình duyệt tự gửi If-None-Match (ETag) nên polling badge gần như miễn phí khi giỏ không đổi.
+            try { this.cartSummary = await fetchWithAuth(`${API_BASE_URL}/cart/summary`); }
+            catch (error) { console.error('Lỗi tải tóm tắt giỏ hàng:', error.message); }
+        },
         async addItemToCart(phoneId, quantity = 1) {
             if (!this.isLoggedIn) { this.showToast('Vui lòng đăng nhập.', 'Thông báo', 'info'); this.getModal('loginModal').show(); return; }
             if (!this.isBuyer) { this.showToast('Chỉ người mua mới thao tác được.', 'Cảnh báo', 'warning'); return; }
@@ -316,12 +341,20 @@ const app = createApp({
             if (!this.shippingAddress.trim() || this.shippingAddress.trim().length < 5) { this.showToast("Địa chỉ giao hàng (ít nhất 5 ký tự).", 'Lỗi', 'warning'); return; }
             for (const item of this.cart.items) { if (item.quantity > item.phone.stock_quantity) { this.showToast(`'${item.phone.model_name}' không đủ tồn kho.`, 'Lỗi', 'warning'); this.setView('cart'); return; } }
             this.isLoading.orderAction = 'place_order'; this.apiResponse = null;
+            if (!this.checkoutIdempotencyKey) this.checkoutIdempotencyKey = crypto.randomUUID();
             try {
-                const result = await fetchWithAuth(`${API_BASE_URL}/orders/`, { method: 'POST', body: JSON.stringify({ shipping_address: this.shippingAddress }) });
+                const result = await fetchWithAuth(`${API_BASE_URL}/orders/`, { method: 'POST', headers: { 'Idempotency-Key': this.checkoutIdempotencyKey }, body: JSON.stringify({ shipping_address: this.shippingAddress }) });
+                this.checkoutIdempotencyKey = null;
                 this.showToast(`Đặt hàng thành công! ĐH #${result.id}`, 'Thành công', 'success'); this.apiResponse = result;
                 this.shippingAddress = ''; this.getModal('checkoutModal').hide();
                 await this.loadUserCart(); await this.loadProductsPublic(); this.setView('orders');
-            } catch (error) { this.showToast(error.message || 'Lỗi đặt hàng.', 'Lỗi', 'danger'); }
+            } catch (error) {
+                // Giữ key khi đơn có thể vẫn đang/đã được tạo (lỗi mạng, 5xx, 409 kèm Retry-After = yêu cầu trước còn chạy):
+                // lần bấm sau gửi lại cùng key thay vì tạo đơn trùng. Lỗi 4xx khác: yêu cầu sai, lần sau là yêu cầu mới.
+                const mayStillCommit = !error.status || error.status >= 500 || (error.status === 409 && error.retryAfter);
+                if (!mayStillCommit) this.checkoutIdempotencyKey = null;
+                this.showToast(error.message || 'Lỗi đặt hàng.', 'Lỗi', 'danger');
+            }
             finally { this.isLoading.orderAction = null; }
         },
         async loadUserOrders(page = this.paginationOrders.page) {
@@ -422,6 +455,13 @@ const app = createApp({
         });
     },
     watch: {
+        cart(newCart) {
+            // Mọi phản hồi giỏ hàng đầy đủ đã chứa tổng: cập nhật badge mà không gọi thêm /cart/summary.
+            if (newCart?.id) {
+                this.cartSummary = { item_count: newCart.item_count, total_quantity: newCart.total_quantity,
+                                     subtotal: newCart.total_price, updated_at: newCart.updated_at };
+            }
+        },
         isLoggedIn(newVal, oldVal) {
             if (newVal === true && oldVal === false) { 
                 this.loadDataForLoggedInUser();
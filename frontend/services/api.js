@@ -34,6 +34,7 @@ const fetchWithAuth = async (url, options = {}) => {
             const error = new Error(errorMessage);
             error.response = responseData;
             error.status = response.status;
+            error.retryAfter = response.headers.get('Retry-After'); // vd. 409 khi Idempotency-Key đang được xử lý
             console.error(`API call to ${url} FAILED with status ${response.status}:`, errorMessage, responseData);
             throw error;
         }
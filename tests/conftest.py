@@ -0,0 +1,36 @@
+# phone_management_api/tests/conftest.py
+import pytest
+
+from app import create_app
+from app.extensions import db
+from app.utils.facets import ensure_facet_summary
+from app.utils.search import ensure_search_index
+
+pytest_plugins = ['app.testing']
+
+
+@pytest.fixture
+def app_config():
+    """Ghi đè cấu hình cho app của test (override fixture này trong module test)."""
+    return {}
+
+
+@pytest.fixture
+def app(tmp_path, app_config):
+    database_uri = 'sqlite:///' + str(tmp_path / 'test.db')
+    app = create_app('test', dict(app_config, SQLALCHEMY_DATABASE_URI=database_uri))
+    with app.app_context():
+        # bind_key=None: metadata của bind 'replica' (từ test khác) vẫn nằm trong db dùng chung.
+        db.create_all(bind_key=None)
+        ensure_search_index()
+        ensure_facet_summary()
+    yield app
+    with app.app_context():
+        db.session.remove()
+        for engine in db.engines.values():
+            engine.dispose()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
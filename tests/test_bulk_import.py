@@ -0,0 +1,36 @@
+# phone_management_api/tests/test_bulk_import.py
+import json
+
+import pytest
+
+from app.testing import create_user
+
+
+@pytest.fixture
+def app_config():
+    return {'BULK_IMPORT_CHUNK_SIZE': 3, 'BULK_IMPORT_MAX_ERRORS': 3}
+
+
+def phone_line(name, price=100):
+    return json.dumps({'model_name': name, 'manufacturer': 'Nokia', 'price': price, 'stock_quantity': 1})
+
+
+def test_errors_are_reported_in_row_order(app, client):
+    _, seller = create_user(app, 'seller_bulk', 'seller')
+    lines = [
+        phone_line('Row 1'),
+        phone_line('Row 2', price=-1),  # lỗi schema, lô 1
+        phone_line('Row 3'),
+        '{not json',                    # lỗi đọc, lô 2
+        phone_line('Row 5', price=-1),  # lỗi schema, lô 2
+        '[1, 2]',                       # lỗi đọc, lô 2 - bị cắt bởi BULK_IMPORT_MAX_ERRORS
+        phone_line('Row 7'),
+    ]
+    response = client.post('/phones/bulk?format=ndjson', data='\n'.join(lines) + '\n', headers=seller,
+                           content_type='application/x-ndjson')
+
+    report = response.get_json()
+    assert response.status_code == 200
+    assert (report['received'], report['inserted'], report['failed']) == (7, 3, 4)
+    assert [error['row'] for error in report['errors']] == [2, 4, 5]
+    assert report['errors_truncated'] is True
@@ -0,0 +1,73 @@
+# phone_management_api/tests/test_checkout.py
+import pytest
+from sqlalchemy import event
+
+from app.extensions import db
+from app.models.order import Order
+from app.models.phone import Phone
+from app.testing import create_phones, create_user
+
+
+@pytest.fixture(params=[True, False], ids=['executemany', 'per-line'])
+def cart(request, app, client, monkeypatch):
+    """Giỏ 3 dòng; chạy với driver có và không có rowcount tin cậy cho executemany (vd. psycopg2)."""
+    with app.app_context():
+        monkeypatch.setattr(db.engine.dialect, 'supports_sane_multi_rowcount', request.param)
+    seller_id, _ = create_user(app, 'seller_checkout', 'seller')
+    _, buyer = create_user(app, 'buyer_checkout', 'buyer')
+    phone_ids = create_phones(app, seller_id, 3, stock_quantity=5)
+    client.patch('/cart/items', headers=buyer, json={'operations': [
+        {'op': 'add', 'phone_id': phone_id, 'quantity': 2} for phone_id in phone_ids]})
+    return buyer, phone_ids
+
+
+def stock_of(app, phone_ids):
+    with app.app_context():
+        return [db.session.get(Phone, phone_id).stock_quantity for phone_id in phone_ids]
+
+
+def test_checkout_reserves_stock_for_every_line(app, client, cart):
+    buyer, phone_ids = cart
+    with app.app_context():
+        engine = db.engine
+        per_line = not engine.dialect.supports_sane_multi_rowcount
+    stock_updates = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.startswith('UPDATE phones SET stock_quantity'):
+            stock_updates.append(executemany)
+
+    event.listen(engine, 'before_cursor_execute', record)
+    try:
+        response = client.post('/orders/', json={'shipping_address': '1 Checkout Street'}, headers=buyer)
+    finally:
+        event.remove(engine, 'before_cursor_execute', record)
+
+    assert response.status_code == 201
+    assert stock_of(app, phone_ids) == [3, 3, 3]
+    # Không tin rowcount của executemany: mỗi dòng một UPDATE và kiểm tra rowcount riêng.
+    assert stock_updates == ([False] * 3 if per_line else [True])
+
+
+def test_checkout_conflicts_when_stock_drops_concurrently(app, client, cart):
+    buyer, phone_ids = cart
+    with app.app_context():
+        engine = db.engine
+
+    def sell_out_last_phone(conn, cursor, statement, parameters, context, executemany):
+        # Một checkout khác vừa bán hết phone cuối, sau khi kiểm tra tồn kho nhưng trước khi trừ kho.
+        if statement.startswith('UPDATE phones SET stock_quantity') and not conn.info.get('sold_out'):
+            conn.info['sold_out'] = True
+            cursor.execute('UPDATE phones SET stock_quantity = 0 WHERE id = ?', (phone_ids[-1],))
+
+    event.listen(engine, 'before_cursor_execute', sell_out_last_phone)
+    try:
+        response = client.post('/orders/', json={'shipping_address': '1 Checkout Street'}, headers=buyer)
+    finally:
+        event.remove(engine, 'before_cursor_execute', sell_out_last_phone)
+
+    assert response.status_code == 409
+    with app.app_context():
+        assert db.session.query(Order).count() == 0
+    # Cả phần trừ kho dở dang lẫn thay đổi giả lập đều nằm trong savepoint đã rollback.
+    assert stock_of(app, phone_ids) == [5, 5, 5]
@@ -0,0 +1,24 @@
+# phone_management_api/tests/test_metrics.py
+import pytest
+
+from app.testing import create_user
+
+
+@pytest.fixture
+def app_config():
+    return {'METRICS_ENABLED': True, 'METRICS_TOKEN': 'scrape-secret'}
+
+
+def test_metrics_requires_admin_or_scrape_token(app, client):
+    _, buyer = create_user(app, 'buyer_metrics', 'buyer')
+    _, admin = create_user(app, 'admin_metrics', 'admin')
+    client.get('/phones/')
+
+    assert client.get('/metrics').status_code == 401
+    assert client.get('/metrics', headers=buyer).status_code == 403
+    assert client.get('/metrics', headers={'Authorization': 'Bearer wrong-secret'}).status_code in (401, 422)
+
+    for headers in (admin, {'Authorization': 'Bearer scrape-secret'}):
+        response = client.get('/metrics', headers=headers)
+        assert response.status_code == 200
+        assert 'phones_bp.handle_get_or_options_phones' in response.get_data(as_text=True)
@@ -0,0 +1,45 @@
+# phone_management_api/tests/test_query_budget_fixtures.py
+import pytest
+
+from app.utils.query_budget import QueryBudgetExceeded
+from app.testing import create_orders, create_phones, create_user
+
+
+@pytest.fixture
+def buyer(app):
+    seller_id, _ = create_user(app, 'seller_budget', 'seller')
+    buyer_id, headers = create_user(app, 'buyer_budget', 'buyer')
+    return buyer_id, headers, create_phones(app, seller_id, 20)
+
+
+@pytest.mark.parametrize('lines', [1, 20])
+def test_cart_view_query_count_does_not_grow_with_lines(client, buyer, query_budget, lines):
+    _, headers, phone_ids = buyer
+    client.patch('/cart/items', headers=headers, json={'operations': [
+        {'op': 'add', 'phone_id': phone_id, 'quantity': 1} for phone_id in phone_ids[:lines]]})
+
+    with query_budget(3, label='GET /cart/'):
+        response = client.get('/cart/', headers=headers)
+    assert len(response.get_json()['items']) == lines
+
+
+@pytest.mark.parametrize('orders', [1, 10])
+def test_order_list_query_count_does_not_grow_with_orders(app, client, buyer, query_budget, orders):
+    buyer_id, headers, phone_ids = buyer
+    create_orders(app, buyer_id, phone_ids, orders)
+
+    with query_budget(4, label='GET /orders/'):
+        response = client.get('/orders/?per_page=10', headers=headers)
+    assert response.status_code == 200
+    assert len(response.get_json()['data']) == orders
+
+
+def test_query_budget_fixture_reports_repeated_statements(app, query_budget):
+    from app.extensions import db
+    from app.models.phone import Phone
+
+    with app.app_context():
+        with pytest.raises(QueryBudgetExceeded, match=r'4x SELECT phones\.id'):
+            with query_budget(2, label='Vòng lặp get'):
+                for phone_id in range(1, 5):
+                    db.session.get(Phone, phone_id)
@@ -0,0 +1,38 @@
+# phone_management_api/tests/test_query_budgets.py
+import pytest
+
+from app.utils import query_budget as query_budget_module
+from app.utils.query_budget import EndpointBudgetMonitor, QueryBudgetExceeded, endpoints_without_budget
+from app.testing import create_user, exercise_endpoints
+
+
+@pytest.fixture
+def seeded(app):
+    result = app.test_cli_runner().invoke(args=['seed-db'])
+    assert result.exception is None, result.output
+    return [create_user(app, username, role)[1]
+            for username, role in (('buyer_john', 'buyer'), ('seller_apple', 'seller'), ('admin1', 'admin'))]
+
+
+def test_every_endpoint_declares_a_budget(app):
+    assert endpoints_without_budget(app) == []
+
+
+def test_endpoints_stay_within_query_budgets(client, seeded, endpoint_query_budgets):
+    buyer, seller, admin = seeded
+    exercise_endpoints(client, buyer, seller, admin)
+
+    blueprint_endpoints = {rule.endpoint for rule in client.application.url_map.iter_rules()
+                           if '.' in rule.endpoint and not rule.endpoint.endswith('.static')}
+    assert blueprint_endpoints <= set(endpoint_query_budgets.observed)
+
+
+def test_monitor_reports_exceeded_budget(app, client, seeded, monkeypatch):
+    buyer, _, _ = seeded
+    monkeypatch.setitem(query_budget_module._endpoint_budgets, 'cart_bp.view_cart_route', 1)
+    client.post('/cart/items', json={'phone_id': 1, 'quantity': 1}, headers=buyer)
+
+    with EndpointBudgetMonitor(app) as monitor:
+        client.get('/cart/', headers=buyer)
+    with pytest.raises(QueryBudgetExceeded, match='cart_bp.view_cart_route'):
+        monitor.check()
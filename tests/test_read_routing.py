@@ -0,0 +1,31 @@
+# phone_management_api/tests/test_read_routing.py
+import pytest
+
+from app.testing import create_phones, create_user, sync_replica
+
+
+@pytest.fixture
+def app_config(tmp_path):
+    return {'READ_REPLICA_DATABASE_URL': 'sqlite:///' + str(tmp_path / 'replica.db')}
+
+
+def test_new_order_is_visible_right_after_checkout(app, client):
+    seller_id, _ = create_user(app, 'seller_routing', 'seller')
+    _, buyer = create_user(app, 'buyer_routing', 'buyer')
+    phone_id = create_phones(app, seller_id, 1)[0]
+    sync_replica(app)  # replica dừng ở đây: không thấy giỏ hàng lẫn đơn hàng tạo sau
+
+    client.post('/cart/items', json={'phone_id': phone_id, 'quantity': 1}, headers=buyer)
+    order = client.post('/orders/', json={'shipping_address': '1 Routing Street'}, headers=buyer)
+    assert order.status_code == 201
+
+    # Như frontend sau khi đặt hàng: GET /orders/ không kèm X-Read-Consistency.
+    orders = client.get('/orders/', headers=buyer)
+    assert orders.headers['X-DB-Route'] == 'primary'
+    assert [row['id'] for row in orders.get_json()['data']] == [order.get_json()['id']]
+    details = client.get(f"/orders/{order.get_json()['id']}", headers=buyer)
+    assert details.status_code == 200
+    assert details.headers['X-DB-Route'] == 'primary'
+
+    # Endpoint catalog vẫn đọc từ replica.
+    assert client.get(f'/phones/{phone_id}').headers['X-DB-Route'] == 'replica'
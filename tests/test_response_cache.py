@@ -0,0 +1,53 @@
+# phone_management_api/tests/test_response_cache.py
+import pytest
+
+from app.testing import create_phones, create_user, sync_replica
+
+
+@pytest.fixture
+def app_config(tmp_path):
+    return {'RESPONSE_CACHE_ENABLED': True, 'RESPONSE_CACHE_REPLICA_GRACE': 60,
+            'READ_REPLICA_DATABASE_URL': 'sqlite:///' + str(tmp_path / 'replica.db')}
+
+
+@pytest.fixture
+def phone(app):
+    seller_id, seller_headers = create_user(app, 'seller_cache', 'seller')
+    phone_id = create_phones(app, seller_id, 1, price=1000)[0]
+    sync_replica(app)
+    return phone_id, seller_headers
+
+
+def test_strong_read_after_write_is_fresh(client, phone):
+    phone_id, seller_headers = phone
+    url = f'/phones/{phone_id}'
+    assert client.get(url).headers['X-Cache'] == 'MISS'
+    assert client.get(url).headers['X-Cache'] == 'HIT'
+
+    # Replica không được đồng bộ lại: đọc từ replica vẫn thấy giá cũ.
+    assert client.put(url, json={'price': 1500}, headers=seller_headers).status_code == 200
+    strong = client.get(url, headers={'X-Read-Consistency': 'strong'})
+    assert strong.headers['X-Cache'] == 'BYPASS'
+    assert strong.headers['X-DB-Route'] == 'primary'
+    assert strong.get_json()['price'] == 1500
+
+    # Lần đọc mạnh không ghi cache, và bản cũ từ replica không được lưu ngay sau lần vô hiệu hóa.
+    stale = client.get(url)
+    assert stale.headers['X-DB-Route'] == 'replica'
+    assert stale.get_json()['price'] == 1000
+    assert stale.headers['X-Cache'] == 'MISS'
+    assert client.get(url).headers['X-Cache'] == 'MISS'
+    assert client.get(url, headers={'X-Read-Consistency': 'strong'}).get_json()['price'] == 1500
+
+
+def test_replica_fill_is_cached_after_grace(app, client, phone):
+    phone_id, seller_headers = phone
+    url = f'/phones/{phone_id}'
+    assert client.put(url, json={'price': 1500}, headers=seller_headers).status_code == 200
+    sync_replica(app)
+    app.extensions['response_cache'].replica_grace = 0
+
+    assert client.get(url).headers['X-Cache'] == 'MISS'
+    cached = client.get(url)
+    assert cached.headers['X-Cache'] == 'HIT'
+    assert cached.get_json()['price'] == 1500
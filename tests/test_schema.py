@@ -0,0 +1,27 @@
+# phone_management_api/tests/test_schema.py
+from sqlalchemy import inspect, text
+
+from app.extensions import db
+from app.utils.schema import ensure_phone_columns
+from app.testing import create_phones, create_user
+
+
+def test_ensure_phone_columns_upgrades_old_database(app, client):
+    seller_id, _ = create_user(app, 'seller_schema', 'seller')
+    phone_id = create_phones(app, seller_id, 1)[0]
+    with app.app_context():
+        # Bảng phones như trước khi có updated_at và ix_phones_user_id_id.
+        db.session.execute(text("DROP INDEX ix_phones_user_id_id"))
+        db.session.execute(text("ALTER TABLE phones DROP COLUMN updated_at"))
+        db.session.commit()
+
+        assert ensure_phone_columns() == ['updated_at']
+        assert ensure_phone_columns() == []
+        inspector = inspect(db.engine)
+        assert 'updated_at' in {column['name'] for column in inspector.get_columns('phones')}
+        assert 'ix_phones_user_id_id' in {index['name'] for index in inspector.get_indexes('phones')}
+        assert db.session.execute(text("SELECT COUNT(*) FROM phones WHERE updated_at IS NULL")).scalar() == 0
+
+    response = client.get(f'/phones/{phone_id}')
+    assert response.status_code == 200
+    assert response.headers['Last-Modified']
@@ -0,0 +1,52 @@
+# phone_management_api/tests/test_search.py
+from sqlalchemy import delete, insert, text, update
+
+from app.extensions import db
+from app.models.phone import Phone
+from app.testing import create_user
+from app.utils import search
+
+
+def search_ids(client, q):
+    return [phone['id'] for phone in client.get(f'/phones/?q={q}').get_json()['data']]
+
+
+def test_index_follows_every_write_path(app, client):
+    seller_id, seller = create_user(app, 'seller_search', 'seller')
+    created = client.post('/phones/', json={'model_name': 'Galaxy Fold', 'manufacturer': 'Samsung', 'price': 100,
+                                            'stock_quantity': 1}, headers=seller).get_json()
+    with app.app_context():
+        # Core statement, không đi qua route nào.
+        core_id = db.session.execute(insert(Phone.__table__).values(
+            model_name='Xperia Zeta', manufacturer='Sony', price=10, stock_quantity=1, user_id=seller_id)
+        ).inserted_primary_key[0]
+        db.session.commit()
+    assert search_ids(client, 'galaxy') == [created['id']]
+    assert search_ids(client, 'xperia') == [core_id]
+
+    client.put(f"/phones/{created['id']}", json={'model_name': 'Nova Flip'}, headers=seller)
+    with app.app_context():
+        db.session.execute(update(Phone.__table__).where(Phone.id == core_id).values(manufacturer='Kyocera'))
+        db.session.commit()
+    assert search_ids(client, 'galaxy') == []
+    assert search_ids(client, 'nova') == [created['id']]
+    assert search_ids(client, 'kyocera') == [core_id]
+
+    client.delete(f"/phones/{created['id']}", headers=seller)
+    with app.app_context():
+        db.session.execute(delete(Phone.__table__).where(Phone.id == core_id))
+        db.session.commit()
+        assert db.session.execute(text(f"SELECT COUNT(*) FROM {search.SEARCH_TABLE}")).scalar() == 0
+
+
+def test_index_without_triggers_is_not_used_until_ensured(app):
+    with app.app_context():
+        for name in search._SEARCH_TRIGGER_NAMES:
+            db.session.execute(text(f"DROP TRIGGER {name}"))
+        db.session.commit()
+        search._index_ready.clear()
+        assert not search.search_index_ready()
+
+        search.ensure_search_index()
+        search._index_ready.clear()
+        assert search.search_index_ready()
@@ -0,0 +1,93 @@
+# phone_management_api/tests/test_serializers.py
+import json
+from datetime import datetime, timezone
+from decimal import Decimal
+
+import pytest
+
+from app.models.cart import Cart, CartItem
+from app.models.order import Order, OrderItem
+from app.models.phone import Phone
+from app.models.user import User
+from app.schemas import (cart_schema_output, cart_serializer, order_schema_output, order_serializer,
+                         orders_schema_output, orders_serializer, phone_schema, phone_serializer,
+                         phones_schema, phones_serializer)
+
+NAIVE = datetime(2024, 5, 1, 8, 30, 15, 123456)
+AWARE = datetime(2024, 5, 2, 9, 0, tzinfo=timezone.utc)
+
+
+def as_json(data):
+    # repr cho giá trị ngoài JSON (vd. Decimal) để phân biệt cả kiểu: 3, 3.0 và Decimal('3') khác nhau.
+    return json.dumps(data, default=repr)
+
+
+def make_phones():
+    return [
+        Phone(id=1, model_name='Galaxy S24', manufacturer='Samsung', price=1000.35, stock_quantity=3,
+              specifications='8GB RAM', user_id=2, updated_at=AWARE),
+        Phone(id=2, model_name='iPhone 15', manufacturer='Apple', price=Decimal('19.99'), stock_quantity=0,
+              specifications=None, user_id=None, updated_at=None),
+        Phone(id=3, model_name='Nokia 3310', manufacturer='Nokia', price=Decimal('7'), stock_quantity=None,
+              specifications='', user_id=2, updated_at=NAIVE),
+        Phone(id=4, model_name='Pixel 8', manufacturer='Google', price=None, stock_quantity=5,
+              specifications=None, user_id=2),
+    ]
+
+
+def make_orders(phones):
+    buyer = User(id=7, username='buyer_john', role='buyer')
+    return [
+        Order(id=1, user_id=7, user=buyer, total_amount=Decimal('2000.70'), status='pending',
+              shipping_address='1 Main Street', created_at=NAIVE, updated_at=AWARE,
+              items=[OrderItem(id=1, phone_id=1, phone=phones[0], quantity=2, price_at_purchase=1000.35),
+                     OrderItem(id=2, phone_id=2, phone=phones[1], quantity=1, price_at_purchase=Decimal('19.99')),
+                     OrderItem(id=3, phone_id=9, phone=None, quantity=1, price_at_purchase=5)]),
+        Order(id=2, user_id=7, user=None, total_amount=0.0, status='cancelled', shipping_address=None,
+              created_at=None, updated_at=None, items=[]),
+    ]
+
+
+def make_cart(phones, subtotal):
+    return Cart(id=3, user_id=7, created_at=NAIVE, updated_at=AWARE, item_count=4, total_quantity=6,
+                subtotal=subtotal, items=[
+                    CartItem(id=1, phone_id=1, phone=phones[0], quantity=2, added_at=NAIVE),
+                    CartItem(id=2, phone_id=2, phone=phones[1], quantity=3, added_at=None),
+                    CartItem(id=3, phone_id=4, phone=phones[3], quantity=1, added_at=AWARE),
+                    CartItem(id=4, phone_id=9, phone=None, quantity=None, added_at=NAIVE)])
+
+
+@pytest.fixture
+def phones(app):
+    with app.app_context():
+        yield make_phones()
+
+
+def test_phone_serializers_match_marshmallow(phones):
+    for phone in phones:
+        assert as_json(phone_serializer.dump(phone)) == as_json(phone_schema.dump(phone))
+    assert as_json(phones_serializer.dump(phones)) == as_json(phones_schema.dump(phones))
+    fields = ('id', 'price', 'specifications')
+    assert as_json(phones_serializer.only(fields).dump(phones)) == \
+        as_json(type(phones_schema)(only=fields, many=True).dump(phones))
+
+
+def test_order_serializers_match_marshmallow(phones):
+    orders = make_orders(phones)
+    for order in orders:
+        assert as_json(order_serializer.dump(order)) == as_json(order_schema_output.dump(order))
+    assert as_json(orders_serializer.dump(orders)) == as_json(orders_schema_output.dump(orders))
+
+
+@pytest.mark.parametrize('subtotal', [Decimal('2061.67'), 2061.6666, 0, None])
+def test_cart_serializer_matches_marshmallow(phones, subtotal):
+    if subtotal is None:
+        # total_price cộng dồn giá các dòng: không trộn float với Decimal.
+        phones[0].price = Decimal('1000.35')
+    cart = make_cart(phones, subtotal)
+    assert as_json(cart_serializer.dump(cart)) == as_json(cart_schema_output.dump(cart))
+
+
+def test_fast_serializers_can_be_disabled(app, phones):
+    app.config['FAST_SERIALIZERS_ENABLED'] = False
+    assert as_json(phones_serializer.dump(phones)) == as_json(phones_schema.dump(phones))